@@ -1,3 +1,26 @@
+# appointment/admin.py
 from django.contrib import admin
+from appointment.models import Appointment
+from core.pagination import EstimatedCountPaginator
 
-# Register your models here.
+
+@admin.register(Appointment)
+class AppointmentAdmin(admin.ModelAdmin):
+    list_display = (
+        'patient', 'doctor', 'availability', 
+        'status', 'appointment_fee', 'created_at'
+    )
+    list_filter = ('status', 'created_at', 'doctor__specialization')
+    search_fields = (
+        'patient__first_name', 'patient__last_name',
+        'doctor__first_name', 'doctor__last_name'
+    )
+    ordering = ('-created_at',)
+    readonly_fields = ('created_at', 'updated_at')
+    # availability.__str__ reads its doctor too
+    list_select_related = ('patient', 'doctor', 'availability__doctor')
+    # Dropdowns would render every user, patient and slot
+    raw_id_fields = ('user', 'patient', 'availability')
+    autocomplete_fields = ('doctor',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
@@ -0,0 +1,70 @@
+"""
+Streaming appointment export for billing.
+
+Rows are read with ``values_list().iterator()`` (a server-side cursor on
+PostgreSQL) and encoded one chunk at a time, so memory stays flat no
+matter how many appointments match: no model instances, no full result
+list, no response body built up front.
+"""
+import csv
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+# Output column -> lookup
+EXPORT_COLUMNS = {
+    'id': 'pk',
+    'status': 'status',
+    'date': 'availability__date',
+    'start_time': 'availability__start_time',
+    'end_time': 'availability__end_time',
+    'appointment_fee': 'appointment_fee',
+    'patient_id': 'patient_id',
+    'patient_title': 'patient__title',
+    'patient_first_name': 'patient__first_name',
+    'patient_last_name': 'patient__last_name',
+    'patient_gender': 'patient__gender',
+    'patient_age': 'patient__age',
+    'account_email': 'user__email',
+    'doctor_id': 'doctor_id',
+    'doctor_first_name': 'doctor__first_name',
+    'doctor_last_name': 'doctor__last_name',
+    'doctor_specialization': 'doctor__specialization',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+}
+# A spreadsheet runs a cell starting with one of these as a formula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+class _Echo:
+    """File-like object whose write() hands the encoded line straight back"""
+    def write(self, value):
+        return value
+
+
+def _csv_safe(value):
+    """Neutralize text a spreadsheet would evaluate, by prefixing a quote"""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+def export_rows(queryset, fmt, chunk_size=2000):
+    """Yield ``queryset`` as CSV or NDJSON text, one row per item"""
+    rows = queryset.order_by('pk').values_list(*EXPORT_COLUMNS.values()).iterator(chunk_size=chunk_size)
+    names = list(EXPORT_COLUMNS)
+    if fmt == 'csv':
+        writer = csv.writer(_Echo())
+        yield writer.writerow(names)
+        for row in rows:
+            yield writer.writerow([_csv_safe(value) for value in row])
+    elif fmt == 'ndjson':
+        encoder = DjangoJSONEncoder()
+        for row in rows:
+            yield encoder.encode(dict(zip(names, row))) + '\n'
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
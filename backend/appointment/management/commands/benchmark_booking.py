@@ -0,0 +1,144 @@
+import threading
+import time
+import uuid
+from datetime import date, time as dt_time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from appointment.models import Appointment
+from appointment.services import SlotUnavailable, book_appointment
+from doctor.models import Doctor, DoctorAvailability
+from patient.models import Patient
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Hammer single appointment slots from N threads and report throughput and double-bookings"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=16)
+        parser.add_argument('--rounds', type=int, default=20, help='Number of slots to contend for')
+
+    def handle(self, *args, **options):
+        threads = options['threads']
+        rounds = options['rounds']
+        if threads < 2 or rounds < 1:
+            raise CommandError("Need at least 2 threads and 1 round")
+
+        tag = uuid.uuid4().hex[:8]
+        doctor, slots, patients = self._create_fixtures(tag, threads, rounds)
+
+        results = {'booked': 0, 'conflict': 0, 'error': 0}
+        latencies = []
+        lock = threading.Lock()
+
+        try:
+            started = time.perf_counter()
+            for slot in slots:
+                barrier = threading.Barrier(threads)
+                workers = [
+                    threading.Thread(
+                        target=self._attempt,
+                        args=(barrier, slot.pk, patient, results, latencies, lock)
+                    )
+                    for patient in patients
+                ]
+                for worker in workers:
+                    worker.start()
+                for worker in workers:
+                    worker.join()
+            elapsed = time.perf_counter() - started
+
+            double_booked = sum(
+                1 for slot in slots
+                if Appointment.objects.filter(availability=slot).count() > 1
+            )
+        finally:
+            doctor.delete()
+            User.objects.filter(email__startswith=f"bench-{tag}-").delete()
+
+        attempts = threads * rounds
+        latencies.sort()
+        self.stdout.write(f"attempts:       {attempts} ({threads} threads x {rounds} slots)")
+        self.stdout.write(f"booked:         {results['booked']}")
+        self.stdout.write(f"conflicts(409): {results['conflict']}")
+        self.stdout.write(f"errors:         {results['error']}")
+        self.stdout.write(f"throughput:     {attempts / elapsed:.1f} attempts/s")
+        if latencies:
+            self.stdout.write(f"p50 latency:    {latencies[len(latencies) // 2] * 1000:.2f} ms")
+            self.stdout.write(f"p99 latency:    {latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms")
+
+        if double_booked or results['booked'] != rounds:
+            raise CommandError(
+                f"{double_booked} double-booked slots, {results['booked']} bookings for {rounds} slots"
+            )
+        self.stdout.write(self.style.SUCCESS("No double-bookings"))
+
+    def _attempt(self, barrier, slot_id, patient, results, latencies, lock):
+        try:
+            availability = DoctorAvailability.objects.select_related('doctor').get(pk=slot_id)
+            barrier.wait()
+            started = time.perf_counter()
+            try:
+                book_appointment(
+                    user=patient.user,
+                    patient=patient,
+                    availability=availability,
+                    symptoms="Benchmark booking attempt",
+                )
+                outcome = 'booked'
+            except SlotUnavailable:
+                outcome = 'conflict'
+            except Exception:
+                outcome = 'error'
+            elapsed = time.perf_counter() - started
+            with lock:
+                results[outcome] += 1
+                latencies.append(elapsed)
+        finally:
+            connection.close()
+
+    def _create_fixtures(self, tag, threads, rounds):
+        doctor = Doctor.objects.create(
+            first_name="Bench",
+            last_name=tag,
+            age=40,
+            gender='O',
+            address="Benchmark",
+            specialization='general_medicine',
+            license_no=f"BENCH-{tag}",
+            experience=10,
+            phone_number="0000000000",
+            email=f"bench-{tag}@example.com",
+        )
+
+        day = date.today() + timedelta(days=1)
+        slots = DoctorAvailability.objects.bulk_create([
+            DoctorAvailability(
+                doctor=doctor,
+                date=day + timedelta(days=i // 20),
+                start_time=dt_time(8 + (i % 20) // 2, 30 * (i % 2)),
+                end_time=dt_time(8 + (i % 20) // 2, 30 * (i % 2) + 29),
+            )
+            for i in range(rounds)
+        ])
+
+        patients = []
+        for i in range(threads):
+            user = User.objects.create_user(
+                email=f"bench-{tag}-{i}@example.com",
+                password=None,
+            )
+            patients.append(Patient.objects.create(
+                user=user,
+                title='Mr',
+                first_name="Bench",
+                last_name=str(i),
+                relation='self',
+                gender='other',
+                age=30,
+            ))
+        return doctor, slots, patients
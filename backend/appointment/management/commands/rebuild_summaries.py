@@ -0,0 +1,20 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from appointment.summaries import rebuild_summaries
+
+
+class Command(BaseCommand):
+    help = "Recompute doctor daily summaries from slots and appointments, e.g. after a bulk load or schema change"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='date_from', type=date.fromisoformat, help="First day (YYYY-MM-DD)")
+        parser.add_argument('--to', dest='date_to', type=date.fromisoformat, help="Last day (YYYY-MM-DD)")
+
+    def handle(self, *args, **options):
+        date_from, date_to = options['date_from'], options['date_to']
+        if date_from and date_to and date_from > date_to:
+            raise CommandError("--from must not be after --to")
+        rows = rebuild_summaries(date_from, date_to)
+        self.stdout.write(f"Rebuilt {rows} doctor daily summaries")
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from appointment.reminders import send_due_reminders
+
+
+class Command(BaseCommand):
+    help = "Queue 24h and 1h reminders for confirmed appointments; schedule it every few minutes"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError("--chunk-size must be positive")
+        totals = send_due_reminders(chunk_size=options['chunk_size'])
+        for kind, queued in totals.items():
+            self.stdout.write(f"{kind}: queued {queued}")
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from appointment.sweeper import sweep_appointments
+
+
+class Command(BaseCommand):
+    help = "Mark past confirmed appointments NO_SHOW and expire stale pending ones; schedule it hourly"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError("--chunk-size must be positive")
+        counts = sweep_appointments(chunk_size=options['chunk_size'])
+        self.stdout.write(f"Marked {counts['no_show']} no-shows, expired {counts['expired']} pending appointments")
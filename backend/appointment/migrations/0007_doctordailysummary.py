@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointment', '0006_availability_fk_active_slot'),
+        ('doctor', '0006_doctor_user'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DoctorDailySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('slots', models.IntegerField(default=0)),
+                ('pending', models.IntegerField(default=0)),
+                ('confirmed', models.IntegerField(default=0)),
+                ('completed', models.IntegerField(default=0)),
+                ('cancelled', models.IntegerField(default=0)),
+                ('no_show', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('pipeline', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('doctor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_summaries', to='doctor.doctor')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['date', 'doctor'], name='summary_date_doctor_idx')],
+                'constraints': [models.UniqueConstraint(fields=('doctor', 'date'), name='unique_doctor_daily_summary')],
+            },
+        ),
+    ]
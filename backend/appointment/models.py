@@ -1,10 +1,20 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from django.core.exceptions import ValidationError
+from core.models import DirtyFieldsMixin
 from patient.models import Patient
 from doctor.models import Doctor, DoctorAvailability
 
-class Appointment(models.Model):
+# Status -> statuses it may move to; terminal statuses map to nothing
+ALLOWED_STATUS_TRANSITIONS = {
+    'PENDING': ['CONFIRMED', 'CANCELLED'],
+    'CONFIRMED': ['COMPLETED', 'CANCELLED', 'NO_SHOW'],
+    'CANCELLED': [],
+    'COMPLETED': [],
+    'NO_SHOW': [],
+}
+
+class Appointment(DirtyFieldsMixin, models.Model):
     STATUS_CHOICES = [
         ("PENDING", "Pending"),
         ("CONFIRMED", "Confirmed"),
@@ -28,10 +38,12 @@ class Appointment(models.Model):
         on_delete=models.CASCADE, 
         related_name="appointments"
     )
-    availability = models.OneToOneField(  # Changed to OneToOne
+    # One active appointment per slot (see Meta.constraints); cancelled ones
+    # stay attached for history while the slot is booked again
+    availability = models.ForeignKey(
         DoctorAvailability, 
         on_delete=models.CASCADE, 
-        related_name="appointment"
+        related_name="appointments"
     )
     
     symptoms = models.TextField()
@@ -52,41 +64,127 @@ class Appointment(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # "My appointments" list: filter by user, keyset on (-created_at, id)
+            models.Index(fields=['user', '-created_at', 'id'], name='appt_user_created_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['availability'],
+                condition=~models.Q(status='CANCELLED'),
+                name='appt_active_slot_uniq'
+            ),
+        ]
 
     def clean(self):
         # Ensure patient belongs to the user
         if hasattr(self, 'user') and hasattr(self, 'patient'):
-            if self.patient.user != self.user:
+            if self.patient.user_id != self.user_id:
                 raise ValidationError(
                     {'patient': 'You can only book appointments for your own patients'}
                 )
         
         # Ensure availability is not already booked
-        if hasattr(self, 'availability'):
-            if hasattr(self.availability, 'appointment') and self.availability.appointment != self:
+        if self.availability_id and self.status != 'CANCELLED':
+            booked = Appointment.objects.filter(
+                availability_id=self.availability_id
+            ).exclude(status='CANCELLED').exclude(pk=self.pk)
+            if booked.exists():
                 raise ValidationError(
                     {'availability': 'This time slot is already booked'}
                 )
 
-    def save(self, *args, **kwargs):
+    # clean() reads these; other status updates skip its queries
+    validated_fields = ('user', 'patient', 'availability')
+
+    def save(self, *args, validate=True, **kwargs):
         # Set appointment fee from doctor's consultation fee
         if not self.appointment_fee and hasattr(self, 'doctor'):
             self.appointment_fee = self.doctor.consultation_fee
             
-        self.full_clean()
-        super().save(*args, **kwargs)
+        if validate:
+            self.full_clean_dirty()
+        # Status moves feed DoctorDailySummary in the same transaction; a
+        # status that was never loaded (only()/defer()) cannot be compared
+        loaded = {} if self._state.adding else getattr(self, '_loaded_values', {})
+        tracked = self._state.adding or 'status' in loaded
+        previous_status = loaded.get('status')
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+            if tracked and previous_status != self.status:
+                from .summaries import record_status_change
+                record_status_change(self, previous_status, self.status)
         
-        # Mark availability as unavailable
-        if self.availability:
+        # Mark availability as unavailable (already done by the booking service)
+        if self.status != 'CANCELLED' and self.availability.is_available:
             self.availability.is_available = False
             self.availability.save()
 
     def delete(self, *args, **kwargs):
-        # Mark availability as available again when appointment is deleted
-        if self.availability:
+        # Mark availability as available again when appointment is deleted;
+        # a cancelled appointment already gave its slot back
+        if self.status != 'CANCELLED':
             self.availability.is_available = True
             self.availability.save()
         super().delete(*args, **kwargs)
 
     def __str__(self):
         return f"Appointment: {self.patient.full_name} with {self.doctor.full_name} on {self.availability.date}"
+
+
+class AppointmentReminder(models.Model):
+    """Marks a reminder as sent so repeated runs never send it twice"""
+    KIND_CHOICES = [
+        ("24H", "24 hours before"),
+        ("1H", "1 hour before"),
+    ]
+
+    appointment = models.ForeignKey(
+        Appointment,
+        on_delete=models.CASCADE,
+        related_name="reminders"
+    )
+    kind = models.CharField(max_length=3, choices=KIND_CHOICES)
+    sent_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['appointment', 'kind'], name='unique_appointment_reminder'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} reminder for appointment {self.appointment_id}"
+
+
+class DoctorDailySummary(models.Model):
+    """
+    Per doctor and day: slots offered, appointments by current status and
+    fees, maintained incrementally by ``appointment.summaries`` so reports
+    never aggregate raw appointments. ``rebuild_summaries`` recomputes it.
+    """
+    doctor = models.ForeignKey(
+        Doctor,
+        on_delete=models.CASCADE,
+        related_name="daily_summaries"
+    )
+    date = models.DateField()
+    slots = models.IntegerField(default=0)
+    pending = models.IntegerField(default=0)
+    confirmed = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+    cancelled = models.IntegerField(default=0)
+    no_show = models.IntegerField(default=0)
+    # Fees of completed appointments, and of pending/confirmed ones still to come
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    pipeline = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['doctor', 'date'], name='unique_doctor_daily_summary'),
+        ]
+        indexes = [
+            models.Index(fields=['date', 'doctor'], name='summary_date_doctor_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.doctor_id} on {self.date}"
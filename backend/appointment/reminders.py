@@ -0,0 +1,113 @@
+"""
+Reminder emails sent 24 hours and 1 hour before confirmed appointments.
+
+Due appointments are streamed with ``iterator(chunk_size=...)`` and every
+relation the message needs joined in, so memory stays bounded by the
+chunk size and the number of queries by the number of chunks. Each chunk
+is queued on the email outbox in the same transaction that records it in
+``AppointmentReminder``: a reminder is queued if and only if its marker
+commits, and the marker's unique constraint makes re-runs harmless.
+"""
+import logging
+from datetime import datetime, timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from core.outbox import enqueue_emails
+from .models import Appointment, AppointmentReminder
+
+logger = logging.getLogger(__name__)
+
+# Checked tightest first: an appointment already inside the 1h window only
+# gets the 1h reminder, never a late 24h one as well
+REMINDER_LEADS = [
+    ('1H', timedelta(hours=1)),
+    ('24H', timedelta(hours=24)),
+]
+
+
+def render_reminder(appointment, kind):
+    availability = appointment.availability
+    lead = "within the next day" if kind == '24H' else "within the next hour"
+    subject = f"Appointment Reminder - {appointment.doctor.full_name}"
+    body = f"""
+    Dear {appointment.patient.full_name},
+    
+    This is a reminder that your appointment with {appointment.doctor.full_name} is {lead}.
+    
+    Date: {availability.date}
+    Time: {availability.start_time} - {availability.end_time}
+    
+    Please arrive 15 minutes before your appointment time.
+    
+    Best regards,
+    Healthcare Management System
+    """
+    return appointment.user.email, subject, body
+
+
+def due_appointments(kind, window_start, window_end):
+    """Confirmed appointments starting in (window_start, window_end] without a ``kind`` reminder"""
+    return Appointment.objects.filter(
+        status='CONFIRMED',
+        availability__date__range=[window_start.date(), window_end.date()],
+    ).exclude(
+        Exists(AppointmentReminder.objects.filter(appointment=OuterRef('pk'), kind=kind))
+    ).select_related(
+        'user', 'patient', 'doctor', 'availability'
+    ).only(
+        'id', 'user', 'patient', 'doctor', 'availability',
+        'user__email',
+        'patient__title', 'patient__first_name', 'patient__last_name',
+        'doctor__first_name', 'doctor__last_name',
+        'availability__date', 'availability__start_time', 'availability__end_time',
+    ).order_by('availability__date', 'availability__start_time', 'id')
+
+
+def _starts_within(appointment, window_start, window_end):
+    # Slot dates and times are wall-clock values in the project time zone
+    starts_at = datetime.combine(appointment.availability.date, appointment.availability.start_time)
+    return window_start < starts_at <= window_end
+
+
+def send_due_reminders(now=None, chunk_size=500):
+    """
+    Queue every reminder that is due at ``now`` and return ``{kind: queued}``.
+
+    Delivery and its retries are left to the outbox worker.
+    """
+    now = timezone.localtime(now).replace(tzinfo=None)
+    totals = {}
+    lower = now
+    for kind, lead in REMINDER_LEADS:
+        upper = now + lead
+        totals[kind] = 0
+        appointments = due_appointments(kind, lower, upper).iterator(chunk_size=chunk_size)
+        chunk = []
+        for appointment in appointments:
+            if _starts_within(appointment, lower, upper):
+                chunk.append(appointment)
+            if len(chunk) >= chunk_size:
+                totals[kind] += _send_chunk(chunk, kind)
+                chunk = []
+        if chunk:
+            totals[kind] += _send_chunk(chunk, kind)
+        lower = upper
+    return totals
+
+
+def _send_chunk(appointments, kind):
+    try:
+        with transaction.atomic():
+            AppointmentReminder.objects.bulk_create(
+                [AppointmentReminder(appointment_id=appointment.id, kind=kind) for appointment in appointments]
+            )
+            enqueue_emails(render_reminder(appointment, kind) for appointment in appointments)
+    except IntegrityError:
+        # A concurrent run recorded some of these first; the next run picks
+        # up whatever it did not
+        logger.warning("%d %s reminders were recorded concurrently; skipped", len(appointments), kind)
+        return 0
+    return len(appointments)
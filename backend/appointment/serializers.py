@@ -1,15 +1,22 @@
 from rest_framework import serializers
-from .models import Appointment
+from .models import ALLOWED_STATUS_TRANSITIONS, Appointment
+from core.fieldsets import SparseFieldsetSerializerMixin
 from patient.models import Patient
+from patient.serializers import PatientSerializer
 from doctor.models import DoctorAvailability
+from doctor.serializers import DoctorAvailabilitySerializer, DoctorSerializer
+from .services import book_appointment
 
-class AppointmentSerializer(serializers.ModelSerializer):
+class AppointmentSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     patient_name = serializers.CharField(source='patient.full_name', read_only=True)
     doctor_name = serializers.CharField(source='doctor.full_name', read_only=True)
     doctor_specialization = serializers.CharField(
         source='doctor.get_specialization_display', 
         read_only=True
     )
+    availability = serializers.PrimaryKeyRelatedField(
+        queryset=DoctorAvailability.objects.select_related('doctor')
+    )
     date = serializers.DateField(source='availability.date', read_only=True)
     start_time = serializers.TimeField(source='availability.start_time', read_only=True)
     end_time = serializers.TimeField(source='availability.end_time', read_only=True)
@@ -26,24 +33,34 @@ class AppointmentSerializer(serializers.ModelSerializer):
         read_only_fields = [
             'doctor', 'appointment_fee', 'created_at', 'updated_at'
         ]
+        # The one-active-appointment-per-slot constraint is enforced by
+        # book_appointment's conditional UPDATE, not a pre-check query
+        validators = []
+        expandable_fields = {
+            'patient': lambda: PatientSerializer,
+            'doctor': lambda: DoctorSerializer,
+            'availability': lambda: DoctorAvailabilitySerializer,
+        }
+        field_dependencies = {
+            'patient_name': ['patient__title', 'patient__first_name', 'patient__last_name'],
+            'doctor_name': ['doctor__first_name', 'doctor__last_name'],
+            'doctor_specialization': ['doctor__specialization'],
+        }
 
     def validate_patient(self, value):
         """Ensure patient belongs to the requesting user"""
         request = self.context.get('request')
-        if request and value.user != request.user:
+        if request and value.user_id != request.user.id:
             raise serializers.ValidationError(
                 "You can only book appointments for your own patients"
             )
         return value
 
     def validate_availability(self, value):
-        """Ensure availability slot is available and valid"""
-        if not value.is_available:
-            raise serializers.ValidationError("This time slot is not available")
-        
-        if hasattr(value, 'appointment'):
-            raise serializers.ValidationError("This slot is already booked")
-            
+        """Ensure availability slot is valid"""
+        # Whether it is still open is left to the booking service, which
+        # claims it atomically and reports a taken slot as a 409 conflict
+
         # Check if it's not in the past
         from datetime import date, datetime, time
         now = datetime.now()
@@ -65,9 +82,13 @@ class AppointmentSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         request = self.context.get('request')
-        validated_data['user'] = request.user
-        validated_data['doctor'] = validated_data['availability'].doctor
-        return super().create(validated_data)
+        return book_appointment(
+            user=request.user,
+            patient=validated_data['patient'],
+            availability=validated_data['availability'],
+            symptoms=validated_data['symptoms'],
+            additional_notes=validated_data.get('additional_notes'),
+        )
 
 class AppointmentUpdateSerializer(serializers.ModelSerializer):
     """Separate serializer for updates - limited fields"""
@@ -81,18 +102,57 @@ class AppointmentUpdateSerializer(serializers.ModelSerializer):
         if self.instance:
             current_status = self.instance.status
             
-            # Define allowed transitions
-            allowed_transitions = {
-                'PENDING': ['CONFIRMED', 'CANCELLED'],
-                'CONFIRMED': ['COMPLETED', 'CANCELLED', 'NO_SHOW'],
-                'CANCELLED': [],  # Cannot change from cancelled
-                'COMPLETED': [],  # Cannot change from completed
-                'NO_SHOW': [],    # Cannot change from no-show
-            }
-            
-            if value not in allowed_transitions.get(current_status, []):
+            if value not in ALLOWED_STATUS_TRANSITIONS.get(current_status, []):
                 raise serializers.ValidationError(
                     f"Cannot change status from {current_status} to {value}"
                 )
         
         return value
+
+class BulkStatusUpdateSerializer(serializers.Serializer):
+    MAX_IDS = 500
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        min_length=1,
+        max_length=MAX_IDS
+    )
+    status = serializers.ChoiceField(choices=Appointment.STATUS_CHOICES)
+
+    def validate_ids(self, value):
+        # Keep the caller's order but drop repeats
+        return list(dict.fromkeys(value))
+
+class SummaryReportParamsSerializer(serializers.Serializer):
+    MAX_RANGE_DAYS = 366
+    GROUP_BY_CHOICES = ['doctor', 'specialization', 'day']
+
+    date_from = serializers.DateField()
+    date_to = serializers.DateField()
+    group_by = serializers.ChoiceField(choices=GROUP_BY_CHOICES, default='doctor')
+
+    def validate(self, data):
+        if data['date_from'] > data['date_to']:
+            raise serializers.ValidationError(
+                {"date_to": "End date must not be before start date"}
+            )
+        if (data['date_to'] - data['date_from']).days >= self.MAX_RANGE_DAYS:
+            raise serializers.ValidationError(
+                {"date_to": f"Cannot report on more than {self.MAX_RANGE_DAYS} days at once"}
+            )
+        return data
+
+class AppointmentExportParamsSerializer(serializers.Serializer):
+    # Not ``format``: DRF reserves that query parameter for renderer selection
+    file_format = serializers.ChoiceField(choices=['csv', 'ndjson'], default='csv')
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    status = serializers.MultipleChoiceField(choices=Appointment.STATUS_CHOICES, required=False)
+    doctor = serializers.IntegerField(min_value=1, required=False)
+
+    def validate(self, data):
+        if data.get('date_from') and data.get('date_to') and data['date_from'] > data['date_to']:
+            raise serializers.ValidationError(
+                {"date_to": "End date must not be before start date"}
+            )
+        return data
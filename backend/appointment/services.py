@@ -0,0 +1,188 @@
+from collections import defaultdict
+from datetime import datetime
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from core.outbox import enqueue_emails
+from core.utils import appointment_confirmation_email
+from doctor.availability_cache import invalidate_availability_calendar
+from doctor.holds import held_by_other, release_hold
+from doctor.models import DoctorAvailability
+from .models import ALLOWED_STATUS_TRANSITIONS, Appointment
+from .summaries import record_status_changes
+
+
+class SlotUnavailable(Exception):
+    """Raised when the requested slot was already claimed by someone else"""
+    default_message = "This time slot is no longer available"
+
+    def __init__(self, message=None):
+        super().__init__(message or self.default_message)
+
+
+def book_appointment(*, user, patient, availability, symptoms, additional_notes=None):
+    """
+    Book ``availability`` for ``patient`` in a single transaction.
+
+    The slot is claimed with one conditional UPDATE (``is_available`` flips
+    from True to False), so concurrent requests for the same slot serialize
+    on the row lock and exactly one of them wins. The losers get
+    ``SlotUnavailable`` instead of a late IntegrityError. A slot another
+    user holds (see ``doctor.holds``) is refused before touching the database.
+    """
+    if held_by_other(availability.pk, user.id):
+        raise SlotUnavailable("This time slot is on hold for another patient")
+
+    try:
+        with transaction.atomic():
+            claimed = DoctorAvailability.objects.filter(
+                pk=availability.pk,
+                is_available=True
+            ).update(is_available=False)
+
+            if not claimed:
+                raise SlotUnavailable()
+
+            availability.is_available = False
+            doctor = availability.doctor
+
+            appointment = Appointment(
+                user=user,
+                patient=patient,
+                doctor=doctor,
+                availability=availability,
+                symptoms=symptoms,
+                additional_notes=additional_notes,
+                appointment_fee=doctor.consultation_fee,
+            )
+            # Ownership and availability were checked by the serializer and
+            # the UPDATE above, so skip the extra queries from full_clean()
+            appointment.save(validate=False)
+
+            doctor_days = [(availability.doctor_id, availability.date)]
+            transaction.on_commit(lambda: invalidate_availability_calendar(doctor_days))
+            transaction.on_commit(lambda: release_hold(availability.pk))
+    except IntegrityError:
+        # Slot row was out of sync with an active appointment
+        # (appt_active_slot_uniq); close it so the next attempt fails fast
+        if DoctorAvailability.objects.filter(pk=availability.pk, is_available=True).update(is_available=False):
+            doctor_days = [(availability.doctor_id, availability.date)]
+            transaction.on_commit(lambda: invalidate_availability_calendar(doctor_days))
+        availability.is_available = False
+        raise SlotUnavailable()
+
+    return appointment
+
+
+def transition_appointments(queryset, ids, status):
+    """
+    Move the appointments ``ids`` (limited to ``queryset``) to ``status``.
+
+    Current statuses are read in one query and checked against
+    ``ALLOWED_STATUS_TRANSITIONS``; the valid ones are then moved with one
+    conditional UPDATE per source status, so rows changed concurrently are
+    reported instead of overwritten. Returns ``(updated_ids, failures)``
+    where ``failures`` maps id to reason.
+    """
+    rows = queryset.filter(pk__in=ids).values_list(
+        'pk', 'status', 'doctor_id', 'availability__date', 'appointment_fee'
+    )
+    current = {}
+    summary_keys = {}
+    for pk, source, doctor_id, day, fee in rows:
+        current[pk] = source
+        summary_keys[pk] = (doctor_id, day, fee)
+    failures = {}
+    by_source = defaultdict(list)
+    for pk in ids:
+        source = current.get(pk)
+        if source is None:
+            failures[pk] = "Appointment not found"
+        elif status not in ALLOWED_STATUS_TRANSITIONS.get(source, []):
+            failures[pk] = f"Cannot change status from {source} to {status}"
+        else:
+            by_source[source].append(pk)
+
+    updated = []
+    now = timezone.now()
+    with transaction.atomic():
+        for source, pks in by_source.items():
+            count = Appointment.objects.filter(pk__in=pks, status=source).update(
+                status=status,
+                updated_at=now
+            )
+            if count == len(pks):
+                updated.extend(pks)
+                continue
+            # Some rows left ``source`` since they were read
+            moved = set(Appointment.objects.filter(
+                pk__in=pks, status=status, updated_at=now
+            ).values_list('pk', flat=True))
+            for pk in pks:
+                if pk in moved:
+                    updated.append(pk)
+                else:
+                    failures[pk] = "Status changed concurrently; reload and retry"
+
+        # Set-based UPDATEs bypass Appointment.save, so summaries are fed here
+        record_status_changes(
+            (*summary_keys[pk], current[pk], status) for pk in updated
+        )
+
+        if status == 'CANCELLED' and updated:
+            release_slots(
+                Appointment.objects.filter(pk__in=updated).values_list(
+                    'availability_id', 'availability__doctor_id', 'availability__date',
+                    'availability__start_time'
+                )
+            )
+
+        if status == 'CONFIRMED' and updated:
+            enqueue_emails(
+                appointment_confirmation_email(appointment)
+                for appointment in Appointment.objects.filter(pk__in=updated).select_related(
+                    'user', 'patient', 'doctor', 'availability'
+                )
+            )
+
+    position = {pk: i for i, pk in enumerate(ids)}
+    updated.sort(key=position.__getitem__)
+    return updated, failures
+
+
+def release_slots(slots):
+    """
+    Reopen the future slots among ``slots`` ((id, doctor_id, date,
+    start_time) tuples) after their appointments were cancelled. Slots that
+    have already started, including earlier today, stay closed.
+    """
+    # Slot dates and times are wall-clock values in the project time zone
+    now = timezone.localtime().replace(tzinfo=None)
+    future = [
+        (pk, doctor_id, day) for pk, doctor_id, day, start_time in slots
+        if datetime.combine(day, start_time) > now
+    ]
+    if not future:
+        return 0
+    released = DoctorAvailability.objects.filter(
+        pk__in=[pk for pk, _, _ in future],
+        is_available=False
+    ).update(is_available=True)
+    doctor_days = {(doctor_id, day) for _, doctor_id, day in future}
+    transaction.on_commit(lambda: invalidate_availability_calendar(doctor_days))
+    return released
+
+
+def release_slot(availability):
+    """``release_slots`` for a single ``DoctorAvailability``"""
+    return release_slots([
+        (availability.pk, availability.doctor_id, availability.date, availability.start_time)
+    ])
+
+
+def cancel_appointment(appointment):
+    """Cancel ``appointment`` and give its slot back"""
+    with transaction.atomic():
+        appointment.status = 'CANCELLED'
+        appointment.save()
+        release_slot(appointment.availability)
@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from doctor.models import DoctorAvailability
+from .models import Appointment
+from .summaries import record_slots, record_status_change
+
+@receiver(post_save, sender=DoctorAvailability)
+def count_new_slot(sender, instance, created, **kwargs):
+    """Count slots offered per doctor-day in DoctorDailySummary"""
+    if created:
+        record_slots([(instance.doctor_id, instance.date)])
+
+@receiver(post_delete, sender=DoctorAvailability)
+def uncount_deleted_slot(sender, instance, **kwargs):
+    record_slots([(instance.doctor_id, instance.date)], delta=-1)
+
+@receiver(pre_delete, sender=Appointment)
+def uncount_deleted_appointment(sender, instance, **kwargs):
+    """Also sent for cascades from a deleted slot; the slot is still readable here"""
+    record_status_change(instance, instance.status, None)
@@ -0,0 +1,181 @@
+"""
+Incremental maintenance of ``DoctorDailySummary``.
+
+Every write path that creates appointments, changes their status or
+adds/removes slots reports the change here inside its own transaction, so
+summaries commit (or roll back) together with the data. Deltas are merged
+per (doctor, day) first: any change, single or bulk, costs one insert
+for missing rows plus one ``F()`` UPDATE (per 500 doctor-days), never a
+recount. Drift from writes that bypass the model layer (raw SQL, bulk
+loads) is repaired with ``manage.py rebuild_summaries``.
+"""
+import operator
+from collections import defaultdict
+from decimal import Decimal
+from functools import reduce
+
+from django.db import transaction
+from django.db.models import Case, Count, F, Q, Sum, Value, When
+
+from doctor.models import DoctorAvailability
+from .models import Appointment, DoctorDailySummary
+
+# group_by -> {lookup: output key}
+REPORT_GROUPS = {
+    'doctor': {'doctor_id': 'doctor', 'doctor__first_name': 'first_name', 'doctor__last_name': 'last_name'},
+    'specialization': {'doctor__specialization': 'specialization'},
+    'day': {'date': 'date'},
+}
+# Statuses that used up a slot, for utilization
+BOOKED_COLUMNS = ['pending', 'confirmed', 'completed', 'no_show']
+STATUS_COLUMNS = {
+    'PENDING': 'pending',
+    'CONFIRMED': 'confirmed',
+    'COMPLETED': 'completed',
+    'CANCELLED': 'cancelled',
+    'NO_SHOW': 'no_show',
+}
+COUNT_COLUMNS = ['slots'] + list(STATUS_COLUMNS.values())
+MONEY_COLUMNS = ['revenue', 'pipeline']
+
+
+def _money_column(status):
+    if status == 'COMPLETED':
+        return 'revenue'
+    if status in ('PENDING', 'CONFIRMED'):
+        return 'pipeline'
+    return None
+
+
+def _key_filter(doctor_id, day):
+    return Q(doctor_id=doctor_id, date=day)
+
+
+def _apply(deltas, batch_size=500):
+    deltas = {
+        key: {column: value for column, value in columns.items() if value}
+        for key, columns in deltas.items()
+    }
+    deltas = {key: columns for key, columns in deltas.items() if columns}
+    if not deltas:
+        return
+    # Rows only need creating for increments; pure decrements (deletes) never
+    # insert, so they are safe while the doctor itself is being deleted
+    missing = [key for key, columns in deltas.items() if any(value > 0 for value in columns.values())]
+    if missing:
+        DoctorDailySummary.objects.bulk_create(
+            [DoctorDailySummary(doctor_id=doctor_id, date=day) for doctor_id, day in missing],
+            batch_size=batch_size,
+            ignore_conflicts=True
+        )
+
+    # One UPDATE per batch of doctor-days: each column adds a CASE picking
+    # that row's delta
+    keys = list(deltas)
+    for offset in range(0, len(keys), batch_size):
+        batch = keys[offset:offset + batch_size]
+        changes = {}
+        for column in COUNT_COLUMNS + MONEY_COLUMNS:
+            whens = [
+                When(_key_filter(*key), then=Value(deltas[key][column]))
+                for key in batch if column in deltas[key]
+            ]
+            if whens:
+                field = DoctorDailySummary._meta.get_field(column)
+                changes[column] = F(column) + Case(*whens, default=Value(0), output_field=field)
+        DoctorDailySummary.objects.filter(
+            reduce(operator.or_, (_key_filter(*key) for key in batch))
+        ).update(**changes)
+
+
+def record_status_changes(changes):
+    """
+    Apply ``(doctor_id, date, fee, old_status, new_status)`` changes.
+    ``old_status`` is None for new appointments, ``new_status`` None for
+    deleted ones.
+    """
+    deltas = defaultdict(lambda: defaultdict(int))
+    for doctor_id, day, fee, old, new in changes:
+        if old == new:
+            continue
+        columns = deltas[(doctor_id, day)]
+        fee = fee or Decimal('0')
+        if old is not None:
+            columns[STATUS_COLUMNS[old]] -= 1
+            if _money_column(old):
+                columns[_money_column(old)] -= fee
+        if new is not None:
+            columns[STATUS_COLUMNS[new]] += 1
+            if _money_column(new):
+                columns[_money_column(new)] += fee
+    _apply(deltas)
+
+
+def record_status_change(appointment, old_status, new_status):
+    availability = appointment.availability
+    record_status_changes([(
+        appointment.doctor_id, availability.date, appointment.appointment_fee, old_status, new_status
+    )])
+
+
+def record_slots(doctor_days, delta=1):
+    """Add ``delta`` slots for each (doctor_id, date), repeats included"""
+    deltas = defaultdict(lambda: defaultdict(int))
+    for key in doctor_days:
+        deltas[key]['slots'] += delta
+    _apply(deltas)
+
+
+def rebuild_summaries(date_from=None, date_to=None):
+    """Recompute summaries from scratch (optionally for a date range); returns rows written"""
+    date_filter = {}
+    if date_from:
+        date_filter['date__gte'] = date_from
+    if date_to:
+        date_filter['date__lte'] = date_to
+    appointment_filter = {f"availability__{key}": value for key, value in date_filter.items()}
+
+    rows = defaultdict(lambda: defaultdict(int))
+    slots = DoctorAvailability.objects.filter(**date_filter).values('doctor_id', 'date').annotate(
+        total=Count('id')
+    ).order_by()
+    for row in slots:
+        rows[(row['doctor_id'], row['date'])]['slots'] = row['total']
+
+    appointments = Appointment.objects.filter(**appointment_filter).values(
+        'doctor_id', 'availability__date', 'status'
+    ).annotate(total=Count('id'), fees=Sum('appointment_fee')).order_by()
+    for row in appointments:
+        columns = rows[(row['doctor_id'], row['availability__date'])]
+        columns[STATUS_COLUMNS[row['status']]] += row['total']
+        money = _money_column(row['status'])
+        if money:
+            columns[money] += row['fees'] or Decimal('0')
+
+    with transaction.atomic():
+        DoctorDailySummary.objects.filter(**date_filter).delete()
+        DoctorDailySummary.objects.bulk_create([
+            DoctorDailySummary(doctor_id=doctor_id, date=day, **columns)
+            for (doctor_id, day), columns in rows.items()
+        ], batch_size=1000)
+    return len(rows)
+
+
+def summary_report(date_from, date_to, group_by='doctor'):
+    """
+    Utilization and revenue between two dates, grouped by doctor,
+    specialization or day; a single GROUP BY over the summary table.
+    """
+    fields = REPORT_GROUPS[group_by]
+    rows = DoctorDailySummary.objects.filter(date__range=[date_from, date_to]).values(*fields).annotate(
+        **{column: Sum(column) for column in COUNT_COLUMNS + MONEY_COLUMNS}
+    ).order_by(*fields)
+
+    report = []
+    for row in rows:
+        entry = {key: row[lookup] for lookup, key in fields.items()}
+        entry.update((column, row[column]) for column in COUNT_COLUMNS + MONEY_COLUMNS)
+        entry['booked'] = sum(row[column] for column in BOOKED_COLUMNS)
+        entry['utilization'] = round(entry['booked'] / row['slots'], 4) if row['slots'] else None
+        report.append(entry)
+    return report
@@ -0,0 +1,81 @@
+"""
+Periodic status cleanup so ``status`` filters stay selective.
+
+- ``CONFIRMED`` appointments whose slot ended more than
+  ``NO_SHOW_GRACE_HOURS`` ago become ``NO_SHOW``
+- ``PENDING`` appointments that were never confirmed within
+  ``PENDING_EXPIRY_HOURS`` of booking, or whose slot has already started,
+  are cancelled and their future slots reopened
+
+Work is done in chunks, each in its own short transaction: candidate
+rows are locked with ``SKIP LOCKED`` (rows a live request holds are left
+for the next run) and moved with one guarded UPDATE.
+"""
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Appointment
+from .services import release_slots
+from .summaries import record_status_changes
+
+
+def _ended_before(moment):
+    return Q(availability__date__lt=moment.date()) | Q(
+        availability__date=moment.date(),
+        availability__end_time__lte=moment.time()
+    )
+
+
+def _started_before(moment):
+    return Q(availability__date__lt=moment.date()) | Q(
+        availability__date=moment.date(),
+        availability__start_time__lte=moment.time()
+    )
+
+
+def _sweep(candidates, source, target, chunk_size, release=False):
+    total = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                candidates.select_for_update(skip_locked=True, of=('self',))
+                .order_by('pk')
+                .values_list(
+                    'pk', 'availability_id', 'availability__doctor_id', 'availability__date',
+                    'availability__start_time', 'appointment_fee'
+                )[:chunk_size]
+            )
+            if not rows:
+                return total
+            # Rows are locked, so all of them still have ``source``
+            total += Appointment.objects.filter(
+                pk__in=[row[0] for row in rows],
+                status=source
+            ).update(status=target, updated_at=timezone.now())
+            record_status_changes(
+                (doctor_id, day, fee, source, target) for _, _, doctor_id, day, _, fee in rows
+            )
+            if release:
+                release_slots(row[1:5] for row in rows)
+
+
+def sweep_appointments(now=None, chunk_size=1000):
+    """Run both sweeps and return ``{'no_show': n, 'expired': n}``"""
+    # Slot dates and times are wall-clock values in the project time zone
+    now = timezone.localtime(now).replace(tzinfo=None)
+    no_show_cutoff = now - timedelta(hours=settings.NO_SHOW_GRACE_HOURS)
+    pending_cutoff = timezone.make_aware(now - timedelta(hours=settings.PENDING_EXPIRY_HOURS))
+
+    no_shows = Appointment.objects.filter(_ended_before(no_show_cutoff), status='CONFIRMED')
+    stale = Appointment.objects.filter(
+        Q(created_at__lt=pending_cutoff) | _started_before(now),
+        status='PENDING'
+    )
+    return {
+        'no_show': _sweep(no_shows, 'CONFIRMED', 'NO_SHOW', chunk_size),
+        'expired': _sweep(stale, 'PENDING', 'CANCELLED', chunk_size, release=True),
+    }
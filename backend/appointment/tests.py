@@ -1,3 +1,518 @@
+import csv
+import json
+from datetime import date, datetime, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from core.datagen import generate_dataset
+from core.models import OutboxEmail
+from core.testing import QueryBudgetMixin
+from .models import Appointment, DoctorDailySummary
+from doctor.availability_cache import get_availability_calendar
+from doctor.models import DoctorAvailability
+from patient.models import Patient
+from .reminders import send_due_reminders
+from .services import (
+    SlotUnavailable, book_appointment, cancel_appointment, release_slots, transition_appointments,
+)
+from .summaries import rebuild_summaries
+from .sweeper import sweep_appointments
+
+User = get_user_model()
+
+
+class AppointmentQueryBudgetTests(QueryBudgetMixin, APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = generate_dataset(users=2, doctors=3, slots_per_doctor=20, appointments=12)
+        cls.user = cls.dataset.users[0]
+        cls.patient = cls.dataset.patients[0]
+        cls.appointment = next(
+            appointment for appointment in cls.dataset.appointments
+            if appointment.user_id == cls.user.id
+        )
+        cls.open_slot = next(slot for slot in cls.dataset.slots if slot.is_available)
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def test_list(self):
+        with self.assertQueryBudget(1):
+            response = self.client.get(reverse('appointment-list-create'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 6)
+
+    def test_create(self):
+        # Two of these add the booking to the doctor's daily summary
+        with self.assertQueryBudget(8):
+            response = self.client.post(reverse('appointment-list-create'), {
+                'patient': self.patient.id,
+                'availability': self.open_slot.id,
+                'symptoms': 'Persistent headache for three days',
+            })
+        self.assertEqual(response.status_code, 201)
+
+    def test_retrieve(self):
+        with self.assertQueryBudget(1):
+            response = self.client.get(reverse('appointment-detail', args=[self.appointment.id]))
+        self.assertEqual(response.status_code, 200)
+
+    def test_update(self):
+        # Confirming also queues the confirmation email and moves the
+        # summary counters in the same transaction; a status change re-checks
+        # the active-slot constraint, whose condition reads status
+        with self.assertQueryBudget(11):
+            response = self.client.patch(
+                reverse('appointment-detail', args=[self.appointment.id]),
+                {'status': 'CONFIRMED'}
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(OutboxEmail.objects.filter(to=self.user.email).exists())
+
+    def test_cancel(self):
+        # Load, re-check the active-slot constraint, then cancel, update the
+        # summary and reopen the slot in one transaction
+        with self.assertQueryBudget(10):
+            response = self.client.delete(reverse('appointment-detail', args=[self.appointment.id]))
+        self.assertEqual(response.status_code, 200)
+
+    def test_cancel_through_update_reopens_slot(self):
+        slot = self.appointment.availability
+        calendar = get_availability_calendar(slot.doctor_id, slot.date, slot.date)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                reverse('appointment-detail', args=[self.appointment.id]),
+                {'status': 'CANCELLED'}
+            )
+
+        self.assertEqual(response.status_code, 200)
+        slot.refresh_from_db()
+        self.assertTrue(slot.is_available)
+        # The cached calendar day was invalidated and shows the slot again
+        refreshed = get_availability_calendar(slot.doctor_id, slot.date, slot.date)
+        self.assertEqual(refreshed[0]['open_count'], calendar[0]['open_count'] + 1)
+
+
+class BookingConflictTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = generate_dataset(users=2, doctors=1, slots_per_doctor=4, appointments=0)
+        cls.slot = cls.dataset.slots[0]
+
+    def book(self, index):
+        self.client.force_authenticate(self.dataset.users[index])
+        return self.client.post(reverse('appointment-list-create'), {
+            'patient': self.dataset.patients[index].id,
+            'availability': self.slot.id,
+            'symptoms': 'Persistent headache for three days',
+        })
+
+    def assertBookedOnce(self):
+        self.assertEqual(Appointment.objects.filter(availability=self.slot).count(), 1)
+        self.assertFalse(DoctorAvailability.objects.get(pk=self.slot.pk).is_available)
+
+    def test_taken_slot_is_a_conflict(self):
+        self.assertEqual(self.book(0).status_code, 201)
+        response = self.book(1)
+        self.assertEqual(response.status_code, 409)
+        self.assertBookedOnce()
+
+    def test_stale_slot_is_refused(self):
+        # Both requests read the slot as open; only the first claims it
+        stale = DoctorAvailability.objects.get(pk=self.slot.pk)
+        self.assertEqual(self.book(0).status_code, 201)
+        with self.assertRaises(SlotUnavailable):
+            book_appointment(
+                user=self.dataset.users[1], patient=self.dataset.patients[1],
+                availability=stale, symptoms='Persistent headache for three days',
+            )
+        self.assertBookedOnce()
+
+    def test_constraint_violation_maps_to_slot_unavailable(self):
+        self.assertEqual(self.book(0).status_code, 201)
+        # Slot flag out of sync with the active appointment: the UPDATE
+        # claims it and appt_active_slot_uniq rejects the second booking
+        DoctorAvailability.objects.filter(pk=self.slot.pk).update(is_available=True)
+
+        response = self.book(1)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['error'], SlotUnavailable.default_message)
+        self.assertBookedOnce()
+
+
+class ReminderTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = generate_dataset(users=4, doctors=2, slots_per_doctor=16, appointments=8)
+        cls.now = datetime.combine(cls.dataset.slots[0].date, time(6))
+        Appointment.objects.update(status='CONFIRMED')
+
+    def run_reminders(self, now, **kwargs):
+        return send_due_reminders(now=timezone.make_aware(now), **kwargs)
+
+    def test_queues_each_reminder_once(self):
+        # Every generated appointment is between 08:00 and 10:00 on day one
+        self.assertEqual(self.run_reminders(self.now), {'1H': 0, '24H': 8})
+        self.assertEqual(OutboxEmail.objects.filter(subject__startswith='Appointment Reminder').count(), 8)
+
+        self.assertEqual(self.run_reminders(self.now), {'1H': 0, '24H': 0})
+        self.assertEqual(OutboxEmail.objects.count(), 8)
+
+        first = Appointment.objects.order_by('availability__start_time').first()
+        self.run_reminders(datetime.combine(first.availability.date, time(7, 30)))
+        self.assertTrue(first.reminders.filter(kind='1H').exists())
+
+    def test_skips_unconfirmed_appointments(self):
+        Appointment.objects.update(status='PENDING')
+        self.assertEqual(self.run_reminders(self.now), {'1H': 0, '24H': 0})
+
+    def test_query_count_is_per_chunk(self):
+        # One streaming query per kind, then per chunk a transaction (a
+        # savepoint here) holding the marker insert and the outbox insert
+        with self.assertQueryBudget(2 + 4 * 4):
+            self.run_reminders(self.now, chunk_size=2)
+
+
+class BulkStatusTests(QueryBudgetMixin, APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = generate_dataset(users=2, doctors=2, slots_per_doctor=20, appointments=12)
+        cls.staff = User.objects.select_related('profile').get(pk=cls.dataset.users[1].pk)
+        cls.staff.is_staff = True
+        cls.staff.save()
+        cls.ids = [appointment.id for appointment in cls.dataset.appointments]
+
+    def setUp(self):
+        self.client.force_authenticate(self.staff)
+
+    def post(self, ids, status):
+        return self.client.post(
+            reverse('appointment-bulk-status'), {'ids': ids, 'status': status}, format='json'
+        )
+
+    def test_confirm_many_in_a_few_queries(self):
+        Appointment.objects.filter(pk=self.ids[0]).update(status='CANCELLED')
+
+        # Status read, savepoint, one UPDATE, summary insert and update, email
+        # data, outbox insert, release
+        with self.assertQueryBudget(8):
+            response = self.post(self.ids + [999999], 'CONFIRMED')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['updated'], self.ids[1:])
+        self.assertEqual(
+            [failure['id'] for failure in response.data['failed']],
+            [self.ids[0], 999999]
+        )
+        self.assertEqual(Appointment.objects.filter(status='CONFIRMED').count(), len(self.ids) - 1)
+        self.assertEqual(OutboxEmail.objects.count(), len(self.ids) - 1)
+
+    def test_one_update_per_source_status(self):
+        Appointment.objects.filter(pk__in=self.ids[:3]).update(status='CONFIRMED')
+
+        # Two UPDATEs (one per source status), the summary insert and update,
+        # plus reading and reopening the slots
+        with self.assertQueryBudget(9):
+            response = self.post(self.ids, 'CANCELLED')
+
+        self.assertEqual(response.data['updated'], self.ids)
+        self.assertFalse(Appointment.objects.exclude(status='CANCELLED').exists())
+
+    def test_doctors_only_move_their_own_appointments(self):
+        doctor = self.dataset.doctors[0]
+        account = User.objects.create_user(email='bulk-doctor@example.com', password='x')
+        account.profile.role = 'DOCTOR'
+        account.profile.save()
+        doctor.user = account
+        doctor.save()
+        own = [a.id for a in self.dataset.appointments if a.doctor_id == doctor.id]
+        other = [a.id for a in self.dataset.appointments if a.doctor_id != doctor.id]
+
+        self.client.force_authenticate(account)
+        response = self.post(self.ids, 'CANCELLED')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['updated'], own)
+        self.assertEqual(sorted(failure['id'] for failure in response.data['failed']), sorted(other))
+        self.assertFalse(Appointment.objects.filter(pk__in=other, status='CANCELLED').exists())
+
+    def test_patients_cannot_use_bulk_endpoint(self):
+        self.client.force_authenticate(self.dataset.users[0])
+        response = self.post(self.ids, 'CONFIRMED')
+        self.assertEqual(response.status_code, 403)
+
+
+class SweeperTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Two days of slots: yesterday (past) and tomorrow (future)
+        cls.past = generate_dataset(users=1, doctors=1, slots_per_doctor=4, appointments=4,
+                                    start=date.today() - timedelta(days=1))
+        cls.future = generate_dataset(users=1, doctors=1, slots_per_doctor=4, appointments=4,
+                                      start=date.today() + timedelta(days=1))
+
+    def test_past_confirmed_become_no_show(self):
+        past_ids = [appointment.id for appointment in self.past.appointments]
+        Appointment.objects.filter(pk__in=past_ids[:2]).update(status='CONFIRMED')
+
+        counts = sweep_appointments(chunk_size=1)
+
+        self.assertEqual(counts['no_show'], 2)
+        self.assertEqual(
+            set(Appointment.objects.filter(pk__in=past_ids).values_list('status', flat=True)),
+            {'NO_SHOW', 'CANCELLED'}
+        )
+        # Past slots are not reopened
+        self.assertFalse(DoctorAvailability.objects.filter(
+            pk__in=[slot.id for slot in self.past.slots], is_available=True
+        ).exists())
+
+    def test_started_slots_today_stay_closed(self):
+        doctor = self.future.doctors[0]
+        today = date.today()
+        started = DoctorAvailability.objects.create(
+            doctor=doctor, date=today, start_time=time(0), end_time=time(0, 30), is_available=False
+        )
+        upcoming = DoctorAvailability.objects.create(
+            doctor=doctor, date=today + timedelta(days=1), start_time=time(0), end_time=time(0, 30),
+            is_available=False
+        )
+
+        released = release_slots([
+            (slot.pk, slot.doctor_id, slot.date, slot.start_time) for slot in (started, upcoming)
+        ])
+
+        self.assertEqual(released, 1)
+        started.refresh_from_db()
+        upcoming.refresh_from_db()
+        self.assertFalse(started.is_available)
+        self.assertTrue(upcoming.is_available)
+
+    def test_stale_pending_release_future_slots(self):
+        future_ids = [appointment.id for appointment in self.future.appointments]
+        Appointment.objects.filter(pk=future_ids[0]).update(
+            created_at=timezone.now() - timedelta(days=30)
+        )
+
+        counts = sweep_appointments()
+
+        self.assertEqual(counts['expired'], 4 + 1)
+        expired = Appointment.objects.select_related('availability').get(pk=future_ids[0])
+        self.assertEqual(expired.status, 'CANCELLED')
+        self.assertTrue(expired.availability.is_available)
+        self.assertEqual(
+            Appointment.objects.filter(pk__in=future_ids[1:], status='PENDING').count(), 3
+        )
+
+        # The released slot can be booked again
+        book_appointment(
+            user=self.future.users[0],
+            patient=self.future.patients[0],
+            availability=expired.availability,
+            symptoms="Rebooked"
+        )
+
+
+class SummaryTests(QueryBudgetMixin, APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = generate_dataset(users=2, doctors=2, slots_per_doctor=20, appointments=8)
+        # Generated data is bulk-inserted, so start from a rebuild
+        rebuild_summaries()
+        cls.admin = User.objects.create_user(email='reports@example.com', password='x', is_staff=True)
+        cls.doctor = cls.dataset.doctors[0]
+
+    def snapshot(self):
+        return sorted(DoctorDailySummary.objects.values_list(
+            'doctor_id', 'date', 'slots', 'pending', 'confirmed', 'completed', 'cancelled', 'no_show',
+            'revenue', 'pipeline'
+        ))
+
+    def assertMatchesRebuild(self):
+        incremental = self.snapshot()
+        rebuild_summaries()
+        self.assertEqual(incremental, self.snapshot())
+
+    def test_incremental_changes_match_rebuild(self):
+        appointments = self.dataset.appointments
+        slot = next(slot for slot in self.dataset.slots if slot.is_available)
+        book_appointment(
+            user=self.dataset.users[0],
+            patient=self.dataset.patients[0],
+            availability=slot,
+            symptoms="Cough"
+        )
+        transition_appointments(Appointment.objects.all(), [a.id for a in appointments[:4]], 'CONFIRMED')
+        transition_appointments(Appointment.objects.all(), [a.id for a in appointments[:2]], 'COMPLETED')
+        cancel_appointment(Appointment.objects.select_related('availability').get(pk=appointments[4].id))
+        Appointment.objects.get(pk=appointments[5].id).delete()
+        DoctorAvailability.objects.create(
+            doctor=self.doctor, date=date.today() + timedelta(days=30), start_time=time(9), end_time=time(9, 30)
+        )
+        DoctorAvailability.objects.filter(is_available=True).first().delete()
+
+        self.assertMatchesRebuild()
+
+    def test_completed_fees_move_to_revenue(self):
+        appointment = self.dataset.appointments[0]
+        transition_appointments(Appointment.objects.all(), [appointment.id], 'CONFIRMED')
+        transition_appointments(Appointment.objects.all(), [appointment.id], 'COMPLETED')
+
+        summary = DoctorDailySummary.objects.get(doctor_id=appointment.doctor_id, date=appointment.availability.date)
+        self.assertEqual(summary.completed, 1)
+        self.assertEqual(summary.revenue, appointment.appointment_fee)
+
+    def test_report_by_specialization(self):
+        self.client.force_authenticate(self.admin)
+        params = {
+            'date_from': date.today().isoformat(),
+            'date_to': (date.today() + timedelta(days=30)).isoformat(),
+            'group_by': 'specialization',
+        }
+        # One GROUP BY over the summary table
+        with self.assertQueryBudget(1):
+            response = self.client.get(reverse('appointment-summary-report'), params)
+
+        self.assertEqual(response.status_code, 200)
+        results = response.data['results']
+        self.assertEqual(sum(row['slots'] for row in results), 40)
+        self.assertEqual(sum(row['booked'] for row in results), 8)
+        self.assertEqual(results[0]['utilization'], round(results[0]['booked'] / results[0]['slots'], 4))
+
+    def test_report_is_staff_only(self):
+        # The ADMIN profile role is self-selected at registration
+        account = User.objects.create_user(email='self-admin@example.com', password='x')
+        account.profile.role = 'ADMIN'
+        account.profile.save()
+        self.client.force_authenticate(account)
+        response = self.client.get(reverse('appointment-summary-report'), {
+            'date_from': date.today().isoformat(),
+            'date_to': date.today().isoformat(),
+        })
+        self.assertEqual(response.status_code, 403)
+
+
+class ExportTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = generate_dataset(users=2, doctors=2, slots_per_doctor=20, appointments=10)
+        cls.admin = User.objects.create_user(email='billing@example.com', password='x', is_staff=True)
+        cls.doctor = cls.dataset.doctors[0]
+        Appointment.objects.filter(pk=cls.dataset.appointments[0].id).update(status='COMPLETED')
+
+    def export(self, **params):
+        self.client.force_authenticate(self.admin)
+        response = self.client.get(reverse('appointment-export'), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_has_header_and_every_row(self):
+        rows = list(csv.DictReader(self.export().splitlines()))
+        self.assertEqual(len(rows), 10)
+        self.assertEqual(
+            sorted(int(row['id']) for row in rows),
+            sorted(appointment.id for appointment in self.dataset.appointments)
+        )
+        self.assertTrue(all(row['doctor_last_name'] for row in rows))
+
+    def test_csv_escapes_formulas(self):
+        appointment = self.dataset.appointments[0]
+        Patient.objects.filter(pk=appointment.patient_id).update(
+            first_name='=HYPERLINK("http://evil.example")', last_name='-2+3'
+        )
+        rows = {row['id']: row for row in csv.DictReader(self.export().splitlines())}
+        row = rows[str(appointment.id)]
+        self.assertEqual(row['patient_first_name'], '\'=HYPERLINK("http://evil.example")')
+        self.assertEqual(row['patient_last_name'], "'-2+3")
+
+        body = self.export(file_format='ndjson')
+        first_names = {json.loads(line)['patient_first_name'] for line in body.splitlines()}
+        self.assertIn('=HYPERLINK("http://evil.example")', first_names)
+
+    def test_ndjson_filters(self):
+        body = self.export(file_format='ndjson', doctor=self.doctor.id, status=['PENDING', 'COMPLETED'])
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(len(rows), 5)
+        self.assertEqual({row['doctor_id'] for row in rows}, {self.doctor.id})
+
+        body = self.export(file_format='ndjson', status='COMPLETED')
+        self.assertEqual([json.loads(line)['id'] for line in body.splitlines()], [self.dataset.appointments[0].id])
+
+    def test_patients_cannot_export(self):
+        self.client.force_authenticate(self.dataset.users[0])
+        response = self.client.get(reverse('appointment-export'))
+        self.assertEqual(response.status_code, 403)
+
+    def test_admin_role_without_staff_cannot_export(self):
+        account = User.objects.create_user(email='self-admin@example.com', password='x')
+        account.profile.role = 'ADMIN'
+        account.profile.save()
+        self.client.force_authenticate(account)
+        response = self.client.get(reverse('appointment-export'))
+        self.assertEqual(response.status_code, 403)
+
+
+class SparseFieldsetTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = generate_dataset(users=1, doctors=2, slots_per_doctor=10, appointments=4)
+        cls.user = cls.dataset.users[0]
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def get(self, url, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response, queries[-1]['sql']
+
+    def test_fields_shrink_payload_and_sql(self):
+        response, sql = self.get(reverse('appointment-list-create'), fields='id,status,date')
+
+        self.assertEqual(set(response.data['results'][0]), {'id', 'status', 'date'})
+        self.assertNotIn('"patient_patient"', sql)
+        self.assertNotIn('"doctor_doctor"', sql)
+        self.assertNotIn('symptoms', sql)
+
+    def test_expand_nests_related_object(self):
+        response, sql = self.get(reverse('appointment-list-create'), fields='id,doctor', expand='doctor')
+
+        row = response.data['results'][0]
+        doctor = Appointment.objects.select_related('doctor').get(pk=row['id']).doctor
+        self.assertEqual(row['doctor']['full_name'], doctor.full_name)
+        self.assertNotIn('"patient_patient"', sql)
+
+    def test_unknown_names_are_rejected(self):
+        url = reverse('appointment-list-create')
+        response = self.client.get(url, {'fields': 'id,nope'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('nope', response.data['fields'])
+        self.assertIn('status', response.data['fields'])
+
+        response = self.client.get(url, {'fields': 'id', 'expand': 'status'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('doctor', response.data['expand'])
+
+    def test_patient_fields_skip_medical_history(self):
+        response, sql = self.get(reverse('patient-list-create'), fields='id,full_name')
+
+        self.assertEqual(set(response.data['results'][0]), {'id', 'full_name'})
+        self.assertNotIn('medical_history', sql)
 
-# Create your tests here.
+    def test_writes_ignore_fields(self):
+        appointment = self.dataset.appointments[0]
+        response = self.client.patch(
+            reverse('appointment-detail', args=[appointment.id]) + '?fields=id',
+            {'additional_notes': "Bring reports"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('symptoms', response.data)
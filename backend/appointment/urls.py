@@ -1,7 +1,13 @@
 from django.urls import path
-from .views import AppointmentListCreateView, AppointmentDetailView
+from .views import (
+    AppointmentListCreateView, AppointmentDetailView, AppointmentBulkStatusView, SummaryReportView,
+    AppointmentExportView
+)
 
 urlpatterns = [
     path('', AppointmentListCreateView.as_view(), name='appointment-list-create'),
     path('<int:pk>/', AppointmentDetailView.as_view(), name='appointment-detail'),
+    path('bulk-status/', AppointmentBulkStatusView.as_view(), name='appointment-bulk-status'),
+    path('reports/summary/', SummaryReportView.as_view(), name='appointment-summary-report'),
+    path('export/', AppointmentExportView.as_view(), name='appointment-export'),
 ]
\ No newline at end of file
@@ -2,11 +2,23 @@ from rest_framework import generics, permissions, status, filters
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from django_filters.rest_framework import DjangoFilterBackend
+from django.db import transaction
 from django.db.models import Q
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from .models import Appointment
-from .serializers import AppointmentSerializer, AppointmentUpdateSerializer
+from .export import CONTENT_TYPES, export_rows
+from .serializers import (
+    AppointmentExportParamsSerializer, AppointmentSerializer, AppointmentUpdateSerializer,
+    BulkStatusUpdateSerializer, SummaryReportParamsSerializer
+)
+from .services import SlotUnavailable, cancel_appointment, release_slot, transition_appointments
+from .summaries import summary_report
+from core.fieldsets import SparseFieldsetMixin
+from core.permissions import IsDoctorOrAdmin
+from core.utils import send_appointment_confirmation
 
-class AppointmentListCreateView(generics.ListCreateAPIView):
+class AppointmentListCreateView(SparseFieldsetMixin, generics.ListCreateAPIView):
     serializer_class = AppointmentSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -23,7 +35,12 @@ class AppointmentListCreateView(generics.ListCreateAPIView):
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         if serializer.is_valid():
-            appointment = serializer.save()
+            try:
+                appointment = serializer.save()
+            except SlotUnavailable as exc:
+                return Response({
+                    'error': str(exc)
+                }, status=status.HTTP_409_CONFLICT)
             return Response({
                 'message': 'Appointment booked successfully',
                 'appointment': AppointmentSerializer(
@@ -33,7 +50,7 @@ class AppointmentListCreateView(generics.ListCreateAPIView):
             }, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class AppointmentDetailView(generics.RetrieveUpdateDestroyAPIView):
+class AppointmentDetailView(SparseFieldsetMixin, generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
@@ -46,6 +63,16 @@ class AppointmentDetailView(generics.RetrieveUpdateDestroyAPIView):
             return AppointmentUpdateSerializer
         return AppointmentSerializer
 
+    def perform_update(self, serializer):
+        # Status change, its notification and a freed slot commit (or roll back) together
+        with transaction.atomic():
+            previous_status = serializer.instance.status
+            appointment = serializer.save()
+            if appointment.status == 'CONFIRMED' and previous_status != 'CONFIRMED':
+                send_appointment_confirmation(appointment)
+            if appointment.status == 'CANCELLED' and previous_status != 'CANCELLED':
+                release_slot(appointment.availability)
+
     def destroy(self, request, *args, **kwargs):
         appointment = self.get_object()
         
@@ -55,10 +82,97 @@ class AppointmentDetailView(generics.RetrieveUpdateDestroyAPIView):
                 'error': 'Cannot cancel appointment with current status'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Update status instead of deleting
-        appointment.status = 'CANCELLED'
-        appointment.save()
+        # Update status instead of deleting, and reopen the slot
+        cancel_appointment(appointment)
         
         return Response({
             'message': 'Appointment cancelled successfully'
-        }, status=status.HTTP_200_OK)
\ No newline at end of file
+        }, status=status.HTTP_200_OK)
+
+class AppointmentBulkStatusView(generics.GenericAPIView):
+    """
+    Front-desk endpoint: move many appointments to one status in a single
+    request. Staff may move any appointment; doctors only their own.
+    """
+    serializer_class = BulkStatusUpdateSerializer
+    permission_classes = [IsDoctorOrAdmin]
+
+    def get_queryset(self):
+        user = self.request.user
+        if user.is_staff or user.is_superuser:
+            return Appointment.objects.all()
+        # The DOCTOR role is self-selected at registration, so it only
+        # reaches appointments of the doctor record linked to the account
+        return Appointment.objects.filter(doctor__user=user)
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        updated, failures = transition_appointments(
+            self.get_queryset(),
+            serializer.validated_data['ids'],
+            serializer.validated_data['status']
+        )
+        return Response({
+            'status': serializer.validated_data['status'],
+            'updated': updated,
+            'failed': [{'id': pk, 'error': error} for pk, error in failures.items()],
+        }, status=status.HTTP_200_OK)
+
+class SummaryReportView(generics.GenericAPIView):
+    """
+    Clinic utilization and revenue for a date range, grouped by doctor,
+    specialization or day. Reads only the pre-aggregated daily summaries.
+    """
+    serializer_class = SummaryReportParamsSerializer
+    # Clinic-wide revenue: staff only, never a self-selected profile role
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        params = self.get_serializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+        return Response({
+            'date_from': data['date_from'],
+            'date_to': data['date_to'],
+            'group_by': data['group_by'],
+            'results': summary_report(data['date_from'], data['date_to'], data['group_by']),
+        })
+
+class AppointmentExportView(generics.GenericAPIView):
+    """
+    Billing export: every matching appointment as streamed CSV or NDJSON.
+    Filters: ``date_from``/``date_to`` (slot date), ``status`` (repeatable),
+    ``doctor``; ``file_format`` picks csv (default) or ndjson.
+    """
+    serializer_class = AppointmentExportParamsSerializer
+    # Patient details: staff only, never a self-selected profile role
+    permission_classes = [permissions.IsAdminUser]
+    queryset = Appointment.objects.all()
+
+    def filter_export(self, queryset, data):
+        if data.get('date_from'):
+            queryset = queryset.filter(availability__date__gte=data['date_from'])
+        if data.get('date_to'):
+            queryset = queryset.filter(availability__date__lte=data['date_to'])
+        if data.get('status'):
+            queryset = queryset.filter(status__in=data['status'])
+        if data.get('doctor'):
+            queryset = queryset.filter(doctor_id=data['doctor'])
+        return queryset
+
+    def get(self, request):
+        # ``status`` may repeat: MultipleChoiceField reads it with getlist()
+        params = self.get_serializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+
+        fmt = data['file_format']
+        response = StreamingHttpResponse(
+            export_rows(self.filter_export(self.get_queryset(), data), fmt),
+            content_type=CONTENT_TYPES[fmt]
+        )
+        filename = f"appointments-{timezone.localdate().isoformat()}.{fmt}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
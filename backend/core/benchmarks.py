@@ -0,0 +1,118 @@
+"""
+Micro-benchmarks for serializers, validators and model saves.
+
+Each case is a callable taking the generated dataset and returning a
+zero-argument function to time. Run them with ``manage.py run_benchmarks``.
+"""
+import statistics
+import timeit
+from datetime import date, time, timedelta
+from types import SimpleNamespace
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def _request_for(user):
+    # Serializers only read request.user
+    return SimpleNamespace(user=user)
+
+
+@benchmark('appointment_list_serialization')
+def appointment_list_serialization(dataset):
+    from appointment.models import Appointment
+    from appointment.serializers import AppointmentSerializer
+
+    user = dataset.users[0]
+    appointments = list(
+        Appointment.objects.filter(user=user).select_related('patient', 'doctor', 'availability')
+    )
+    context = {'request': _request_for(user)}
+
+    def run():
+        return AppointmentSerializer(appointments, many=True, context=context).data
+    return run
+
+
+@benchmark('appointment_create_validation')
+def appointment_create_validation(dataset):
+    from appointment.serializers import AppointmentSerializer
+
+    user = dataset.users[0]
+    patient = dataset.patients[0]
+    slot = next(slot for slot in dataset.slots if slot.is_available)
+    context = {'request': _request_for(user)}
+    data = {
+        'patient': patient.id,
+        'availability': slot.id,
+        'symptoms': 'Persistent headache for three days',
+    }
+
+    def run():
+        serializer = AppointmentSerializer(data=data, context=context)
+        assert serializer.is_valid(), serializer.errors
+    return run
+
+
+@benchmark('availability_save')
+def availability_save(dataset):
+    from doctor.models import DoctorAvailability
+
+    doctor = dataset.doctors[0]
+    # Far enough out not to collide with generated slots
+    first_day = date.today() + timedelta(days=3650)
+    counter = iter(range(10 ** 9))
+
+    def run():
+        i = next(counter)
+        hour, half = divmod(i % 48, 2)
+        DoctorAvailability(
+            doctor=doctor,
+            date=first_day + timedelta(days=i // 48),
+            start_time=time(hour, 30 * half),
+            end_time=time(hour, 30 * half + 29),
+        ).save()
+    return run
+
+
+@benchmark('patient_validation')
+def patient_validation(dataset):
+    from patient.serializers import PatientSerializer
+
+    context = {'request': _request_for(dataset.users[0])}
+    data = {
+        'title': 'Mrs',
+        'first_name': 'Jane',
+        'last_name': 'Doe',
+        'relation': 'sister',
+        'gender': 'female',
+        'age': 41,
+    }
+
+    def run():
+        serializer = PatientSerializer(data=data, context=context)
+        assert serializer.is_valid(), serializer.errors
+    return run
+
+
+def run_benchmark(func, number, repeat):
+    """Time ``func`` and return per-call statistics in microseconds"""
+    func()  # warm up caches and lazy imports
+    timings = [
+        total / number * 1_000_000
+        for total in timeit.repeat(func, number=number, repeat=repeat)
+    ]
+    return {
+        'number': number,
+        'repeat': repeat,
+        'min_us': round(min(timings), 2),
+        'median_us': round(statistics.median(timings), 2),
+        'mean_us': round(statistics.mean(timings), 2),
+        'stdev_us': round(statistics.stdev(timings), 2) if len(timings) > 1 else 0.0,
+    }
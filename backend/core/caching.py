@@ -0,0 +1,79 @@
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.http import http_date, parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+VERSION_KEY = 'table-version:{name}'
+RESPONSE_KEY = 'response:{name}:{version}:{digest}'
+
+
+def get_table_version(name):
+    """Current version of a logical table; it doubles as its modification time in ns"""
+    key = VERSION_KEY.format(name=name)
+    version = cache.get(key)
+    if version is None:
+        version = time.time_ns()
+        # add() so a concurrent bump is not overwritten with an older value
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+    return version
+
+
+def bump_table_version(name):
+    """Invalidate every cached response built from ``name``"""
+    cache.set(VERSION_KEY.format(name=name), time.time_ns(), timeout=None)
+
+
+class CachedResponseMixin:
+    """
+    Server-side response cache with ETag validation for read-only views.
+
+    Responses are cached per host, path and normalized query string under
+    the current version of ``cache_table``, so bumping that version (on
+    model save/delete) invalidates everything at once without scanning
+    keys. The ETag is derived from the same inputs, which lets a matching
+    ``If-None-Match`` be answered with 304 from a single cache read.
+
+    Versions live in the default cache, so a bump only reaches the workers
+    that share it. Unless ``RESPONSE_CACHE_ENABLED`` is set (it defaults to
+    on only when ``REDIS_URL`` is configured) views are served uncached.
+    """
+    cache_table = None
+    cache_timeout = 300
+    cache_max_age = 60
+
+    def get_response_cache_digest(self, request):
+        query = urlencode(sorted(request.query_params.lists()), doseq=True)
+        raw = f"{request.get_host()}{request.path}?{query}"
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def get(self, request, *args, **kwargs):
+        if not settings.RESPONSE_CACHE_ENABLED:
+            return super().get(request, *args, **kwargs)
+
+        version = get_table_version(self.cache_table)
+        digest = self.get_response_cache_digest(request)
+        etag = quote_etag(f"{version:x}-{digest[:16]}")
+
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            key = RESPONSE_KEY.format(name=self.cache_table, version=version, digest=digest)
+            data = cache.get(key)
+            if data is None:
+                response = super().get(request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                cache.set(key, response.data, self.cache_timeout)
+            else:
+                response = Response(data)
+
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(version // 1_000_000_000)
+        response['Cache-Control'] = f"public, max-age={self.cache_max_age}"
+        return response
@@ -0,0 +1,128 @@
+"""Synthetic data for query-plan tests and benchmarks, inserted with bulk_create"""
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+
+SLOTS_PER_DAY = 16
+SLOT_MINUTES = 30
+# Patient.validate caps accounts at 4 patients, one per relation
+PATIENT_RELATIONS = ['self', 'spouse', 'father', 'mother']
+
+
+@dataclass
+class Dataset:
+    users: list = field(default_factory=list)
+    patients: list = field(default_factory=list)
+    doctors: list = field(default_factory=list)
+    slots: list = field(default_factory=list)
+    appointments: list = field(default_factory=list)
+
+
+def _slot_times(index):
+    start = datetime.combine(date.min, time(8)) + timedelta(minutes=SLOT_MINUTES * (index % SLOTS_PER_DAY))
+    return start.time(), (start + timedelta(minutes=SLOT_MINUTES)).time()
+
+
+def generate_dataset(users=100, doctors=20, slots_per_doctor=50, appointments=500,
+                     patients_per_user=1, start=None, batch_size=1000):
+    """
+    Create ``users`` accounts with ``patients_per_user`` patients each (at
+    most one per relation), ``doctors`` doctors with ``slots_per_doctor``
+    future slots each, and ``appointments`` bookings spread round-robin
+    over doctors and users.
+    """
+    from appointment.models import Appointment
+    from doctor.models import Doctor, DoctorAvailability
+    from patient.models import Patient
+    from users.models import UserProfile
+
+    User = get_user_model()
+    tag = uuid.uuid4().hex[:8]
+    start = start or date.today() + timedelta(days=1)
+    specializations = [choice for choice, _ in Doctor.SPECIALIZATIONS]
+    dataset = Dataset()
+
+    password = make_password(None)
+    dataset.users = User.objects.bulk_create([
+        User(email=f"user-{tag}-{i}@example.com", password=password, first_name="User", last_name=str(i))
+        for i in range(users)
+    ], batch_size=batch_size)
+
+    # bulk_create skips the post_save signal that normally adds profiles
+    UserProfile.objects.bulk_create([
+        UserProfile(user=user) for user in dataset.users
+    ], batch_size=batch_size)
+
+    relations = PATIENT_RELATIONS[:max(1, min(patients_per_user, len(PATIENT_RELATIONS)))]
+    dataset.patients = Patient.objects.bulk_create([
+        Patient(
+            user=user,
+            title='Mr',
+            first_name="Patient",
+            last_name=str(i),
+            relation=relation,
+            gender='other',
+            age=20 + i % 60,
+            medical_history="None reported",
+        )
+        for relation in relations
+        for i, user in enumerate(dataset.users)
+    ], batch_size=batch_size)
+
+    dataset.doctors = Doctor.objects.bulk_create([
+        Doctor(
+            first_name=f"Doc{i}",
+            last_name=tag,
+            age=30 + i % 40,
+            gender='O',
+            address="Synthetic",
+            specialization=specializations[i % len(specializations)],
+            license_no=f"LIC-{tag}-{i}",
+            experience=i % 30,
+            phone_number="0000000000",
+            email=f"doctor-{tag}-{i}@example.com",
+            consultation_fee=300 + (i % 10) * 50,
+        )
+        for i in range(doctors)
+    ], batch_size=batch_size)
+
+    slots = []
+    for doctor in dataset.doctors:
+        for i in range(slots_per_doctor):
+            start_time, end_time = _slot_times(i)
+            slots.append(DoctorAvailability(
+                doctor=doctor,
+                date=start + timedelta(days=i // SLOTS_PER_DAY),
+                start_time=start_time,
+                end_time=end_time,
+            ))
+
+    # Book slots round-robin across doctors so every doctor gets some load
+    appointments = min(appointments, len(slots))
+    booked = []
+    for i in range(appointments):
+        doctor_index = i % doctors
+        slot = slots[doctor_index * slots_per_doctor + i // doctors]
+        slot.is_available = False
+        booked.append(slot)
+
+    dataset.slots = DoctorAvailability.objects.bulk_create(slots, batch_size=batch_size)
+
+    if users:
+        dataset.appointments = Appointment.objects.bulk_create([
+            Appointment(
+                user=dataset.users[i % users],
+                patient=dataset.patients[i % users],
+                doctor=slot.doctor,
+                availability=slot,
+                symptoms="Synthetic symptoms for benchmarking",
+                status='PENDING',
+                appointment_fee=slot.doctor.consultation_fee,
+            )
+            for i, slot in enumerate(booked)
+        ], batch_size=batch_size)
+
+    return dataset
@@ -0,0 +1,175 @@
+"""
+Client-selectable sparse fieldsets and expansions.
+
+``?fields=id,status,date`` limits a response to the named fields and
+``?expand=doctor`` swaps a primary key for the nested object. On reads the
+view also prunes its queryset to match: relations nothing asked for are
+dropped from ``select_related`` and ``only()`` loads just the columns the
+remaining fields read, so the SQL shrinks along with the payload.
+
+Serializers opt in with ``SparseFieldsetSerializerMixin`` and views with
+``SparseFieldsetMixin``. Without either parameter nothing changes; a name
+the serializer cannot return or expand is a 400 listing the valid ones.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+
+
+def parse_field_list(value):
+    return [name.strip() for name in (value or '').split(',') if name.strip()]
+
+
+class SparseFieldsetSerializerMixin:
+    """
+    Drops fields not listed in ``context['fields']`` and expands those in
+    ``context['expand']``.
+
+    - ``Meta.expandable_fields``: field name -> callable returning the
+      nested serializer class (callables avoid circular imports)
+    - ``Meta.field_dependencies``: field name -> ORM paths it reads, for
+      fields computed from properties or methods; fields whose source is a
+      model field or a relation path are worked out automatically
+
+    Only the serializer the view builds is pruned; nested serializers keep
+    all their fields.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        expandable = getattr(self.Meta, 'expandable_fields', {})
+        expand = list(self.context.get('expand', ()))
+        requested = self.context.get('fields')
+        self.check_sparse_fieldset(requested or (), expand, expandable)
+
+        for name in expand:
+            self.fields[name] = expandable[name]()(read_only=True)
+
+        if requested:
+            keep = set(requested) | set(expand)
+            for name in list(self.fields):
+                if name not in keep:
+                    self.fields.pop(name)
+
+    def check_sparse_fieldset(self, requested, expand, expandable):
+        """Reject names this serializer cannot return or expand"""
+        errors = {}
+        unknown = [name for name in requested if name not in self.fields and name not in expandable]
+        if unknown:
+            valid = sorted(set(self.fields) | set(expandable))
+            errors[FIELDS_PARAM] = f"Unknown fields: {', '.join(unknown)}. Valid fields: {', '.join(valid)}"
+        unknown = [name for name in expand if name not in expandable]
+        if unknown:
+            valid = ', '.join(sorted(expandable)) or 'none'
+            errors[EXPAND_PARAM] = f"Cannot expand: {', '.join(unknown)}. Expandable fields: {valid}"
+        if errors:
+            raise serializers.ValidationError(errors)
+
+
+class _Requirements:
+    """Relations to join and columns to load, as ORM paths"""
+
+    def __init__(self):
+        self.relations = set()
+        self.columns = set()
+        # Path prefixes ('' for the root) whose rows must be loaded whole
+        self.whole = set()
+
+    def add_path(self, model, attrs, prefix=''):
+        """Record what reading ``attrs`` (an attribute chain) from ``model`` needs"""
+        for index, attr in enumerate(attrs):
+            if attr == 'pk':
+                return
+            try:
+                field = model._meta.get_field(attr)
+            except FieldDoesNotExist:
+                # A property or method: it may read any column of this row
+                self.whole.add(prefix)
+                return
+            path = f"{prefix}{attr}"
+            if not field.concrete or field.many_to_many:
+                # Reverse and many-to-many relations are fetched separately
+                self.whole.add(prefix)
+                return
+            self.columns.add(path)
+            if not field.is_relation or index == len(attrs) - 1:
+                return
+            self.relations.add(path)
+            model = field.related_model
+            prefix = f"{path}__"
+
+    def add_serializer(self, serializer, model, prefix=''):
+        dependencies = getattr(getattr(serializer, 'Meta', None), 'field_dependencies', {})
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if name in dependencies:
+                for path in dependencies[name]:
+                    self.add_path(model, path.split('__'), prefix)
+                continue
+            if field.source == '*':
+                self.whole.add(prefix)
+                continue
+            attrs = field.source.split('.')
+            self.add_path(model, attrs, prefix)
+            if isinstance(field, serializers.BaseSerializer):
+                nested = getattr(field, 'child', field)
+                try:
+                    relation = model._meta.get_field(attrs[0])
+                except FieldDoesNotExist:
+                    continue
+                if relation.is_relation and len(attrs) == 1:
+                    self.relations.add(f"{prefix}{attrs[0]}")
+                    self.add_serializer(nested, relation.related_model, f"{prefix}{attrs[0]}__")
+
+
+def prune_queryset(queryset, serializer, ordering=()):
+    """
+    Restrict ``queryset`` to the joins and columns ``serializer`` reads,
+    plus the ``ordering`` paths (pagination reads them from the last row).
+    """
+    requirements = _Requirements()
+    requirements.add_serializer(serializer, queryset.model)
+    for field in ordering:
+        if isinstance(field, str) and field != '?':
+            requirements.add_path(queryset.model, field.lstrip('-').split('__'))
+
+    queryset = queryset.select_related(None)
+    if requirements.relations:
+        queryset = queryset.select_related(*sorted(requirements.relations))
+    if '' in requirements.whole:
+        return queryset
+
+    # A relation path with no sub-columns loads the whole related row
+    columns = {
+        column for column in requirements.columns
+        if not any(column.startswith(prefix) for prefix in requirements.whole if prefix)
+    }
+    columns.update(prefix[:-2] for prefix in requirements.whole)
+    return queryset.only(*sorted(columns))
+
+
+class SparseFieldsetMixin:
+    """
+    View side: passes ``?fields=``/``?expand=`` to the serializer and, on
+    reads, prunes the queryset to what the pruned serializer needs.
+    """
+
+    def get_sparse_fieldset(self):
+        params = self.request.query_params
+        return parse_field_list(params.get(FIELDS_PARAM)), parse_field_list(params.get(EXPAND_PARAM))
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.request is not None and self.request.method in ('GET', 'HEAD'):
+            context['fields'], context['expand'] = self.get_sparse_fieldset()
+        return context
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.request.method not in ('GET', 'HEAD') or not any(self.get_sparse_fieldset()):
+            return queryset
+        ordering = list(queryset.query.order_by) + list(getattr(self, 'ordering', None) or [])
+        return prune_queryset(queryset, self.get_serializer(), ordering)
@@ -0,0 +1,35 @@
+"""Shared helpers for the CSV/NDJSON bulk importers (accounts, doctor rosters)"""
+import csv
+import json
+
+
+def read_rows(stream, fmt):
+    """Yield ``(line_number, row)`` pairs from a CSV or NDJSON text stream"""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == 'ndjson':
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as exc:
+                row = exc
+            yield line_number, row
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+
+def text(row, key):
+    """``row[key]`` as a stripped string, '' when missing"""
+    value = row.get(key)
+    return '' if value is None else str(value).strip()
+
+
+def error_message(exc):
+    """One-line summary of a ValidationError for row-level reports"""
+    if hasattr(exc, 'message_dict'):
+        return '; '.join(f"{name}: {' '.join(errors)}" for name, errors in exc.message_dict.items())
+    return ' '.join(getattr(exc, 'messages', [str(exc)]))
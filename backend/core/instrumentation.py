@@ -0,0 +1,69 @@
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.db import connections
+
+_IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r'\s+')
+
+_active_collectors = ContextVar('active_collectors', default=())
+
+
+def fingerprint(sql):
+    """Normalize SQL so the same statement with different parameters compares equal"""
+    sql = _IN_LIST.sub('IN (...)', sql)
+    sql = _LITERAL.sub('?', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+class QueryCollector:
+    """Database execute wrapper that counts, times and fingerprints queries"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+        # Statements by leading keyword (SELECT, INSERT, UPDATE, ...)
+        self.statements = Counter()
+        # Model saves by outcome ('full', 'partial', 'skipped'), see DirtyFieldsMixin
+        self.saves = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.fingerprints[fingerprint(sql)] += 1
+            self.statements[(sql.split(None, 1) or [''])[0].upper()] += 1
+
+    def repeated(self, threshold=2):
+        """(fingerprint, count) pairs executed at least ``threshold`` times, likely N+1s"""
+        return [
+            (sql, count) for sql, count in self.fingerprints.most_common()
+            if count >= threshold
+        ]
+
+
+def record_save(outcome):
+    """Count a model save on every active collector"""
+    for collector in _active_collectors.get():
+        collector.saves[outcome] += 1
+
+
+@contextmanager
+def collect_queries():
+    collector = QueryCollector()
+    token = _active_collectors.set(_active_collectors.get() + (collector,))
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(collector))
+            yield collector
+    finally:
+        _active_collectors.reset(token)
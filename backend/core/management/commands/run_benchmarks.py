@@ -0,0 +1,89 @@
+import json
+import platform
+import subprocess
+from datetime import datetime, timezone
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from core.benchmarks import BENCHMARKS, run_benchmark
+from core.datagen import generate_dataset
+
+
+class Command(BaseCommand):
+    help = "Run serializer/validator/model-save micro-benchmarks and write results as JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--patients-per-user', type=int, default=2)
+        parser.add_argument('--doctors', type=int, default=50)
+        parser.add_argument('--slots-per-doctor', type=int, default=100)
+        parser.add_argument('--appointments', type=int, default=2000)
+        parser.add_argument('--number', type=int, default=100, help='Calls per timing run')
+        parser.add_argument('--repeat', type=int, default=5, help='Timing runs per benchmark')
+        parser.add_argument('--only', action='append', choices=sorted(BENCHMARKS), help='Run only this benchmark (repeatable)')
+        parser.add_argument('--output', default='benchmark-results.json')
+        parser.add_argument('--compare', help='Previous results file to diff against')
+
+    def handle(self, *args, **options):
+        sizes = {
+            'users': options['users'],
+            'patients_per_user': options['patients_per_user'],
+            'doctors': options['doctors'],
+            'slots_per_doctor': options['slots_per_doctor'],
+            'appointments': options['appointments'],
+        }
+        if sizes['users'] < 1 or sizes['doctors'] < 1 or sizes['slots_per_doctor'] < 2:
+            raise CommandError("Need at least one user, one doctor and two slots per doctor")
+
+        results = {}
+        # Everything runs in one transaction that is rolled back at the end
+        with transaction.atomic():
+            dataset = generate_dataset(**sizes)
+            for name in options['only'] or sorted(BENCHMARKS):
+                func = BENCHMARKS[name](dataset)
+                results[name] = run_benchmark(func, options['number'], options['repeat'])
+                self.stdout.write(f"{name:34} median {results[name]['median_us']:>10.1f} us")
+            transaction.set_rollback(True)
+
+        report = {
+            'meta': {
+                'timestamp': datetime.now(timezone.utc).isoformat(),
+                'commit': self._git_commit(),
+                'database': connection.vendor,
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'dataset': sizes,
+            },
+            'results': results,
+        }
+        with open(options['output'], 'w') as fh:
+            json.dump(report, fh, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+        if options['compare']:
+            self._compare(options['compare'], results)
+
+    def _compare(self, path, results):
+        with open(path) as fh:
+            previous = json.load(fh)['results']
+
+        for name, current in results.items():
+            if name not in previous:
+                continue
+            before = previous[name]['median_us']
+            change = (current['median_us'] - before) / before * 100 if before else 0.0
+            self.stdout.write(
+                f"{name:34} {before:>10.1f} -> {current['median_us']:>10.1f} us ({change:+.1f}%)"
+            )
+
+    def _git_commit(self):
+        try:
+            return subprocess.check_output(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                stderr=subprocess.DEVNULL,
+                text=True
+            ).strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
@@ -0,0 +1,41 @@
+import logging
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .instrumentation import collect_queries
+
+logger = logging.getLogger(__name__)
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Report per-request SQL usage in response headers and log likely N+1s.
+
+    Opt-in through ``SQL_INSTRUMENTATION`` (defaults to DEBUG); when it is
+    off the middleware removes itself at startup and costs nothing.
+    """
+
+    def __init__(self, get_response):
+        if not settings.SQL_INSTRUMENTATION:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.threshold = settings.SQL_REPEATED_QUERY_THRESHOLD
+
+    def __call__(self, request):
+        with collect_queries() as collector:
+            response = self.get_response(request)
+
+        repeated = collector.repeated(self.threshold)
+        response['X-DB-Query-Count'] = str(collector.count)
+        response['X-DB-Query-Time-Ms'] = f"{collector.duration * 1000:.2f}"
+        response['X-DB-Repeated-Queries'] = str(len(repeated))
+        response['X-DB-Update-Count'] = str(collector.statements['UPDATE'])
+        response['X-Model-Saves-Skipped'] = str(collector.saves['skipped'])
+
+        for sql, count in repeated:
+            logger.warning(
+                "Possible N+1 on %s %s: %d executions of %s",
+                request.method, request.path, count, sql
+            )
+        return response
@@ -1,3 +1,166 @@
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
 from django.db import models
+from django.utils import timezone
 
-# Create your models here.
+from .instrumentation import record_save
+
+
+class DirtyFieldsMixin:
+    """
+    Track which concrete fields changed since the instance was loaded or
+    last saved, so saves only write what changed.
+
+    - ``save()`` on an unchanged instance is a no-op (no query, no signals)
+    - otherwise it passes ``update_fields`` with the changed columns plus
+      any ``auto_now`` fields
+    - ``full_clean_dirty()`` validates only changed fields, and only runs
+      ``clean()`` when one of ``validated_fields`` (the fields it depends
+      on; ``None`` means all) changed. Unique sets and constraints are
+      checked whole whenever one of their fields changed
+
+    Values are compared with ``==``, so in-place mutation of mutable
+    values (lists, dicts) is not detected; assign a new value instead.
+    """
+    validated_fields = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._take_snapshot()
+        return instance
+
+    def _take_snapshot(self):
+        self._loaded_values = {
+            field.attname: self.__dict__[field.attname]
+            for field in self._meta.concrete_fields
+            if field.attname in self.__dict__
+        }
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        if fields is None:
+            self._take_snapshot()
+            return
+        # A partial refresh (including Django loading a deferred field on
+        # access) must not mark other unsaved edits as clean
+        loaded = getattr(self, '_loaded_values', {})
+        for field in self._meta.concrete_fields:
+            if (field.name in fields or field.attname in fields) and field.attname in self.__dict__:
+                loaded[field.attname] = self.__dict__[field.attname]
+        self._loaded_values = loaded
+
+    def get_dirty_fields(self):
+        """Names of concrete fields changed since load or the last save"""
+        if self._state.adding:
+            return [field.name for field in self._meta.concrete_fields]
+        loaded = getattr(self, '_loaded_values', {})
+        return [
+            field.name for field in self._meta.concrete_fields
+            if field.attname in self.__dict__
+            and (field.attname not in loaded or loaded[field.attname] != self.__dict__[field.attname])
+        ]
+
+    def is_dirty(self):
+        return bool(self.get_dirty_fields())
+
+    def full_clean_dirty(self):
+        if self._state.adding:
+            self.full_clean()
+            return
+        dirty = set(self.get_dirty_fields())
+        if not dirty:
+            return
+        exclude = {field.name for field in self._meta.concrete_fields if field.name not in dirty}
+        errors = {}
+        try:
+            self.clean_fields(exclude=exclude)
+        except ValidationError as exc:
+            errors = exc.update_error_dict(errors)
+        if self.validated_fields is None or dirty.intersection(self.validated_fields):
+            try:
+                self.clean()
+            except ValidationError as exc:
+                errors = exc.update_error_dict(errors)
+
+        # A unique set or constraint is checked as a whole once any of its
+        # fields changed; excluding its clean fields would skip the check
+        groups = [group for group in self._unique_field_groups() if dirty.intersection(group)]
+        if groups:
+            unique_exclude = exclude.difference(*groups)
+            unique_exclude.update(name for name in errors if name != NON_FIELD_ERRORS)
+            for validate in (self.validate_unique, self.validate_constraints):
+                try:
+                    validate(exclude=unique_exclude)
+                except ValidationError as exc:
+                    errors = exc.update_error_dict(errors)
+
+        if errors:
+            raise ValidationError(errors)
+
+    def _unique_field_groups(self):
+        """Field names checked together by each unique field, unique_together and constraint"""
+        opts = self._meta
+        groups = [{field.name} for field in opts.concrete_fields if field.unique and not field.primary_key]
+        groups += [set(fields) for fields in opts.unique_together]
+        for constraint in opts.constraints:
+            group = set(getattr(constraint, 'fields', ()))
+            condition = getattr(constraint, 'condition', None)
+            if condition is not None:
+                group |= condition.referenced_base_fields
+            groups.append(group)
+        return groups
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None and not args:
+            dirty = self.get_dirty_fields()
+            if not dirty:
+                record_save('skipped')
+                return
+            auto_now = [
+                field.name for field in self._meta.concrete_fields
+                if getattr(field, 'auto_now', False) and field.name not in dirty
+            ]
+            kwargs['update_fields'] = dirty + auto_now
+            record_save('partial')
+        else:
+            record_save('full')
+        super().save(*args, **kwargs)
+        self._take_snapshot()
+
+class OutboxEmail(models.Model):
+    """
+    Email queued in the same transaction as the change that triggered it and
+    delivered later by the outbox worker (``manage.py run_outbox_worker``).
+    """
+    STATUS_CHOICES = [
+        ("PENDING", "Pending"),
+        ("SENT", "Sent"),
+        ("FAILED", "Failed"),
+    ]
+
+    to = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default="PENDING"
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(
+                fields=['next_attempt_at', 'id'],
+                condition=models.Q(status='PENDING'),
+                name='outbox_pending_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.to} ({self.status})"
@@ -0,0 +1,105 @@
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+
+def enqueue_email(to, subject, body):
+    """
+    Queue an email for the outbox worker. Call this inside the transaction
+    that makes the change, so the message exists if and only if it commits.
+    """
+    return OutboxEmail.objects.create(to=to, subject=subject, body=body)
+
+
+def enqueue_emails(messages):
+    """Queue many ``(to, subject, body)`` messages with one insert"""
+    return OutboxEmail.objects.bulk_create([
+        OutboxEmail(to=to, subject=subject, body=body) for to, subject, body in messages
+    ])
+
+
+def retry_delay(attempts):
+    """Exponential backoff with jitter: ~30s, 1m, 2m, 4m ... capped at 1h"""
+    delay = min(settings.OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1), 3600)
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def _record_failure(message, exc, max_attempts):
+    """Count a failed attempt; return True once the message is given up on"""
+    message.attempts += 1
+    message.last_error = str(exc)[:1000]
+    if message.attempts >= max_attempts:
+        message.status = 'FAILED'
+        return True
+    message.next_attempt_at = timezone.now() + retry_delay(message.attempts)
+    return False
+
+
+def drain_outbox(batch_size=None, max_attempts=None):
+    """
+    Deliver one batch of due messages over a single SMTP connection and
+    return ``(sent, failed)``.
+
+    The batch is claimed in a short transaction: rows are locked with SKIP
+    LOCKED, so several workers can drain the same outbox, and their
+    ``next_attempt_at`` is pushed out by ``OUTBOX_LEASE_SECONDS`` so nobody
+    else picks them up once the lock is released. Delivery then runs with
+    no transaction or row locks held, and the results are written back in
+    one update. A worker that dies mid-batch leaves its messages to be
+    retried when the lease expires.
+    """
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    max_attempts = max_attempts or settings.OUTBOX_MAX_ATTEMPTS
+    sent = failed = 0
+
+    with transaction.atomic():
+        batch = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True).filter(
+                status='PENDING',
+                next_attempt_at__lte=timezone.now()
+            ).order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        if not batch:
+            return 0, 0
+        OutboxEmail.objects.filter(pk__in=[message.pk for message in batch]).update(
+            next_attempt_at=timezone.now() + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS)
+        )
+
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as exc:
+        # Could not connect at all: every message used up an attempt
+        failed = sum(_record_failure(message, exc, max_attempts) for message in batch)
+    else:
+        try:
+            for message in batch:
+                try:
+                    connection.send_messages([EmailMessage(
+                        message.subject,
+                        message.body,
+                        settings.DEFAULT_FROM_EMAIL,
+                        [message.to],
+                        connection=connection,
+                    )])
+                except Exception as exc:
+                    failed += _record_failure(message, exc, max_attempts)
+                else:
+                    message.attempts += 1
+                    message.status = 'SENT'
+                    message.sent_at = timezone.now()
+                    sent += 1
+        finally:
+            connection.close()
+
+    OutboxEmail.objects.bulk_update(
+        batch,
+        ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at']
+    )
+    return sent, failed
@@ -0,0 +1,289 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def keyset_q(ordering, values):
+    """
+    Filter for rows strictly after ``values`` in ``ordering``.
+
+    ``ordering`` is a list of field names, optionally prefixed with '-',
+    and the comparison is lexicographic:
+    (a > x) OR (a = x AND b > y) OR (a = x AND b = y AND c > z) ...
+    Ordering fields must not be nullable.
+    """
+    condition = Q()
+    equal = Q()
+    for field, value in zip(ordering, values):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        condition |= equal & Q(**{f"{name}__{lookup}": value})
+        equal &= Q(**{name: value})
+    return condition
+
+
+def _encode_value(value):
+    # DjangoJSONEncoder truncates microseconds, which would skip rows
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination keyed on every column of the view's ordering.
+
+    Unlike ``PageNumberPagination`` there is no COUNT(*) and no OFFSET: a
+    page is fetched with ``WHERE (ordering) > (last row) LIMIT page_size``,
+    so deep pages cost the same as the first one. The ordering comes from
+    the view's ``OrderingFilter``/``ordering`` and always ends with ``id``
+    so positions are unique. Cursors are opaque and tied to the ordering
+    they were issued for.
+
+    ``?count=true`` (or ``count_results = True`` on a subclass) adds an
+    exact ``count`` of the filtered results. That is a COUNT(*) over every
+    matching row, so it is opt-in.
+    """
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    count_results = False
+    ordering = ('-created_at',)
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        position, self.reverse = self.decode_cursor(request, queryset.model)
+        ordering = self.ordering
+        if self.reverse:
+            ordering = [
+                field[1:] if field.startswith('-') else f"-{field}"
+                for field in ordering
+            ]
+
+        self.count = queryset.count() if self.wants_count(request) else None
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(keyset_q(ordering, position))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        if self.reverse:
+            results.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        self.page = results
+        return results
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                size = int(request.query_params[self.page_size_query_param])
+                if size > 0:
+                    return min(size, self.max_page_size)
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def wants_count(self, request):
+        if self.count_query_param and self.count_query_param in request.query_params:
+            return request.query_params[self.count_query_param].lower() in ('1', 'true', 'yes')
+        return self.count_results
+
+    def get_ordering(self, request, queryset, view):
+        ordering = None
+        for backend in getattr(view, 'filter_backends', []):
+            if issubclass(backend, OrderingFilter):
+                ordering = backend().get_ordering(request, queryset, view)
+                break
+
+        if not ordering:
+            ordering = getattr(view, 'ordering', None) or self.ordering
+        if isinstance(ordering, str):
+            ordering = [ordering]
+
+        ordering = list(ordering)
+        if not any(field.lstrip('-') in ('id', 'pk') for field in ordering):
+            ordering.append('id')
+        return ordering
+
+    def decode_cursor(self, request, model=None):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None, False
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            position = payload['p']
+            if payload['o'] != self.ordering or len(position) != len(self.ordering):
+                raise ValueError
+            if model is not None:
+                position = [
+                    self._parse_position_value(model, field.lstrip('-'), value)
+                    for field, value in zip(self.ordering, position)
+                ]
+            return position, bool(payload['r'])
+        except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _parse_position_value(self, model, path, value):
+        """Check a cursor value against the column it is compared with"""
+        if value is None:
+            raise ValueError("Ordering columns are not nullable")
+        field = None
+        for attr in path.split('__'):
+            if field is not None:
+                model = field.related_model
+            try:
+                field = model._meta.pk if attr == 'pk' else model._meta.get_field(attr)
+            except FieldDoesNotExist:
+                # An annotation; the database has the final say
+                return value
+        if field.is_relation:
+            field = field.target_field
+        return field.to_python(value)
+
+    def encode_cursor(self, instance, reverse):
+        position = [
+            _encode_value(self._get_position_value(instance, field.lstrip('-')))
+            for field in self.ordering
+        ]
+        payload = json.dumps({'p': position, 'o': self.ordering, 'r': int(reverse)})
+        encoded = base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def _get_position_value(self, instance, field):
+        value = instance
+        for attr in field.split('__'):
+            value = value.pk if attr == 'pk' else getattr(value, attr)
+        return value
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            url = self.request.build_absolute_uri()
+            return remove_query_param(url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        payload = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+        if self.count is not None:
+            payload = {'count': self.count, **payload}
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'count': {'type': 'integer', 'description': 'Only present when requested'},
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Opaque pagination cursor from a previous response',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Number of results to return per page',
+                'schema': {'type': 'integer'},
+            },
+            {
+                'name': self.count_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Include the exact number of matching results',
+                'schema': {'type': 'boolean'},
+            },
+        ]
+
+
+def estimated_row_count(model, using='default'):
+    """
+    Planner estimate of ``model``'s row count from ``pg_class.reltuples``,
+    or None when unavailable (other backends, or a never-analyzed table).
+    """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+            [connection.ops.quote_name(model._meta.db_table)]
+        )
+        row = cursor.fetchone()
+    if row is None or row[0] < 0:
+        return None
+    return row[0]
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Admin changelist paginator that doesn't COUNT(*) huge tables.
+
+    An unfiltered changelist takes its total from the planner statistics
+    once the table holds more than ``exact_count_threshold`` rows;
+    filtered ones (and small tables) are counted exactly. Pair it with
+    ``show_full_result_count = False`` on the ModelAdmin, which skips the
+    second, unfiltered count.
+    """
+    exact_count_threshold = 100_000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        query = getattr(queryset, 'query', None)
+        if query is not None and not query.where:
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate > self.exact_count_threshold:
+                return estimate
+        return super().count
@@ -0,0 +1,54 @@
+import re
+from contextlib import contextmanager
+
+from django.db import connection
+
+from .instrumentation import collect_queries
+
+
+def full_scans(queryset):
+    """
+    Return (plan, tables) where ``tables`` are the tables the database plans
+    to read with a sequential/full scan for ``queryset``.
+    """
+    plan = queryset.explain()
+    if connection.vendor == 'postgresql':
+        tables = re.findall(r'Seq Scan on (\w+)', plan)
+    elif connection.vendor == 'sqlite':
+        # "SCAN table" without "USING [COVERING] INDEX" reads every row
+        tables = re.findall(r'\bSCAN (\w+)(?! USING)(?:\s|$)', plan)
+    else:
+        tables = []
+    return plan, tables
+
+
+class QueryPlanAssertionsMixin:
+    """TestCase mixin for guarding hot queries against sequential scans"""
+
+    def assertNoFullScan(self, queryset, tables=None):
+        tables = tables or [queryset.model._meta.db_table]
+        plan, scanned = full_scans(queryset)
+        regressed = [table for table in scanned if table in tables]
+        if regressed:
+            self.fail(
+                f"Query plan scans {', '.join(regressed)} sequentially:\n"
+                f"{queryset.query}\n\n{plan}"
+            )
+
+
+class QueryBudgetMixin:
+    """TestCase mixin asserting that a block stays within a query budget"""
+
+    @contextmanager
+    def assertQueryBudget(self, budget):
+        with collect_queries() as collector:
+            yield collector
+
+        if collector.count > budget:
+            repeated = '\n'.join(
+                f"  {count}x {sql}" for sql, count in collector.repeated()
+            ) or '  (none)'
+            self.fail(
+                f"{collector.count} queries executed, budget is {budget}.\n"
+                f"Repeated statements:\n{repeated}"
+            )
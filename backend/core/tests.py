@@ -1,3 +1,326 @@
-from django.test import TestCase
+import base64
+import json
+from datetime import date, time, timedelta
+from urllib.parse import unquote
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.exceptions import ValidationError
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from appointment.models import Appointment
+from doctor.models import DoctorAvailability
+from patient.models import Patient
+from .datagen import generate_dataset
+from .instrumentation import collect_queries
+from .models import OutboxEmail
+from .outbox import drain_outbox, enqueue_email
+from .pagination import EstimatedCountPaginator
+from .testing import QueryBudgetMixin, QueryPlanAssertionsMixin
+
+
+class HotQueryPlanTests(QueryPlanAssertionsMixin, TestCase):
+    """
+    EXPLAIN the hottest queries against a realistically sized table and
+    fail if any of them regresses to a sequential scan.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = generate_dataset(
+            users=300,
+            doctors=200,
+            slots_per_doctor=100,
+            appointments=3000
+        )
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def test_user_appointment_list(self):
+        queryset = Appointment.objects.filter(
+            user=self.dataset.users[0]
+        ).order_by('-created_at', 'id')[:20]
+        self.assertNoFullScan(queryset)
+
+    def test_doctor_open_slots(self):
+        today = date.today()
+        queryset = DoctorAvailability.objects.filter(
+            doctor=self.dataset.doctors[0],
+            date__gte=today,
+            date__lte=today + timedelta(days=30),
+            is_available=True
+        ).order_by('date', 'start_time', 'id')[:20]
+        self.assertNoFullScan(queryset)
+
+    def test_earliest_open_slots(self):
+        queryset = DoctorAvailability.objects.filter(
+            is_available=True,
+            date__gte=date.today()
+        ).order_by('date', 'start_time', 'id')[:10]
+        self.assertNoFullScan(queryset)
+
+    def test_slot_overlap_check(self):
+        slot = self.dataset.slots[0]
+        queryset = DoctorAvailability.objects.filter(
+            doctor=slot.doctor,
+            date=slot.date,
+            start_time__lt=time(12),
+            end_time__gt=time(11)
+        ).exclude(pk=slot.pk)
+        self.assertNoFullScan(queryset)
+
+
+class FailingEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionRefusedError("SMTP server unavailable")
+
+
+class UnreachableEmailBackend(BaseEmailBackend):
+    def open(self):
+        raise ConnectionRefusedError("SMTP server unreachable")
+
+    def send_messages(self, email_messages):
+        raise AssertionError("send_messages called without a connection")
+
+
+class LeaseRecordingEmailBackend(BaseEmailBackend):
+    """Records each message's ``next_attempt_at`` as seen while it is sent"""
+    seen = []
+
+    def send_messages(self, email_messages):
+        self.seen.extend(OutboxEmail.objects.values_list('next_attempt_at', flat=True))
+        return len(email_messages)
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class OutboxTests(TestCase):
+
+    def test_drain_sends_due_messages(self):
+        enqueue_email('patient@example.com', 'Confirmed', 'See you soon')
+
+        self.assertEqual(drain_outbox(), (1, 0))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['patient@example.com'])
+        message = OutboxEmail.objects.get()
+        self.assertEqual(message.status, 'SENT')
+        self.assertIsNotNone(message.sent_at)
+
+    def test_messages_not_yet_due_are_skipped(self):
+        message = enqueue_email('patient@example.com', 'Confirmed', 'See you soon')
+        OutboxEmail.objects.filter(pk=message.pk).update(
+            next_attempt_at=timezone.now() + timedelta(minutes=5)
+        )
+
+        self.assertEqual(drain_outbox(), (0, 0))
+        self.assertEqual(len(mail.outbox), 0)
+
+    @override_settings(EMAIL_BACKEND='core.tests.FailingEmailBackend')
+    def test_failures_back_off_then_give_up(self):
+        enqueue_email('patient@example.com', 'Confirmed', 'See you soon')
+
+        self.assertEqual(drain_outbox(max_attempts=2), (0, 0))
+        message = OutboxEmail.objects.get()
+        self.assertEqual(message.status, 'PENDING')
+        self.assertEqual(message.attempts, 1)
+        self.assertGreater(message.next_attempt_at, timezone.now())
+        self.assertIn('unavailable', message.last_error)
+
+        OutboxEmail.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(drain_outbox(max_attempts=2), (0, 1))
+        self.assertEqual(OutboxEmail.objects.get().status, 'FAILED')
+
+    @override_settings(EMAIL_BACKEND='core.tests.UnreachableEmailBackend')
+    def test_connection_failures_count_as_attempts(self):
+        enqueue_email('patient@example.com', 'Confirmed', 'See you soon')
+
+        self.assertEqual(drain_outbox(max_attempts=2), (0, 0))
+        message = OutboxEmail.objects.get()
+        self.assertEqual(message.attempts, 1)
+        self.assertIn('unreachable', message.last_error)
+
+        OutboxEmail.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(drain_outbox(max_attempts=2), (0, 1))
+        self.assertEqual(OutboxEmail.objects.get().status, 'FAILED')
+
+    @override_settings(EMAIL_BACKEND='core.tests.LeaseRecordingEmailBackend')
+    def test_claimed_batch_is_hidden_while_sending(self):
+        enqueue_email('patient@example.com', 'Confirmed', 'See you soon')
+        LeaseRecordingEmailBackend.seen = []
+
+        self.assertEqual(drain_outbox(), (1, 0))
+        # Other workers skip the message until the lease runs out
+        self.assertGreater(LeaseRecordingEmailBackend.seen[0], timezone.now())
+        self.assertEqual(OutboxEmail.objects.get().status, 'SENT')
+
+
+class KeysetPaginationTests(QueryBudgetMixin, APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = generate_dataset(users=1, doctors=2, slots_per_doctor=12, appointments=0)
+        cls.ordered = list(
+            DoctorAvailability.objects.order_by('date', 'start_time', 'id').values_list('id', flat=True)
+        )
+
+    def get(self, url=None, **params):
+        response = self.client.get(url or reverse('doctor-availability-list'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def walk(self, data, link):
+        pages = [[row['id'] for row in data['results']]]
+        while data[link]:
+            data = self.get(data[link])
+            pages.append([row['id'] for row in data['results']])
+        return pages, data
+
+    def test_next_and_previous_round_trip(self):
+        forward, last = self.walk(self.get(page_size=5), 'next')
+        self.assertEqual([len(page) for page in forward], [5, 5, 5, 5, 4])
+        self.assertEqual(sum(forward, []), self.ordered)
+
+        backward, first = self.walk(last, 'previous')
+        self.assertEqual(backward, forward[::-1])
+        self.assertIsNone(first['previous'])
+
+    def test_reversed_ordering(self):
+        pages, _ = self.walk(self.get(page_size=7, ordering='-date,-start_time'), 'next')
+        # The appended id tie-breaker stays ascending
+        expected = list(
+            DoctorAvailability.objects.order_by('-date', '-start_time', 'id').values_list('id', flat=True)
+        )
+        self.assertEqual(sum(pages, []), expected)
+
+    def test_unsupported_ordering_falls_back_to_the_default(self):
+        pages, _ = self.walk(self.get(page_size=10, ordering='is_available'), 'next')
+        self.assertEqual(sum(pages, []), self.ordered)
+
+    def test_invalid_cursors_are_not_found(self):
+        url = reverse('doctor-availability-list')
+        next_link = self.get(page_size=5)['next']
+        cursor = next_link.split('cursor=')[1].split('&')[0]
+        tampered = base64.urlsafe_b64encode(json.dumps({'p': [1], 'o': ['id'], 'r': 0}).encode()).decode()
+        ordering = json.loads(base64.urlsafe_b64decode(unquote(cursor)))['o']
+        bad_value = base64.urlsafe_b64encode(
+            json.dumps({'p': ['garbage', 'x', 1], 'o': ordering, 'r': 0}).encode()
+        ).decode()
+
+        for params in [
+            {'cursor': 'not-a-cursor'},
+            {'cursor': tampered},
+            # Right shape, but not a date and a time
+            {'cursor': bad_value},
+            # Issued for another ordering
+            {'cursor': cursor, 'ordering': '-date'},
+        ]:
+            with self.subTest(params):
+                self.assertEqual(self.client.get(url, params).status_code, 404)
+
+    def test_count_is_opt_in(self):
+        self.assertNotIn('count', self.get(page_size=5))
+
+        with self.assertQueryBudget(2):
+            data = self.get(page_size=5, count='true')
+        self.assertEqual(data['count'], len(self.ordered))
+        self.assertEqual(self.get(data['next'])['count'], len(self.ordered))
+
+
+class DirtyFieldsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = generate_dataset(users=1, doctors=1, slots_per_doctor=2, appointments=1)
+
+    def test_unchanged_save_is_skipped(self):
+        patient = Patient.objects.get(pk=self.dataset.patients[0].pk)
+        with collect_queries() as collector:
+            patient.save()
+        self.assertEqual(collector.count, 0)
+        self.assertEqual(collector.saves['skipped'], 1)
+
+    def test_save_writes_only_changed_columns(self):
+        patient = Patient.objects.get(pk=self.dataset.patients[0].pk)
+        patient.medical_history = "Asthma"
+        with collect_queries() as collector:
+            patient.save()
+        self.assertEqual(collector.statements['UPDATE'], 1)
+        self.assertEqual(collector.saves['partial'], 1)
+        [sql] = collector.fingerprints
+        self.assertIn('"medical_history"', sql)
+        self.assertIn('"updated_at"', sql)
+        self.assertNotIn('"first_name"', sql)
+        self.assertFalse(patient.is_dirty())
+
+    def test_loading_a_deferred_field_keeps_other_edits(self):
+        patient = Patient.objects.only('id', 'first_name').get(pk=self.dataset.patients[0].pk)
+        patient.first_name = "Edited"
+        self.assertTrue(patient.last_name)  # loads the deferred column
+        patient.save()
+        self.assertEqual(Patient.objects.get(pk=patient.pk).first_name, "Edited")
+
+    def test_partial_refresh_keeps_other_edits(self):
+        patient = Patient.objects.get(pk=self.dataset.patients[0].pk)
+        patient.first_name = "Edited"
+        patient.refresh_from_db(fields=['age'])
+        self.assertEqual(patient.get_dirty_fields(), ['first_name'])
+        patient.save()
+        self.assertEqual(Patient.objects.get(pk=patient.pk).first_name, "Edited")
+
+    def test_validation_runs_for_validated_fields_only(self):
+        slot = DoctorAvailability.objects.get(pk=self.dataset.slots[1].pk)
+        slot.is_available = False
+        # The overlap check in clean() is skipped when only the flag changes
+        with self.assertNumQueries(1):
+            slot.save()
+
+        slot.end_time = slot.start_time
+        with self.assertRaises(ValidationError):
+            slot.save()
+
+    def test_unique_together_is_checked_when_one_field_changes(self):
+        patient = self.dataset.patients[0]
+        relation = next(value for value, _ in Patient.RELATION_CHOICES if value != patient.relation)
+        other = Patient.objects.create(
+            user=patient.user, relation=relation, title=patient.title, first_name="Second",
+            last_name=patient.last_name, gender=patient.gender, age=patient.age,
+        )
+        # Only relation is dirty, but (user, relation) is validated as a pair
+        other.relation = patient.relation
+        with self.assertRaises(ValidationError) as caught:
+            other.save()
+        self.assertIn('__all__', caught.exception.message_dict)
+
+
+class AdminChangelistTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = generate_dataset(users=5, doctors=5, slots_per_doctor=20, appointments=40)
+        cls.admin = get_user_model().objects.create_superuser(email='staff@example.com', password=None)
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def test_changelists_do_not_query_per_row(self):
+        names = [
+            'admin:appointment_appointment_changelist',
+            'admin:patient_patient_changelist',
+            'admin:doctor_doctoravailability_changelist',
+        ]
+        for name in names:
+            # Session, user, page count and rows; no per-row lookups for __str__
+            with self.subTest(name), self.assertQueryBudget(4):
+                response = self.client.get(reverse(name))
+            self.assertEqual(response.status_code, 200)
+
+    def test_add_form_uses_raw_id_for_slots(self):
+        response = self.client.get(reverse('admin:appointment_appointment_add'))
+        self.assertContains(response, 'vForeignKeyRawIdAdminField')
+        self.assertNotContains(response, f'<option value="{self.dataset.slots[0].pk}"')
+
+    def test_paginator_counts_exactly_without_statistics(self):
+        # SQLite has no planner estimate, and small tables are always counted
+        paginator = EstimatedCountPaginator(Appointment.objects.order_by('pk'), 10)
+        self.assertEqual(paginator.count, 40)
@@ -1,9 +1,7 @@
-from django.core.mail import send_mail
-from django.conf import settings
 from datetime import datetime, timedelta
 
-def send_appointment_confirmation(appointment):
-    """Send appointment confirmation email"""
+def appointment_confirmation_email(appointment):
+    """(to, subject, body) of the confirmation email for ``appointment``"""
     subject = f"Appointment Confirmation - {appointment.doctor.full_name}"
     message = f"""
     Dear {appointment.patient.full_name},
@@ -22,19 +20,21 @@ def send_appointment_confirmation(appointment):
     Healthcare Management System
     """
     
-    try:
-        send_mail(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            [appointment.user.email],
-            fail_silently=True,
-        )
-    except Exception as e:
-        print(f"Failed to send email: {e}")
+    return appointment.user.email, subject, message
+
+def send_appointment_confirmation(appointment):
+    """Queue appointment confirmation email in the current transaction"""
+    from .outbox import enqueue_email
+
+    return enqueue_email(*appointment_confirmation_email(appointment))
 
 def get_available_slots(doctor, date_from=None, date_to=None):
-    """Get available time slots for a doctor"""
+    """
+    Get available time slots for a doctor, straight from the database.
+
+    Callers that only need per-day open slots should use
+    ``doctor.availability_cache.get_availability_calendar`` instead.
+    """
     from doctor.models import DoctorAvailability
     from datetime import date
     
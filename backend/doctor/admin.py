@@ -1,3 +1,39 @@
 from django.contrib import admin
+from core.pagination import EstimatedCountPaginator
+from .models import Doctor, DoctorAvailability, DoctorSchedule, ScheduleException
 
-# Register your models here.
+@admin.register(Doctor)
+class DoctorAdmin(admin.ModelAdmin):
+    list_display = ('full_name', 'specialization', 'license_no', 'email', 'consultation_fee', 'is_active')
+    list_filter = ('specialization', 'is_active')
+    # Also backs the doctor autocomplete on the other admins
+    search_fields = ('first_name', 'last_name', 'license_no', 'email')
+    raw_id_fields = ('user',)
+    readonly_fields = ('created_at', 'updated_at')
+
+@admin.register(DoctorAvailability)
+class DoctorAvailabilityAdmin(admin.ModelAdmin):
+    list_display = ('doctor', 'date', 'start_time', 'end_time', 'is_available')
+    list_filter = ('is_available', 'date')
+    search_fields = ('doctor__first_name', 'doctor__last_name')
+    ordering = ('-date', 'start_time')
+    list_select_related = ('doctor',)
+    autocomplete_fields = ('doctor',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+@admin.register(DoctorSchedule)
+class DoctorScheduleAdmin(admin.ModelAdmin):
+    list_display = ('doctor', 'weekday', 'start_time', 'end_time', 'slot_minutes', 'is_active')
+    list_filter = ('weekday', 'is_active')
+    search_fields = ('doctor__first_name', 'doctor__last_name')
+    list_select_related = ('doctor',)
+    autocomplete_fields = ('doctor',)
+
+@admin.register(ScheduleException)
+class ScheduleExceptionAdmin(admin.ModelAdmin):
+    list_display = ('doctor', 'date', 'start_time', 'end_time', 'reason')
+    list_filter = ('date',)
+    search_fields = ('doctor__first_name', 'doctor__last_name', 'reason')
+    list_select_related = ('doctor',)
+    autocomplete_fields = ('doctor',)
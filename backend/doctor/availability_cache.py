@@ -0,0 +1,98 @@
+"""
+Cached per-day summaries of a doctor's open slots, behind the calendar
+endpoint.
+
+Only ``DoctorCalendarView`` reads through this cache. The availability
+list and ``core.utils.get_available_slots`` filter, order and paginate
+arbitrary slot sets, which per-day summaries cannot answer, so they query
+the database directly.
+"""
+import uuid
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import DoctorAvailability
+
+# Each doctor/day has a version token; summaries are stored under the token
+# that was current when they were read. Invalidation just swaps the token, so
+# a summary computed from a read that raced with a booking is never served.
+VERSION_KEY = 'availability-calendar:version:{doctor_id}:{day}'
+SUMMARY_KEY = 'availability-calendar:{doctor_id}:{day}:{version}'
+
+
+def _new_version():
+    return uuid.uuid4().hex
+
+
+def get_availability_calendar(doctor_id, date_from, date_to):
+    """
+    Per-day summary of a doctor's open slots between ``date_from`` and
+    ``date_to`` (inclusive), served from cache where possible. Days that
+    are missing from the cache are loaded with a single query.
+    """
+    timeout = settings.AVAILABILITY_CACHE_TIMEOUT
+    days = [date_from + timedelta(days=i) for i in range((date_to - date_from).days + 1)]
+
+    version_keys = {
+        day: VERSION_KEY.format(doctor_id=doctor_id, day=day.isoformat())
+        for day in days
+    }
+    versions = cache.get_many(version_keys.values())
+
+    new_versions = {
+        key: _new_version() for key in version_keys.values() if key not in versions
+    }
+    if new_versions:
+        cache.set_many(new_versions, timeout)
+        versions.update(new_versions)
+
+    summary_keys = {
+        day: SUMMARY_KEY.format(
+            doctor_id=doctor_id,
+            day=day.isoformat(),
+            version=versions[version_keys[day]]
+        )
+        for day in days
+    }
+    cached = cache.get_many(summary_keys.values())
+
+    missing = [day for day in days if summary_keys[day] not in cached]
+    if missing:
+        slots = defaultdict(list)
+        rows = DoctorAvailability.objects.filter(
+            doctor_id=doctor_id,
+            date__in=missing,
+            is_available=True
+        ).order_by('date', 'start_time').values_list('id', 'date', 'start_time', 'end_time')
+        for pk, day, start_time, end_time in rows:
+            slots[day].append({
+                'id': pk,
+                'start_time': start_time.isoformat(),
+                'end_time': end_time.isoformat(),
+            })
+
+        fresh = {
+            summary_keys[day]: {
+                'date': day.isoformat(),
+                'open_count': len(slots[day]),
+                'slots': slots[day],
+            }
+            for day in missing
+        }
+        cache.set_many(fresh, timeout)
+        cached.update(fresh)
+
+    return [cached[summary_keys[day]] for day in days]
+
+
+def invalidate_availability_calendar(doctor_days):
+    """Drop cached summaries for an iterable of (doctor_id, date) pairs"""
+    new_versions = {
+        VERSION_KEY.format(doctor_id=doctor_id, day=day.isoformat()): _new_version()
+        for doctor_id, day in set(doctor_days)
+    }
+    if new_versions:
+        cache.set_many(new_versions, settings.AVAILABILITY_CACHE_TIMEOUT)
@@ -0,0 +1,76 @@
+"""A doctor's own day/week: slots with their booking, plus counts by status"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db.models import Count, FilteredRelation, Q
+
+from .models import DoctorAvailability
+
+
+def build_schedule(doctor, date_from, date_to):
+    """
+    Slots between ``date_from`` and ``date_to`` with the active appointment
+    (if any) and patient joined in, then per-day appointment counts by
+    status (cancelled included). Two queries regardless of range size.
+    """
+    from appointment.models import Appointment
+
+    rows = DoctorAvailability.objects.filter(
+        doctor=doctor,
+        date__range=[date_from, date_to]
+    ).annotate(
+        booking=FilteredRelation('appointments', condition=~Q(appointments__status='CANCELLED'))
+    ).order_by('date', 'start_time').values(
+        'id', 'date', 'start_time', 'end_time', 'is_available',
+        'booking__id', 'booking__status', 'booking__symptoms',
+        'booking__patient__title', 'booking__patient__first_name',
+        'booking__patient__last_name', 'booking__patient__age',
+    )
+
+    counts = defaultdict(dict)
+    for row in Appointment.objects.filter(
+        doctor=doctor,
+        availability__date__range=[date_from, date_to]
+    ).values('availability__date', 'status').annotate(total=Count('id')).order_by():
+        counts[row['availability__date']][row['status']] = row['total']
+
+    statuses = [status for status, _ in Appointment.STATUS_CHOICES]
+    days = {}
+    day = date_from
+    while day <= date_to:
+        day_counts = {status: counts[day].get(status, 0) for status in statuses}
+        days[day] = {'date': day, 'counts': day_counts, 'open_slots': 0, 'slots': []}
+        day += timedelta(days=1)
+
+    for row in rows:
+        entry = days[row['date']]
+        appointment = None
+        if row['booking__id'] is not None:
+            appointment = {
+                'id': row['booking__id'],
+                'status': row['booking__status'],
+                'patient_name': "{} {} {}".format(
+                    row['booking__patient__title'],
+                    row['booking__patient__first_name'],
+                    row['booking__patient__last_name'],
+                ),
+                'patient_age': row['booking__patient__age'],
+                'symptoms': row['booking__symptoms'],
+            }
+        elif row['is_available']:
+            entry['open_slots'] += 1
+        entry['slots'].append({
+            'id': row['id'],
+            'start_time': row['start_time'],
+            'end_time': row['end_time'],
+            'is_available': row['is_available'],
+            'appointment': appointment,
+        })
+
+    totals = {status: sum(entry['counts'][status] for entry in days.values()) for status in statuses}
+    return {
+        'date_from': date_from,
+        'date_to': date_to,
+        'counts': totals,
+        'days': list(days.values()),
+    }
@@ -0,0 +1,82 @@
+"""
+Short-lived slot holds kept only in the shared cache.
+
+A patient who opens the booking form for a slot holds it for
+``SLOT_HOLD_SECONDS``; other patients see it as on hold and cannot book it
+until the hold expires or is released, so fewer booking attempts race for
+the same row. Holds are advisory and never written to the database: the
+conditional UPDATE in ``book_appointment`` remains the source of truth.
+Without REDIS_URL the cache is per process, so holds are only shared
+between requests served by the same worker.
+
+Each user holds at most one slot at a time: holding another slot releases
+the previous hold, so one account cannot lock every open slot.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+HOLD_KEY = 'slot-hold:{pk}'
+# The slot a user currently holds
+USER_HOLD_KEY = 'slot-hold:user:{user_id}'
+# add() attempts before giving up on a slot whose hold keeps changing hands
+HOLD_ATTEMPTS = 3
+
+
+def hold_slot(slot_id, user_id):
+    """
+    Hold ``slot_id`` for ``user_id`` and return the hold, or None if another
+    user holds it. Holding a slot again extends your own hold; holding a
+    different one releases the slot you held before.
+    """
+    hold = _claim(slot_id, user_id)
+    if hold is None:
+        return None
+
+    user_key = USER_HOLD_KEY.format(user_id=user_id)
+    previous = cache.get(user_key)
+    cache.set(user_key, slot_id, settings.SLOT_HOLD_SECONDS)
+    if previous is not None and previous != slot_id:
+        release_hold(previous, user_id)
+    return hold
+
+
+def _claim(slot_id, user_id):
+    key = HOLD_KEY.format(pk=slot_id)
+    hold = {'user': user_id, 'expires': time.time() + settings.SLOT_HOLD_SECONDS}
+    for _ in range(HOLD_ATTEMPTS):
+        if cache.add(key, hold, settings.SLOT_HOLD_SECONDS):
+            return hold
+        current = cache.get(key)
+        if current is None:
+            # Expired between add() and get(); claim it with add() again
+            # so a hold someone else takes meanwhile is not overwritten
+            continue
+        if current['user'] != user_id:
+            return None
+        cache.set(key, hold, settings.SLOT_HOLD_SECONDS)
+        return hold
+    return None
+
+
+def release_hold(slot_id, user_id=None):
+    """Drop the hold on ``slot_id``; with ``user_id``, only if that user holds it"""
+    key = HOLD_KEY.format(pk=slot_id)
+    if user_id is not None:
+        current = cache.get(key)
+        if current is None or current['user'] != user_id:
+            return False
+    cache.delete(key)
+    return True
+
+
+def get_holds(slot_ids):
+    """Map slot id to its hold for the held slots among ``slot_ids`` (one cache read)"""
+    keys = {HOLD_KEY.format(pk=pk): pk for pk in slot_ids}
+    return {keys[key]: hold for key, hold in cache.get_many(keys).items()}
+
+
+def held_by_other(slot_id, user_id):
+    hold = cache.get(HOLD_KEY.format(pk=slot_id))
+    return hold is not None and hold['user'] != user_id
@@ -0,0 +1,36 @@
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from doctor.scheduling import materialize_slots
+
+
+class Command(BaseCommand):
+    help = "Materialize DoctorAvailability slots from weekly doctor schedules"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=90, help='Horizon in days from --start')
+        parser.add_argument('--start', type=date.fromisoformat, default=None, help='First date (YYYY-MM-DD), defaults to today')
+        parser.add_argument('--doctor', type=int, action='append', dest='doctors', help='Limit to doctor id (repeatable)')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if options['days'] < 1:
+            raise CommandError("--days must be at least 1")
+
+        date_from = options['start'] or date.today()
+        date_to = date_from + timedelta(days=options['days'] - 1)
+
+        started = time.perf_counter()
+        created = materialize_slots(
+            date_from,
+            date_to,
+            doctor_ids=options['doctors'],
+            batch_size=options['batch_size']
+        )
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {created} slots for {date_from}..{date_to} in {elapsed:.2f}s"
+        ))
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctor', '0002_doctorschedule_scheduleexception'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='doctor',
+            index=models.Index(fields=['specialization', 'is_active'], name='doctor_spec_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='doctoravailability',
+            index=models.Index(condition=models.Q(('is_available', True)), fields=['date', 'start_time', 'id'], name='doctor_avail_open_idx'),
+        ),
+    ]
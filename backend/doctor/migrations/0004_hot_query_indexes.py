@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctor', '0003_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='doctoravailability',
+            index=models.Index(condition=models.Q(('is_available', True)), fields=['doctor', 'date', 'start_time'], name='doctor_avail_doc_open_idx'),
+        ),
+    ]
@@ -0,0 +1,120 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:36
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+POSTGRES_FORWARDS = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    CREATE TRIGGER doctor_search_vector_update
+    BEFORE INSERT OR UPDATE ON doctor_doctor
+    FOR EACH ROW EXECUTE PROCEDURE tsvector_update_trigger(
+        search_vector, 'pg_catalog.simple', first_name, last_name, specialization
+    )
+    """,
+    """
+    UPDATE doctor_doctor SET search_vector =
+        to_tsvector('pg_catalog.simple', coalesce(first_name, '') || ' ' ||
+                    coalesce(last_name, '') || ' ' || coalesce(specialization, ''))
+    """,
+    "CREATE INDEX doctor_search_vector_idx ON doctor_doctor USING gin (search_vector)",
+    "CREATE INDEX doctor_first_name_trgm_idx ON doctor_doctor USING gin (first_name gin_trgm_ops)",
+    "CREATE INDEX doctor_last_name_trgm_idx ON doctor_doctor USING gin (last_name gin_trgm_ops)",
+]
+
+POSTGRES_BACKWARDS = [
+    "DROP INDEX IF EXISTS doctor_last_name_trgm_idx",
+    "DROP INDEX IF EXISTS doctor_first_name_trgm_idx",
+    "DROP INDEX IF EXISTS doctor_search_vector_idx",
+    "DROP TRIGGER IF EXISTS doctor_search_vector_update ON doctor_doctor",
+]
+
+# External-content FTS5 table kept in sync with triggers; the trigram
+# tokenizer gives substring matches on names and specializations
+SQLITE_FORWARDS = [
+    """
+    CREATE VIRTUAL TABLE doctor_doctor_fts USING fts5(
+        first_name, last_name, specialization,
+        content='doctor_doctor', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER doctor_doctor_fts_insert AFTER INSERT ON doctor_doctor BEGIN
+        INSERT INTO doctor_doctor_fts(rowid, first_name, last_name, specialization)
+        VALUES (new.id, new.first_name, new.last_name, new.specialization);
+    END
+    """,
+    """
+    CREATE TRIGGER doctor_doctor_fts_delete AFTER DELETE ON doctor_doctor BEGIN
+        INSERT INTO doctor_doctor_fts(doctor_doctor_fts, rowid, first_name, last_name, specialization)
+        VALUES ('delete', old.id, old.first_name, old.last_name, old.specialization);
+    END
+    """,
+    """
+    CREATE TRIGGER doctor_doctor_fts_update AFTER UPDATE ON doctor_doctor BEGIN
+        INSERT INTO doctor_doctor_fts(doctor_doctor_fts, rowid, first_name, last_name, specialization)
+        VALUES ('delete', old.id, old.first_name, old.last_name, old.specialization);
+        INSERT INTO doctor_doctor_fts(rowid, first_name, last_name, specialization)
+        VALUES (new.id, new.first_name, new.last_name, new.specialization);
+    END
+    """,
+    "INSERT INTO doctor_doctor_fts(doctor_doctor_fts) VALUES ('rebuild')",
+]
+
+SQLITE_BACKWARDS = [
+    "DROP TRIGGER IF EXISTS doctor_doctor_fts_update",
+    "DROP TRIGGER IF EXISTS doctor_doctor_fts_delete",
+    "DROP TRIGGER IF EXISTS doctor_doctor_fts_insert",
+    "DROP TABLE IF EXISTS doctor_doctor_fts",
+]
+
+
+def _sqlite_has_fts5_trigram(connection):
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x, tokenize='trigram')")
+            cursor.execute("DROP TABLE temp.fts5_probe")
+        except Exception:
+            return False
+    return True
+
+
+def create_search_backend(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        statements = POSTGRES_FORWARDS
+    elif connection.vendor == 'sqlite' and _sqlite_has_fts5_trigram(connection):
+        statements = SQLITE_FORWARDS
+    else:
+        # doctor.search falls back to unindexed ICONTAINS matching
+        return
+
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_search_backend(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    statements = {
+        'postgresql': POSTGRES_BACKWARDS,
+        'sqlite': SQLITE_BACKWARDS,
+    }.get(vendor, [])
+
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctor', '0004_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='doctor',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_backend, drop_search_backend),
+    ]
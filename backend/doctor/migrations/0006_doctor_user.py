@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:59
+
+from importlib import import_module
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+doctor_search = import_module('doctor.migrations.0005_doctor_search')
+
+# Trigger statements from 0005 (insert, delete, update) plus the rebuild
+SQLITE_TRIGGERS = doctor_search.SQLITE_FORWARDS[1:]
+
+
+def restore_sqlite_search_triggers(apps, schema_editor):
+    """
+    Adding a unique column makes SQLite rebuild doctor_doctor, which drops
+    the triggers that keep doctor_doctor_fts in sync; put them back.
+    """
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'doctor_doctor_fts'")
+        if cursor.fetchone() is None:
+            return
+
+    for statement in doctor_search.SQLITE_BACKWARDS[:3] + SQLITE_TRIGGERS:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctor', '0005_doctor_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='doctor',
+            name='user',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='doctor', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(restore_sqlite_search_triggers, migrations.RunPython.noop),
+    ]
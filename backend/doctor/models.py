@@ -1,7 +1,12 @@
 from django.db import models
 from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator, MaxValueValidator
 from datetime import date, time
+from core.models import DirtyFieldsMixin
+
+# Version name for cached public doctor responses, bumped on every change
+DOCTOR_CACHE_TABLE = 'doctor'
 
 class Doctor(models.Model):
     GENDER_CHOICES = [
@@ -44,11 +49,24 @@ class Doctor(models.Model):
         max_digits=10, decimal_places=2, default=500.00
     )
     is_active = models.BooleanField(default=True)
+    # Login account of the doctor, for their own schedule
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="doctor"
+    )
+    # Maintained by a database trigger on PostgreSQL, see doctor.search
+    search_vector = SearchVectorField(null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['first_name', 'last_name']
+        indexes = [
+            models.Index(fields=['specialization', 'is_active'], name='doctor_spec_active_idx'),
+        ]
 
     def __str__(self):
         return f"Dr. {self.first_name} {self.last_name} - {self.get_specialization_display()}"
@@ -57,7 +75,7 @@ class Doctor(models.Model):
     def full_name(self):
         return f"Dr. {self.first_name} {self.last_name}"
 
-class DoctorAvailability(models.Model):
+class DoctorAvailability(DirtyFieldsMixin, models.Model):
     doctor = models.ForeignKey(
         Doctor, 
         on_delete=models.CASCADE, 
@@ -72,6 +90,20 @@ class DoctorAvailability(models.Model):
     class Meta:
         unique_together = ('doctor', 'date', 'start_time')
         ordering = ['date', 'start_time']
+        indexes = [
+            # Earliest-open-slot scans walk this in (date, start_time, id) order
+            models.Index(
+                fields=['date', 'start_time', 'id'],
+                condition=models.Q(is_available=True),
+                name='doctor_avail_open_idx'
+            ),
+            # Per-doctor open slot listing (DoctorAvailabilityListView, calendar)
+            models.Index(
+                fields=['doctor', 'date', 'start_time'],
+                condition=models.Q(is_available=True),
+                name='doctor_avail_doc_open_idx'
+            ),
+        ]
 
     def clean(self):
         from django.core.exceptions import ValidationError
@@ -96,9 +128,91 @@ class DoctorAvailability(models.Model):
         if overlapping.exists():
             raise ValidationError('This time slot overlaps with existing availability')
 
+    # clean() only reads these; booking or releasing a slot skips the overlap query
+    validated_fields = ('doctor', 'date', 'start_time', 'end_time')
+
     def save(self, *args, **kwargs):
-        self.full_clean()
+        self.full_clean_dirty()
         super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.doctor.full_name} - {self.date} ({self.start_time}-{self.end_time})"
+
+class DoctorSchedule(models.Model):
+    """Weekly working hours for a doctor, expanded into DoctorAvailability slots"""
+    WEEKDAY_CHOICES = [
+        (0, 'Monday'),
+        (1, 'Tuesday'),
+        (2, 'Wednesday'),
+        (3, 'Thursday'),
+        (4, 'Friday'),
+        (5, 'Saturday'),
+        (6, 'Sunday'),
+    ]
+
+    doctor = models.ForeignKey(
+        Doctor,
+        on_delete=models.CASCADE,
+        related_name="schedules"
+    )
+    weekday = models.PositiveSmallIntegerField(choices=WEEKDAY_CHOICES)
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    slot_minutes = models.PositiveIntegerField(
+        default=30,
+        validators=[MinValueValidator(5), MaxValueValidator(240)]
+    )
+    break_start = models.TimeField(blank=True, null=True)
+    break_end = models.TimeField(blank=True, null=True)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['doctor', 'weekday', 'start_time']
+
+    def clean(self):
+        from django.core.exceptions import ValidationError
+
+        if self.start_time >= self.end_time:
+            raise ValidationError({'end_time': 'End time must be after start time'})
+
+        if bool(self.break_start) != bool(self.break_end):
+            raise ValidationError('Break start and end must be set together')
+
+        if self.break_start and not (
+            self.start_time <= self.break_start < self.break_end <= self.end_time
+        ):
+            raise ValidationError({'break_end': 'Break must fall within working hours'})
+
+    def __str__(self):
+        return f"{self.doctor.full_name} - {self.get_weekday_display()} ({self.start_time}-{self.end_time})"
+
+class ScheduleException(models.Model):
+    """Day off or blocked period that overrides a doctor's weekly schedule"""
+    doctor = models.ForeignKey(
+        Doctor,
+        on_delete=models.CASCADE,
+        related_name="schedule_exceptions"
+    )
+    date = models.DateField()
+    # Leave both times empty to block the whole day
+    start_time = models.TimeField(blank=True, null=True)
+    end_time = models.TimeField(blank=True, null=True)
+    reason = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['date', 'start_time']
+
+    def clean(self):
+        from django.core.exceptions import ValidationError
+
+        if bool(self.start_time) != bool(self.end_time):
+            raise ValidationError('Start and end time must be set together')
+
+        if self.start_time and self.start_time >= self.end_time:
+            raise ValidationError({'end_time': 'End time must be after start time'})
+
+    def __str__(self):
+        return f"{self.doctor.full_name} - {self.date} ({self.reason or 'unavailable'})"
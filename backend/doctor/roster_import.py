@@ -0,0 +1,157 @@
+"""
+Doctor roster import for onboarding hospital groups.
+
+Rows are validated and written in chunks. Each chunk costs one lookup
+for existing doctors (by license number or email) and one upsert:
+``bulk_create(update_conflicts=True)`` keyed on ``license_no``. Known
+licenses are updated in place and new ones are inserted. ``bulk_create``
+sends no ``post_save`` signals, so the cached doctor responses are
+expired here, once per import.
+
+Recognised columns::
+
+    license_no, email, first_name, last_name, age, gender, address,
+    specialization, experience, phone_number, consultation_fee, is_active
+
+``consultation_fee`` and ``is_active`` are optional: a row that leaves
+them out (or blank) keeps the stored values of a known doctor, and a new
+doctor gets the model defaults. Rows are upserted in groups by which
+optional columns they supply, so only those are overwritten.
+"""
+from collections import defaultdict
+from dataclasses import dataclass, field
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+from core.caching import bump_table_version
+from core.importing import error_message, text
+from .models import Doctor, DOCTOR_CACHE_TABLE
+
+# Columns overwritten when a license number is already on file
+UPSERT_FIELDS = [
+    'email', 'first_name', 'last_name', 'age', 'gender', 'address', 'specialization',
+    'experience', 'phone_number', 'updated_at',
+]
+# Also overwritten, but only by rows that supply them
+OPTIONAL_FIELDS = ['consultation_fee', 'is_active']
+FALSE_VALUES = {'0', 'false', 'no', 'n', 'f'}
+
+
+@dataclass
+class RosterResult:
+    created: int = 0
+    updated: int = 0
+    errors: list = field(default_factory=list)  # (line, message)
+
+
+def _build_doctor(row):
+    doctor = Doctor(
+        license_no=text(row, 'license_no'),
+        email=text(row, 'email'),
+        first_name=text(row, 'first_name'),
+        last_name=text(row, 'last_name'),
+        age=text(row, 'age') or None,
+        gender=text(row, 'gender').upper()[:1],
+        address=text(row, 'address'),
+        specialization=text(row, 'specialization').lower().replace(' ', '_'),
+        experience=text(row, 'experience') or None,
+        phone_number=text(row, 'phone_number'),
+    )
+    if text(row, 'consultation_fee'):
+        doctor.consultation_fee = text(row, 'consultation_fee')
+    if text(row, 'is_active'):
+        doctor.is_active = text(row, 'is_active').lower() not in FALSE_VALUES
+    doctor.clean_fields(exclude=['photo', 'user', 'search_vector'])
+    return doctor
+
+
+def _supplied_fields(row):
+    """The optional columns ``row`` gives a value for"""
+    return tuple(name for name in OPTIONAL_FIELDS if text(row, name))
+
+
+def _import_chunk(chunk, result):
+    doctors = []
+    licenses, emails = set(), set()
+    for line, row in chunk:
+        if not isinstance(row, dict):
+            result.errors.append((line, f"Invalid JSON object: {row}"))
+            continue
+        try:
+            doctor = _build_doctor(row)
+        except ValidationError as exc:
+            result.errors.append((line, error_message(exc)))
+            continue
+        if doctor.license_no in licenses or doctor.email in emails:
+            result.errors.append((line, "Duplicate license number or email in this file"))
+            continue
+        licenses.add(doctor.license_no)
+        emails.add(doctor.email)
+        doctors.append((line, doctor, _supplied_fields(row)))
+
+    # One lookup per chunk: which licenses exist, and who owns each email
+    existing = Doctor.objects.filter(
+        Q(license_no__in=licenses) | Q(email__in=emails)
+    ).order_by().values_list('license_no', 'email')
+    known_licenses = set()
+    email_owner = {}
+    for license_no, email in existing:
+        known_licenses.add(license_no)
+        email_owner[email] = license_no
+
+    valid = []
+    groups = defaultdict(list)
+    for line, doctor, supplied in doctors:
+        owner = email_owner.get(doctor.email)
+        if owner is not None and owner != doctor.license_no:
+            result.errors.append((line, f"Email is already used by license {owner}"))
+        else:
+            valid.append((line, doctor))
+            groups[supplied].append(doctor)
+    if not valid:
+        return
+
+    try:
+        with transaction.atomic():
+            # One upsert per combination of optional columns, usually one per file
+            for supplied, group in groups.items():
+                Doctor.objects.bulk_create(
+                    group,
+                    update_conflicts=True,
+                    unique_fields=['license_no'],
+                    update_fields=UPSERT_FIELDS + list(supplied)
+                )
+    except IntegrityError:
+        # An email was taken by a concurrent change since the lookup above
+        result.errors.extend(
+            (line, "Conflicted with a concurrent change; re-run to import")
+            for line, _ in valid
+        )
+        return
+
+    updated = sum(1 for _, doctor in valid if doctor.license_no in known_licenses)
+    result.updated += updated
+    result.created += len(valid) - updated
+
+
+def import_roster(rows, batch_size=1000):
+    """
+    Import ``(line_number, row)`` pairs, as produced by
+    ``core.importing.read_rows``, in chunks of ``batch_size``. Invalid or
+    conflicting rows are skipped and reported in the result, and each
+    chunk commits on its own.
+    """
+    result = RosterResult()
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, batch_size))
+        if not chunk:
+            break
+        _import_chunk(chunk, result)
+
+    if result.created or result.updated:
+        transaction.on_commit(lambda: bump_table_version(DOCTOR_CACHE_TABLE))
+    return result
@@ -0,0 +1,161 @@
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+from django.db import transaction
+
+from .availability_cache import invalidate_availability_calendar
+from .models import Doctor, DoctorAvailability, DoctorSchedule, ScheduleException
+
+DOCTOR_CHUNK_SIZE = 50
+
+
+def _schedule_slots(schedule):
+    """Yield (start_time, end_time) for every slot a schedule produces in one day"""
+    step = timedelta(minutes=schedule.slot_minutes)
+    day = date.min
+    current = datetime.combine(day, schedule.start_time)
+    end = datetime.combine(day, schedule.end_time)
+
+    while current + step <= end:
+        slot_start, slot_end = current.time(), (current + step).time()
+        current += step
+
+        if schedule.break_start and slot_start < schedule.break_end and slot_end > schedule.break_start:
+            continue
+        yield slot_start, slot_end
+
+
+class _DayIntervals:
+    """Occupied time on one doctor's day, kept as sorted disjoint intervals"""
+
+    def __init__(self):
+        self.starts = []
+        self.ends = []
+
+    def add(self, start, end):
+        # Merge with every interval it touches so the lists stay disjoint
+        lo = bisect_left(self.ends, start)
+        hi = bisect_right(self.starts, end)
+        if lo < hi:
+            start = min(start, self.starts[lo])
+            end = max(end, self.ends[hi - 1])
+        self.starts[lo:hi] = [start]
+        self.ends[lo:hi] = [end]
+
+    def overlaps(self, start, end):
+        index = bisect_left(self.starts, end)
+        # Only the interval starting right before ``end`` can overlap,
+        # since intervals are non-overlapping and sorted by start
+        return index > 0 and self.ends[index - 1] > start
+
+
+def materialize_slots(date_from, date_to, doctor_ids=None, batch_size=1000):
+    """
+    Expand active weekly schedules into DoctorAvailability rows for
+    ``date_from``..``date_to`` (inclusive) and return the number created.
+
+    Existing slots and schedule exceptions are loaded once per chunk of
+    doctors and overlap detection is done in memory, so the database sees
+    a handful of reads and batched inserts instead of a full_clean() and
+    overlap query per slot. Slots that would overlap anything already
+    booked or blocked are skipped, which makes re-running idempotent.
+    """
+    date_from = max(date_from, date.today())
+    if date_from > date_to:
+        return 0
+
+    doctors = Doctor.objects.filter(is_active=True, schedules__is_active=True).distinct()
+    if doctor_ids:
+        doctors = doctors.filter(id__in=doctor_ids)
+    doctor_ids = list(doctors.order_by('id').values_list('id', flat=True))
+
+    created = 0
+    for offset in range(0, len(doctor_ids), DOCTOR_CHUNK_SIZE):
+        chunk = doctor_ids[offset:offset + DOCTOR_CHUNK_SIZE]
+        with transaction.atomic():
+            created += _materialize_chunk(chunk, date_from, date_to, batch_size)
+    return created
+
+
+def _materialize_chunk(doctor_ids, date_from, date_to, batch_size):
+    schedules = defaultdict(list)
+    for schedule in DoctorSchedule.objects.filter(doctor_id__in=doctor_ids, is_active=True):
+        schedules[(schedule.doctor_id, schedule.weekday)].append(schedule)
+
+    blocked_days = set()
+    occupied = defaultdict(_DayIntervals)
+
+    exceptions = ScheduleException.objects.filter(
+        doctor_id__in=doctor_ids,
+        date__range=[date_from, date_to]
+    ).values_list('doctor_id', 'date', 'start_time', 'end_time')
+    for doctor_id, day, start_time, end_time in exceptions:
+        if start_time is None:
+            blocked_days.add((doctor_id, day))
+        else:
+            occupied[(doctor_id, day)].add(start_time, end_time)
+
+    existing = DoctorAvailability.objects.filter(
+        doctor_id__in=doctor_ids,
+        date__range=[date_from, date_to]
+    ).values_list('doctor_id', 'date', 'start_time', 'end_time')
+    for doctor_id, day, start_time, end_time in existing:
+        occupied[(doctor_id, day)].add(start_time, end_time)
+
+    new_slots = []
+    days = (date_to - date_from).days + 1
+    for doctor_id in doctor_ids:
+        for offset in range(days):
+            day = date_from + timedelta(days=offset)
+            key = (doctor_id, day)
+            if key in blocked_days:
+                continue
+
+            for schedule in schedules.get((doctor_id, day.weekday()), []):
+                for start_time, end_time in _schedule_slots(schedule):
+                    intervals = occupied[key]
+                    if intervals.overlaps(start_time, end_time):
+                        continue
+                    intervals.add(start_time, end_time)
+                    new_slots.append(DoctorAvailability(
+                        doctor_id=doctor_id,
+                        date=day,
+                        start_time=start_time,
+                        end_time=end_time,
+                    ))
+
+    inserted = _insert_slots(new_slots, doctor_ids, date_from, date_to, batch_size)
+    # bulk_create skips post_save, so refresh the cached calendar days here
+    doctor_days = {(slot.doctor_id, slot.date) for slot in inserted}
+    transaction.on_commit(lambda: invalidate_availability_calendar(doctor_days))
+    # ...and count the new slots in the appointment reporting summaries
+    from appointment.summaries import record_slots
+    record_slots((slot.doctor_id, slot.date) for slot in inserted)
+    return len(inserted)
+
+
+def _insert_slots(slots, doctor_ids, date_from, date_to, batch_size):
+    """
+    Insert ``slots`` and return the ones actually written.
+
+    ignore_conflicts covers slots inserted concurrently since we read them,
+    but it reports nothing back (and sets no primary keys), so the rows
+    are read again: a slot is ours if the stored row for its key carries
+    the ``created_at`` stamped on it here.
+    """
+    if not slots:
+        return []
+    DoctorAvailability.objects.bulk_create(slots, batch_size=batch_size, ignore_conflicts=True)
+    stored = dict(
+        ((doctor_id, day, start_time), created_at)
+        for doctor_id, day, start_time, created_at in DoctorAvailability.objects.filter(
+            doctor_id__in=doctor_ids,
+            date__range=[date_from, date_to],
+            created_at__gte=min(slot.created_at for slot in slots),
+        ).values_list('doctor_id', 'date', 'start_time', 'created_at')
+    )
+    return [
+        slot for slot in slots
+        if stored.get((slot.doctor_id, slot.date, slot.start_time)) == slot.created_at
+    ]
@@ -0,0 +1,132 @@
+"""
+Indexed doctor directory search.
+
+PostgreSQL matches against a trigger-maintained ``search_vector`` (GIN,
+prefix matching on every term) or, per term, trigram similarity on names
+(GIN ``gin_trgm_ops``, tolerant to typos). SQLite uses an FTS5 trigram table created by the
+``doctor`` migrations. Anything else falls back to ICONTAINS.
+"""
+import re
+
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+
+SEARCH_FIELDS = ['first_name', 'last_name', 'specialization']
+
+
+def _terms(query):
+    return re.findall(r'\w+', query.lower())
+
+
+class BasicDoctorSearch:
+    """Unindexed fallback: every term must appear in one of the fields"""
+
+    def search(self, queryset, query, rank=False):
+        terms = _terms(query)
+        if not terms:
+            return queryset.none()
+
+        for term in terms:
+            condition = Q()
+            for field in SEARCH_FIELDS:
+                condition |= Q(**{f"{field}__icontains": term})
+            queryset = queryset.filter(condition)
+
+        if rank:
+            queryset = queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+        return queryset
+
+
+class PostgresDoctorSearch:
+    def search(self, queryset, query, rank=False):
+        from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+        from django.db.models import F
+        from django.db.models.functions import Greatest
+
+        terms = _terms(query)
+        if not terms:
+            return queryset.none()
+
+        # Prefix match every term, e.g. "card smi" -> card:* & smi:*
+        ts_query = SearchQuery(
+            ' & '.join(f"{term}:*" for term in terms),
+            config='simple',
+            search_type='raw'
+        )
+
+        # Trigrams are compared per term: "jonathon cardio" as a whole is
+        # similar to no single name, while "jonathon" is close to "jonathan"
+        condition = Q(search_vector=ts_query)
+        for term in terms:
+            condition |= Q(first_name__trigram_similar=term) | Q(last_name__trigram_similar=term)
+        queryset = queryset.filter(condition)
+
+        if rank:
+            # Summed per term, so doctors matching more of the query rank higher
+            search_rank = SearchRank(F('search_vector'), ts_query)
+            for term in terms:
+                search_rank += Greatest(
+                    TrigramSimilarity('first_name', term),
+                    TrigramSimilarity('last_name', term)
+                )
+            queryset = queryset.annotate(search_rank=search_rank)
+        return queryset
+
+
+class SQLiteDoctorSearch:
+    fts_table = 'doctor_doctor_fts'
+
+    def search(self, queryset, query, rank=False):
+        terms = _terms(query)
+        # The trigram tokenizer cannot match terms shorter than 3 characters
+        if not terms or any(len(term) < 3 for term in terms):
+            return BasicDoctorSearch().search(queryset, query, rank=rank)
+
+        match = ' '.join(f'"{term}"' for term in terms)
+        queryset = queryset.filter(id__in=RawSQL(
+            f"SELECT rowid FROM {self.fts_table} WHERE {self.fts_table} MATCH %s",
+            [match]
+        ))
+
+        if rank:
+            table = queryset.model._meta.db_table
+            queryset = queryset.annotate(search_rank=RawSQL(
+                f"SELECT -bm25({self.fts_table}) FROM {self.fts_table} "
+                f"WHERE {self.fts_table} MATCH %s AND rowid = {table}.id",
+                [match],
+                output_field=FloatField()
+            ))
+        return queryset
+
+
+_backend = None
+
+
+def get_search_backend():
+    global _backend
+    if _backend is None:
+        if connection.vendor == 'postgresql':
+            _backend = PostgresDoctorSearch()
+        elif (connection.vendor == 'sqlite' and
+              SQLiteDoctorSearch.fts_table in connection.introspection.table_names()):
+            _backend = SQLiteDoctorSearch()
+        else:
+            _backend = BasicDoctorSearch()
+    return _backend
+
+
+def search_doctors(queryset, query, rank=False):
+    """Filter ``queryset`` to doctors matching ``query``, optionally annotating ``search_rank``"""
+    return get_search_backend().search(queryset, query, rank=rank)
+
+
+class DoctorSearchFilter(filters.SearchFilter):
+    """Drop-in replacement for SearchFilter that uses the indexed backend"""
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+        return search_doctors(queryset, query)
@@ -1,8 +1,9 @@
 from rest_framework import serializers
+from core.fieldsets import SparseFieldsetSerializerMixin
 from .models import Doctor, DoctorAvailability
 from datetime import date
 
-class DoctorSerializer(serializers.ModelSerializer):
+class DoctorSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     full_name = serializers.ReadOnlyField()
     specialization_display = serializers.CharField(
         source='get_specialization_display', 
@@ -17,8 +18,18 @@ class DoctorSerializer(serializers.ModelSerializer):
             "license_no", "experience", "consultation_fee",
             "photo", "is_active"
         ]
+        field_dependencies = {
+            "full_name": ["first_name", "last_name"],
+            "specialization_display": ["specialization"],
+        }
 
-class DoctorAvailabilitySerializer(serializers.ModelSerializer):
+class DoctorSearchParamsSerializer(serializers.Serializer):
+    """Query parameters for the ranked doctor search"""
+    q = serializers.CharField(max_length=100)
+    specialization = serializers.ChoiceField(choices=Doctor.SPECIALIZATIONS, required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=20)
+
+class DoctorAvailabilitySerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     doctor_name = serializers.CharField(source='doctor.full_name', read_only=True)
     doctor_specialization = serializers.CharField(
         source='doctor.get_specialization_display', 
@@ -31,6 +42,10 @@ class DoctorAvailabilitySerializer(serializers.ModelSerializer):
             "id", "doctor", "doctor_name", "doctor_specialization", 
             "date", "start_time", "end_time", "is_available"
         ]
+        field_dependencies = {
+            "doctor_name": ["doctor__first_name", "doctor__last_name"],
+            "doctor_specialization": ["doctor__specialization"],
+        }
         
     def validate_date(self, value):
         if value < date.today():
@@ -47,4 +62,105 @@ class DoctorAvailabilitySerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 {"end_time": "End time must be after start time"}
             )
-        return data
\ No newline at end of file
+        return data
+
+class HeldAvailabilitySerializer(DoctorAvailabilitySerializer):
+    """Adds whether another patient is holding the slot (``holds`` in context)"""
+    on_hold = serializers.SerializerMethodField()
+
+    class Meta(DoctorAvailabilitySerializer.Meta):
+        fields = DoctorAvailabilitySerializer.Meta.fields + ["on_hold"]
+        # Reads the hold map from the context, keyed by id
+        field_dependencies = {
+            **DoctorAvailabilitySerializer.Meta.field_dependencies,
+            "on_hold": [],
+        }
+
+    def get_on_hold(self, obj):
+        hold = self.context.get('holds', {}).get(obj.id)
+        request = self.context.get('request')
+        return hold is not None and hold['user'] != getattr(request.user, 'id', None)
+
+class AvailabilitySearchResultSerializer(DoctorAvailabilitySerializer):
+    consultation_fee = serializers.DecimalField(
+        source='doctor.consultation_fee',
+        max_digits=10,
+        decimal_places=2,
+        read_only=True
+    )
+    doctor_experience = serializers.IntegerField(source='doctor.experience', read_only=True)
+
+    class Meta(DoctorAvailabilitySerializer.Meta):
+        fields = DoctorAvailabilitySerializer.Meta.fields + [
+            "consultation_fee", "doctor_experience"
+        ]
+
+class AvailabilitySearchSerializer(serializers.Serializer):
+    """Query parameters for the next-available-slot search"""
+    specialization = serializers.ChoiceField(choices=Doctor.SPECIALIZATIONS, required=False)
+    min_fee = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    max_fee = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    min_experience = serializers.IntegerField(min_value=0, required=False)
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    time_from = serializers.TimeField(required=False)
+    time_to = serializers.TimeField(required=False)
+
+    def validate(self, data):
+        if 'min_fee' in data and 'max_fee' in data and data['min_fee'] > data['max_fee']:
+            raise serializers.ValidationError(
+                {"max_fee": "Maximum fee must not be below minimum fee"}
+            )
+        if 'time_from' in data and 'time_to' in data and data['time_from'] >= data['time_to']:
+            raise serializers.ValidationError(
+                {"time_to": "End time must be after start time"}
+            )
+        if 'date_from' in data and 'date_to' in data and data['date_from'] > data['date_to']:
+            raise serializers.ValidationError(
+                {"date_to": "End date must not be before start date"}
+            )
+        return data
+
+class AvailabilityCalendarSerializer(serializers.Serializer):
+    """Query parameters for a doctor's availability calendar"""
+    date_from = serializers.DateField(required=False)
+    days = serializers.IntegerField(min_value=1, max_value=31, default=14)
+
+class DoctorScheduleParamsSerializer(serializers.Serializer):
+    """Query parameters for a doctor's own schedule; admins may pick the doctor"""
+    date = serializers.DateField(required=False)
+    days = serializers.IntegerField(min_value=1, max_value=7, default=1)
+    doctor = serializers.IntegerField(min_value=1, required=False)
+
+class GenerateAvailabilitySerializer(serializers.Serializer):
+    MAX_HORIZON_DAYS = 366
+
+    date_from = serializers.DateField()
+    date_to = serializers.DateField()
+    doctors = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        allow_empty=False
+    )
+
+    def validate(self, data):
+        if data['date_from'] > data['date_to']:
+            raise serializers.ValidationError(
+                {"date_to": "End date must not be before start date"}
+            )
+        if (data['date_to'] - data['date_from']).days >= self.MAX_HORIZON_DAYS:
+            raise serializers.ValidationError(
+                {"date_to": f"Cannot generate more than {self.MAX_HORIZON_DAYS} days at once"}
+            )
+        return data
+
+class RosterImportSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    # Defaults to the file extension; not ``format``, which DRF reserves
+    file_format = serializers.ChoiceField(choices=['csv', 'ndjson'], required=False)
+
+    def validate(self, data):
+        if 'file_format' not in data:
+            name = data['file'].name or ''
+            data['file_format'] = 'ndjson' if name.endswith(('.ndjson', '.jsonl')) else 'csv'
+        return data
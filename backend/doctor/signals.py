@@ -0,0 +1,19 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from core.caching import bump_table_version
+from .availability_cache import invalidate_availability_calendar
+from .models import Doctor, DoctorAvailability, DOCTOR_CACHE_TABLE
+
+@receiver(post_save, sender=DoctorAvailability)
+@receiver(post_delete, sender=DoctorAvailability)
+def invalidate_calendar_day(sender, instance, **kwargs):
+    """Refresh the cached calendar day once the slot change is committed"""
+    doctor_days = [(instance.doctor_id, instance.date)]
+    transaction.on_commit(lambda: invalidate_availability_calendar(doctor_days))
+
+@receiver(post_save, sender=Doctor)
+@receiver(post_delete, sender=Doctor)
+def invalidate_doctor_responses(sender, instance, **kwargs):
+    """Expire cached doctor list/detail responses once the change is committed"""
+    transaction.on_commit(lambda: bump_table_version(DOCTOR_CACHE_TABLE))
@@ -1,3 +1,631 @@
-from django.test import TestCase
+from datetime import date, time, timedelta
+from io import StringIO
+from unittest import skipUnless
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from appointment.models import Appointment
+from appointment.services import book_appointment, cancel_appointment
+from core.caching import get_table_version
+from core.datagen import generate_dataset
+from core.importing import read_rows
+from core.testing import QueryBudgetMixin
+from .availability_cache import get_availability_calendar
+from .holds import get_holds, hold_slot
+from .models import Doctor, DoctorAvailability, DoctorSchedule, ScheduleException, DOCTOR_CACHE_TABLE
+from .roster_import import import_roster
+from .scheduling import _insert_slots, materialize_slots
+from .search import get_search_backend, search_doctors
+
+User = get_user_model()
+
+
+class DoctorQueryBudgetTests(QueryBudgetMixin, APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = generate_dataset(users=1, doctors=5, slots_per_doctor=20, appointments=5)
+        cls.doctor = cls.dataset.doctors[0]
+        cls.admin = User.objects.create_superuser(email='admin@example.com', password=None)
+        # Backend detection inspects the schema once per process
+        get_search_backend()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_list(self):
+        with self.assertQueryBudget(1):
+            response = self.client.get(reverse('doctor-list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 5)
+
+    def test_list_search(self):
+        with self.assertQueryBudget(1):
+            response = self.client.get(reverse('doctor-list'), {'search': self.doctor.first_name})
+        self.assertEqual(response.status_code, 200)
+
+    def test_retrieve(self):
+        with self.assertQueryBudget(1):
+            response = self.client.get(reverse('doctor-detail', args=[self.doctor.id]))
+        self.assertEqual(response.status_code, 200)
+
+    def test_search(self):
+        with self.assertQueryBudget(1):
+            response = self.client.get(reverse('doctor-search'), {'q': self.doctor.last_name})
+        self.assertEqual(response.status_code, 200)
+
+    def test_calendar(self):
+        with self.assertQueryBudget(1):
+            response = self.client.get(reverse('doctor-calendar', args=[self.doctor.id]))
+        self.assertEqual(response.status_code, 200)
+
+    def test_availability_list(self):
+        with self.assertQueryBudget(1):
+            response = self.client.get(reverse('doctor-availability-list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 20)
+
+    def test_availability_search(self):
+        with self.assertQueryBudget(1):
+            response = self.client.get(reverse('doctor-availability-search'), {'limit': 20})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 20)
+
+    def test_availability_create(self):
+        self.client.force_authenticate(self.admin)
+        # Includes counting the slot in the doctor's daily summary
+        with self.assertQueryBudget(8):
+            response = self.client.post(reverse('doctor-availability-create'), {
+                'doctor': self.doctor.id,
+                'date': (date.today() + timedelta(days=60)).isoformat(),
+                'start_time': '09:00',
+                'end_time': '09:30',
+            })
+        self.assertEqual(response.status_code, 201)
+
+    def test_availability_generate(self):
+        for weekday in range(7):
+            DoctorSchedule.objects.create(
+                doctor=self.doctor,
+                weekday=weekday,
+                start_time=time(9),
+                end_time=time(12),
+            )
+        self.client.force_authenticate(self.admin)
+        today = date.today() + timedelta(days=60)
+        # Summaries for all 14 days cost one insert and one update, and the
+        # inserted slots are read back once to count them
+        with self.assertQueryBudget(10):
+            response = self.client.post(reverse('doctor-availability-generate'), {
+                'date_from': today.isoformat(),
+                'date_to': (today + timedelta(days=13)).isoformat(),
+            }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created'], 14 * 6)
+
+    def test_materialize_counts_only_inserted_slots(self):
+        day = date.today() + timedelta(days=60)
+        taken = DoctorAvailability.objects.create(
+            doctor=self.doctor, date=day, start_time=time(9), end_time=time(9, 30)
+        )
+        # As if another worker inserted ``taken`` after this run read the day
+        slots = [
+            DoctorAvailability(doctor=self.doctor, date=day, start_time=start, end_time=end)
+            for start, end in [(time(9), time(9, 30)), (time(9, 30), time(10))]
+        ]
+        inserted = _insert_slots(slots, [self.doctor.id], day, day, batch_size=100)
+
+        self.assertEqual([slot.start_time for slot in inserted], [time(9, 30)])
+        self.assertEqual(DoctorAvailability.objects.get(date=day, start_time=time(9)).pk, taken.pk)
+
+
+class MaterializeSlotsTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.doctor = generate_dataset(users=0, doctors=1, slots_per_doctor=0, appointments=0).doctors[0]
+        cls.day = date.today() + timedelta(days=60)
+        # 09:00-12:00 in 30 minute slots with a 10:00-10:30 break
+        DoctorSchedule.objects.create(
+            doctor=cls.doctor, weekday=cls.day.weekday(), start_time=time(9), end_time=time(12),
+            break_start=time(10), break_end=time(10, 30),
+        )
+
+    def materialize(self):
+        return materialize_slots(self.day, self.day, doctor_ids=[self.doctor.id])
+
+    def start_times(self):
+        return list(
+            DoctorAvailability.objects.filter(doctor=self.doctor, date=self.day)
+            .order_by('start_time').values_list('start_time', flat=True)
+        )
+
+    def test_break_is_skipped(self):
+        self.assertEqual(self.materialize(), 5)
+        self.assertEqual(
+            self.start_times(),
+            [time(9), time(9, 30), time(10, 30), time(11), time(11, 30)]
+        )
+
+    def test_full_day_exception_blocks_the_day(self):
+        ScheduleException.objects.create(doctor=self.doctor, date=self.day)
+        self.assertEqual(self.materialize(), 0)
+
+    def test_partial_exception_blocks_its_period(self):
+        ScheduleException.objects.create(
+            doctor=self.doctor, date=self.day, start_time=time(11), end_time=time(12)
+        )
+        self.assertEqual(self.materialize(), 3)
+        self.assertEqual(self.start_times(), [time(9), time(9, 30), time(10, 30)])
+
+    def test_times_overlapping_existing_slots_are_skipped(self):
+        DoctorAvailability.objects.create(
+            doctor=self.doctor, date=self.day, start_time=time(9, 15), end_time=time(9, 45)
+        )
+        self.assertEqual(self.materialize(), 3)
+        self.assertEqual(self.start_times(), [time(9, 15), time(10, 30), time(11), time(11, 30)])
+
+    def test_rerun_creates_nothing(self):
+        self.assertEqual(self.materialize(), 5)
+        self.assertEqual(self.materialize(), 0)
+        self.assertEqual(len(self.start_times()), 5)
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=True)
+class DoctorResponseCacheTests(QueryBudgetMixin, APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.doctor = generate_dataset(users=0, doctors=2, slots_per_doctor=0, appointments=0).doctors[0]
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('doctor-detail', args=[self.doctor.id])
+
+    def test_repeat_reads_come_from_cache(self):
+        first = self.client.get(self.url)
+        with self.assertQueryBudget(0):
+            second = self.client.get(self.url)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_matching_etag_is_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.assertQueryBudget(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_write_bumps_the_version_and_invalidates(self):
+        etag = self.client.get(self.url)['ETag']
+        version = get_table_version(DOCTOR_CACHE_TABLE)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            doctor = Doctor.objects.get(pk=self.doctor.pk)
+            doctor.first_name = "Renamed"
+            doctor.save()
+        self.assertNotEqual(get_table_version(DOCTOR_CACHE_TABLE), version)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['first_name'], "Renamed")
+        self.assertNotEqual(response['ETag'], etag)
+
+    @override_settings(RESPONSE_CACHE_ENABLED=False)
+    def test_disabled_without_a_shared_cache(self):
+        self.client.get(self.url)
+        with self.assertQueryBudget(1):
+            response = self.client.get(self.url)
+        self.assertNotIn('ETag', response)
+
+
+class AvailabilityCalendarTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = generate_dataset(users=1, doctors=1, slots_per_doctor=4, appointments=1)
+        cls.doctor = cls.dataset.doctors[0]
+        cls.user = cls.dataset.users[0]
+        cls.patient = cls.dataset.patients[0]
+
+    def setUp(self):
+        cache.clear()
+
+    def open_count(self, day):
+        [summary] = get_availability_calendar(self.doctor.id, day, day)
+        return summary['open_count']
+
+    def test_booking_invalidates_the_day(self):
+        slot = DoctorAvailability.objects.filter(doctor=self.doctor, is_available=True).first()
+        before = self.open_count(slot.date)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            book_appointment(user=self.user, patient=self.patient, availability=slot, symptoms='Cough')
+        self.assertEqual(self.open_count(slot.date), before - 1)
+
+    def test_cancellation_invalidates_the_day(self):
+        appointment = Appointment.objects.select_related('availability').get(
+            pk=self.dataset.appointments[0].pk
+        )
+        day = appointment.availability.date
+        before = self.open_count(day)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            cancel_appointment(appointment)
+        self.assertEqual(self.open_count(day), before + 1)
+
+    def test_materialize_invalidates_the_day(self):
+        day = date.today() + timedelta(days=90)
+        DoctorSchedule.objects.create(
+            doctor=self.doctor, weekday=day.weekday(), start_time=time(9), end_time=time(10)
+        )
+        self.assertEqual(self.open_count(day), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            materialize_slots(day, day, doctor_ids=[self.doctor.id])
+        self.assertEqual(self.open_count(day), 2)
+
+    def test_unknown_doctor_is_not_found(self):
+        response = self.client.get(reverse('doctor-calendar', args=[999999]))
+        self.assertEqual(response.status_code, 404)
+
+        response = self.client.get(
+            reverse('doctor-calendar', args=[self.doctor.id]),
+            {'date_from': (date.today() + timedelta(days=200)).isoformat()}
+        )
+        self.assertEqual(response.status_code, 200)
+
+
+class DoctorSearchTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.doctors = {
+            name: Doctor.objects.create(
+                first_name=first_name, last_name=last_name, specialization=specialization,
+                age=50, gender='F', address="1 Clinic Road", license_no=f"LIC-S-{name}",
+                experience=10, phone_number="5550000", email=f"{name}@example.com",
+            )
+            for name, first_name, last_name, specialization in [
+                ('carla', "Carla", "Cardozo", 'cardiology'),
+                ('maria', "Maria", "Cardozo", 'dermatology'),
+                ('jonathan', "Jonathan", "Pike", 'cardiology'),
+            ]
+        }
+
+    def search(self, query, queryset=None):
+        queryset = Doctor.objects.all() if queryset is None else queryset
+        results = search_doctors(queryset, query, rank=True).order_by('-search_rank', 'id')
+        return [doctor.pk for doctor in results]
+
+    def test_best_match_ranks_first(self):
+        results = self.search("cardozo cardiology")
+        self.assertEqual(results[0], self.doctors['carla'].pk)
+        self.assertNotIn(self.doctors['jonathan'].pk, results)
+
+        response = self.client.get(reverse('doctor-search'), {'q': "cardozo cardio"})
+        self.assertEqual(response.data['results'][0]['id'], self.doctors['carla'].pk)
+
+    @skipUnless(connection.vendor == 'postgresql', "trigram similarity needs pg_trgm")
+    def test_misspelt_terms_still_match(self):
+        # "jonathon" is similar to "jonathan"; the other term matches by prefix
+        self.assertEqual(self.search("jonathon cardio")[0], self.doctors['jonathan'].pk)
+
+    def test_index_follows_insert_update_and_delete(self):
+        doctor = Doctor.objects.create(
+            first_name="Zebulon", last_name="Quark", specialization='neurology',
+            age=40, gender='M', address="2 Clinic Road", license_no="LIC-S-zebulon",
+            experience=5, phone_number="5550001", email="zebulon@example.com",
+        )
+        self.assertEqual(self.search("zebulon"), [doctor.pk])
+
+        doctor.first_name = "Xavier"
+        doctor.save()
+        self.assertEqual(self.search("zebulon"), [])
+        self.assertEqual(self.search("xavier quark"), [doctor.pk])
+
+        doctor.delete()
+        self.assertEqual(self.search("xavier"), [])
+
+
+class AvailabilitySearchTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        def doctor(name, specialization, fee, experience):
+            return Doctor.objects.create(
+                first_name=name, last_name="Search", specialization=specialization,
+                consultation_fee=fee, experience=experience, age=50, gender='F',
+                address="1 Clinic Road", license_no=f"LIC-A-{name}", phone_number="5550000",
+                email=f"{name.lower()}@search.example.com",
+            )
+
+        cls.cardio = doctor("Cora", 'cardiology', 800, 20)
+        cls.derma = doctor("Dana", 'dermatology', 400, 5)
+        cls.day = date.today() + timedelta(days=1)
+        cls.slots = {}
+        for doc in (cls.cardio, cls.derma):
+            for offset, hour in [(0, 9), (0, 14), (1, 9)]:
+                cls.slots[(doc.first_name, offset, hour)] = DoctorAvailability.objects.create(
+                    doctor=doc, date=cls.day + timedelta(days=offset),
+                    start_time=time(hour), end_time=time(hour, 30),
+                )
+
+    def search(self, **params):
+        response = self.client.get(reverse('doctor-availability-search'), {'limit': 50, **params})
+        self.assertEqual(response.status_code, 200)
+        return [row['id'] for row in response.data['results']]
+
+    def ids(self, *keys):
+        return [self.slots[key].id for key in keys]
+
+    def test_results_are_ordered_by_date_start_time_and_id(self):
+        slots = DoctorAvailability.objects.filter(doctor__in=[self.cardio, self.derma])
+        expected = list(slots.order_by('date', 'start_time', 'id').values_list('id', flat=True))
+        self.assertEqual(self.search(), expected)
+
+    def test_doctor_filters(self):
+        cardio = self.ids(('Cora', 0, 9), ('Cora', 0, 14), ('Cora', 1, 9))
+        derma = self.ids(('Dana', 0, 9), ('Dana', 0, 14), ('Dana', 1, 9))
+        self.assertEqual(self.search(specialization='cardiology'), cardio)
+        self.assertEqual(self.search(min_fee='500'), cardio)
+        self.assertEqual(self.search(max_fee='500'), derma)
+        self.assertEqual(self.search(min_experience=10), cardio)
+
+    def test_date_and_time_window(self):
+        second_day = self.day + timedelta(days=1)
+        self.assertEqual(
+            self.search(date_from=second_day.isoformat()),
+            self.ids(('Cora', 1, 9), ('Dana', 1, 9))
+        )
+        self.assertEqual(
+            self.search(date_to=self.day.isoformat(), time_from='12:00'),
+            self.ids(('Cora', 0, 14), ('Dana', 0, 14))
+        )
+        self.assertEqual(
+            self.search(time_to='10:00', specialization='dermatology'),
+            self.ids(('Dana', 0, 9), ('Dana', 1, 9))
+        )
+
+    def test_started_slots_are_excluded(self):
+        now = timezone.localtime().replace(tzinfo=None, second=0, microsecond=0)
+        started, upcoming = [
+            DoctorAvailability(
+                doctor=self.cardio, date=moment.date(), start_time=moment.time(),
+                end_time=(moment + timedelta(minutes=1)).time(),
+            )
+            for moment in (now - timedelta(minutes=5), now + timedelta(minutes=5))
+        ]
+        DoctorAvailability.objects.bulk_create([started, upcoming])
+
+        results = self.search(specialization='cardiology')
+        self.assertNotIn(started.id, results)
+        self.assertEqual(results[0], upcoming.id)
+
+    def test_rejects_inverted_ranges(self):
+        url = reverse('doctor-availability-search')
+        response = self.client.get(url, {
+            'date_from': self.day.isoformat(), 'date_to': (self.day - timedelta(days=1)).isoformat()
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('date_to', response.data)
+        self.assertEqual(self.client.get(url, {'min_fee': '600', 'max_fee': '500'}).status_code, 400)
+
+
+class SlotHoldTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = generate_dataset(users=2, doctors=1, slots_per_doctor=4, appointments=0)
+        cls.slot = cls.dataset.slots[0]
+        cls.holder, cls.other = cls.dataset.users
+
+    def setUp(self):
+        cache.clear()
+
+    def hold(self, user):
+        self.client.force_authenticate(user)
+        return self.client.post(reverse('doctor-availability-hold', args=[self.slot.id]))
+
+    def test_hold_is_exclusive_and_visible(self):
+        self.assertEqual(self.hold(self.holder).status_code, 201)
+        self.assertEqual(self.hold(self.holder).status_code, 201)  # extends
+        self.assertEqual(self.hold(self.other).status_code, 409)
+
+        response = self.client.get(reverse('doctor-availability-list'), {'doctor': self.slot.doctor_id})
+        on_hold = {slot['id']: slot['on_hold'] for slot in response.data['results']}
+        self.assertTrue(on_hold[self.slot.id])
+
+        # The holder does not see their own hold as blocking
+        self.client.force_authenticate(self.holder)
+        response = self.client.get(reverse('doctor-availability-list'), {'doctor': self.slot.doctor_id})
+        self.assertFalse({slot['id']: slot['on_hold'] for slot in response.data['results']}[self.slot.id])
+
+    def test_booking_honors_hold(self):
+        self.hold(self.holder)
+        data = {
+            'availability': self.slot.id,
+            'symptoms': 'Persistent headache for three days',
+        }
+
+        self.client.force_authenticate(self.other)
+        response = self.client.post(reverse('appointment-list-create'), {**data, 'patient': self.dataset.patients[1].id})
+        self.assertEqual(response.status_code, 409)
+
+        self.client.force_authenticate(self.holder)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('appointment-list-create'), {**data, 'patient': self.dataset.patients[0].id})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(get_holds([self.slot.id]), {})
+
+    def test_release(self):
+        self.hold(self.holder)
+        self.client.delete(reverse('doctor-availability-hold', args=[self.slot.id]))
+        self.assertEqual(self.hold(self.other).status_code, 201)
+
+    def test_one_hold_per_user(self):
+        second = self.dataset.slots[1]
+        self.assertEqual(self.hold(self.holder).status_code, 201)
+        response = self.client.post(reverse('doctor-availability-hold', args=[second.id]))
+        self.assertEqual(response.status_code, 201)
+
+        # Holding the second slot gave up the first
+        self.assertEqual(list(get_holds([self.slot.id, second.id])), [second.id])
+        self.assertEqual(self.hold(self.other).status_code, 201)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'doctor.tests.RacingHoldCache'}})
+    def test_expired_hold_is_reclaimed_without_overwriting(self):
+        RacingHoldCache.rival = {'user': self.other.id, 'expires': 0}
+        # The first add() loses to a hold that is gone by the get(), and the
+        # other user's hold lands in between: it must be kept
+        self.assertIsNone(hold_slot(self.slot.id, self.holder.id))
+        self.assertEqual(get_holds([self.slot.id])[self.slot.id]['user'], self.other.id)
+
+
+class RacingHoldCache(LocMemCache):
+    """LocMem cache whose first add() fails and whose next get() lets ``rival`` in"""
+    rival = None
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        if RacingHoldCache.rival is not None and not getattr(self, 'raced', False):
+            self.raced = True
+            return False
+        return super().add(key, value, timeout, version)
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, default, version)
+        if getattr(self, 'raced', False) and RacingHoldCache.rival is not None:
+            super().set(key, RacingHoldCache.rival, version=version)
+            RacingHoldCache.rival = None
+        return value
+
+
+class DoctorScheduleTests(QueryBudgetMixin, APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = generate_dataset(users=3, doctors=2, slots_per_doctor=32, appointments=20)
+        cls.doctor = cls.dataset.doctors[0]
+        cls.doctor_user = User.objects.create_user(email='doctor@example.com')
+        cls.doctor_user.profile.role = 'DOCTOR'
+        cls.doctor_user.profile.save()
+        cls.doctor.user = cls.doctor_user
+        cls.doctor.save()
+        Appointment.objects.filter(pk=cls.dataset.appointments[0].pk).update(status='CANCELLED')
+
+    def setUp(self):
+        self.client.force_authenticate(
+            User.objects.select_related('profile').get(pk=self.doctor_user.pk)
+        )
+
+    def test_week_schedule(self):
+        start = self.dataset.slots[0].date
+        # Doctor lookup, joined slots/appointments, counts by status
+        with self.assertQueryBudget(3):
+            response = self.client.get(reverse('doctor-schedule'), {'date': start, 'days': 7})
+        self.assertEqual(response.status_code, 200)
+
+        days = response.data['days']
+        self.assertEqual(len(days), 7)
+        first = days[0]
+        self.assertEqual(len(first['slots']), 16)
+        booked = [slot for slot in first['slots'] if slot['appointment']]
+        self.assertEqual(len(booked), first['counts']['PENDING'])
+        self.assertEqual(response.data['counts']['CANCELLED'], 1)
+        self.assertEqual(
+            sum(day['counts']['PENDING'] for day in days),
+            Appointment.objects.filter(doctor=self.doctor, status='PENDING').count()
+        )
+
+    def test_requires_linked_doctor(self):
+        self.doctor.user = None
+        self.doctor.save()
+        response = self.client.get(reverse('doctor-schedule'))
+        self.assertEqual(response.status_code, 404)
+
+    def test_patients_are_forbidden(self):
+        self.client.force_authenticate(self.dataset.users[0])
+        response = self.client.get(reverse('doctor-schedule'))
+        self.assertEqual(response.status_code, 403)
+
+
+ROSTER_HEADER = "license_no,email,first_name,last_name,age,gender,address,specialization,experience,phone_number,consultation_fee\n"
+
+
+def roster_row(i, **overrides):
+    row = {
+        'license_no': f"LIC-R-{i}",
+        'email': f"roster-{i}@example.com",
+        'first_name': "Ros",
+        'last_name': f"Ter{i}",
+        'age': 45,
+        'gender': 'f',
+        'address': "1 Clinic Road",
+        'specialization': 'Cardiology',
+        'experience': 12,
+        'phone_number': "5550000",
+        'consultation_fee': "650.00",
+    }
+    row.update(overrides)
+    return ','.join(str(value) for value in row.values()) + '\n'
+
+
+class RosterImportTests(QueryBudgetMixin, APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.existing = generate_dataset(users=0, doctors=2, slots_per_doctor=0, appointments=0).doctors
+        cls.admin = User.objects.create_superuser(email='roster-admin@example.com', password=None)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_upserts_and_reports_row_errors(self):
+        taken = self.existing[1]
+        roster = (
+            ROSTER_HEADER
+            + roster_row(1)
+            + roster_row(2)
+            + roster_row(3, license_no="LIC-R-1")                      # duplicate in file
+            + roster_row(4, age=12)                                    # invalid
+            + roster_row(5, email=taken.email)                         # email of another doctor
+            + roster_row(6, license_no=self.existing[0].license_no,    # update
+                         email=self.existing[0].email, first_name="Renamed")
+        )
+        version = get_table_version(DOCTOR_CACHE_TABLE)
+
+        # Per chunk: one duplicate lookup and one upsert, plus the savepoint
+        # pair the chunk transaction becomes inside the test transaction
+        with self.captureOnCommitCallbacks(execute=True), self.assertQueryBudget(2 * 4):
+            result = import_roster(read_rows(StringIO(roster), 'csv'), batch_size=3)
+
+        self.assertEqual((result.created, result.updated), (2, 1))
+        self.assertEqual(sorted(line for line, _ in result.errors), [4, 5, 6])
+        self.assertEqual(Doctor.objects.get(license_no="LIC-R-1").specialization, 'cardiology')
+        self.assertEqual(Doctor.objects.get(pk=self.existing[0].pk).first_name, "Renamed")
+        self.assertNotEqual(get_table_version(DOCTOR_CACHE_TABLE), version)
+
+    def test_reimport_without_optional_columns_keeps_them(self):
+        doctor = self.existing[0]
+        Doctor.objects.filter(pk=doctor.pk).update(consultation_fee=900, is_active=False)
+        header = ROSTER_HEADER.replace(',consultation_fee', '')
+        row = roster_row(1, license_no=doctor.license_no, email=doctor.email, first_name="Renamed")
+        roster = header + row.rsplit(',', 1)[0] + '\n' + roster_row(2).rsplit(',', 1)[0] + '\n'
+
+        result = import_roster(read_rows(StringIO(roster), 'csv'))
+
+        self.assertEqual((result.created, result.updated), (1, 1))
+        doctor.refresh_from_db()
+        self.assertEqual((doctor.first_name, doctor.consultation_fee, doctor.is_active), ("Renamed", 900, False))
+        created = Doctor.objects.get(license_no="LIC-R-2")
+        self.assertEqual((created.consultation_fee, created.is_active), (500, True))
+
+    def test_upload_endpoint(self):
+        self.client.force_authenticate(self.admin)
+        upload = SimpleUploadedFile("roster.csv", (ROSTER_HEADER + roster_row(1) + roster_row(2, gender='X')).encode())
+        response = self.client.post(reverse('doctor-roster-import'), {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(response.data['skipped'], 1)
+        self.assertEqual(response.data['errors'][0]['line'], 3)
@@ -1,12 +1,21 @@
 from django.urls import path
 from .views import (
-    DoctorListView, DoctorDetailView,
-    DoctorAvailabilityListView, DoctorAvailabilityCreateView
+    DoctorListView, DoctorDetailView, DoctorCalendarView, DoctorSearchView,
+    DoctorAvailabilityListView, DoctorAvailabilityCreateView,
+    DoctorAvailabilityGenerateView, DoctorAvailabilitySearchView,
+    DoctorAvailabilityHoldView, DoctorScheduleView, DoctorRosterImportView
 )
 
 urlpatterns = [
     path('', DoctorListView.as_view(), name='doctor-list'),
+    path('search/', DoctorSearchView.as_view(), name='doctor-search'),
+    path('import/', DoctorRosterImportView.as_view(), name='doctor-roster-import'),
+    path('me/schedule/', DoctorScheduleView.as_view(), name='doctor-schedule'),
     path('<int:pk>/', DoctorDetailView.as_view(), name='doctor-detail'),
+    path('<int:pk>/calendar/', DoctorCalendarView.as_view(), name='doctor-calendar'),
     path('availability/', DoctorAvailabilityListView.as_view(), name='doctor-availability-list'),
+    path('availability/<int:pk>/hold/', DoctorAvailabilityHoldView.as_view(), name='doctor-availability-hold'),
+    path('availability/search/', DoctorAvailabilitySearchView.as_view(), name='doctor-availability-search'),
     path('availability/create/', DoctorAvailabilityCreateView.as_view(), name='doctor-availability-create'),
+    path('availability/generate/', DoctorAvailabilityGenerateView.as_view(), name='doctor-availability-generate'),
 ]
\ No newline at end of file
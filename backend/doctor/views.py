@@ -1,41 +1,140 @@
+import io
+
 from rest_framework import generics, permissions, filters, status
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from datetime import date, timedelta
-from .models import DoctorAvailability, Doctor
-from .serializers import DoctorAvailabilitySerializer, DoctorSerializer
+from django.db.models import Q
+from django.utils import timezone
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from .models import DoctorAvailability, Doctor, DOCTOR_CACHE_TABLE
+from .serializers import (
+    DoctorAvailabilitySerializer, DoctorSerializer,
+    GenerateAvailabilitySerializer, AvailabilitySearchSerializer,
+    AvailabilitySearchResultSerializer, AvailabilityCalendarSerializer,
+    DoctorSearchParamsSerializer, HeldAvailabilitySerializer,
+    DoctorScheduleParamsSerializer, RosterImportSerializer
+)
+from .search import DoctorSearchFilter, search_doctors
+from .availability_cache import get_availability_calendar
+from .daily_schedule import build_schedule
+from .holds import get_holds, hold_slot, release_hold
+from core.caching import CachedResponseMixin
+from core.fieldsets import SparseFieldsetMixin
+from core.importing import read_rows
+from core.permissions import IsDoctorOrAdmin
+from core.pagination import KeysetPagination
+from .roster_import import import_roster
+from .scheduling import materialize_slots
 
-class DoctorListView(generics.ListAPIView):
+class DoctorListView(CachedResponseMixin, SparseFieldsetMixin, generics.ListAPIView):
     serializer_class = DoctorSerializer
     permission_classes = [permissions.AllowAny]  # Public endpoint
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, DoctorSearchFilter, filters.OrderingFilter]
     filterset_fields = ['specialization', 'is_active']
-    search_fields = ['first_name', 'last_name', 'specialization']
+    cache_table = DOCTOR_CACHE_TABLE
     ordering_fields = ['experience', 'consultation_fee', 'first_name']
-    ordering = ['first_name']
+    ordering = ['first_name', 'last_name']
     
     def get_queryset(self):
         return Doctor.objects.filter(is_active=True)
 
-class DoctorDetailView(generics.RetrieveAPIView):
+class DoctorSearchView(generics.GenericAPIView):
+    """Ranked, typo-tolerant doctor directory search"""
+    serializer_class = DoctorSerializer
+    permission_classes = [permissions.AllowAny]
+    pagination_class = None
+
+    def get(self, request):
+        params = DoctorSearchParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        queryset = Doctor.objects.filter(is_active=True)
+        if 'specialization' in params.validated_data:
+            queryset = queryset.filter(specialization=params.validated_data['specialization'])
+
+        queryset = search_doctors(
+            queryset, params.validated_data['q'], rank=True
+        ).order_by('-search_rank', 'id')[:params.validated_data['limit']]
+
+        return Response({
+            'results': self.get_serializer(queryset, many=True).data
+        })
+
+class DoctorDetailView(CachedResponseMixin, SparseFieldsetMixin, generics.RetrieveAPIView):
     serializer_class = DoctorSerializer
     permission_classes = [permissions.AllowAny]
+    cache_table = DOCTOR_CACHE_TABLE
     
     def get_queryset(self):
         return Doctor.objects.filter(is_active=True)
 
-class DoctorAvailabilityListView(generics.ListAPIView):
-    serializer_class = DoctorAvailabilitySerializer
+class DoctorCalendarView(generics.GenericAPIView):
+    """Cached per-day summary of a doctor's open slots"""
+    serializer_class = AvailabilityCalendarSerializer
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request, pk):
+        params = self.get_serializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        date_from = params.validated_data.get('date_from') or date.today()
+        date_to = date_from + timedelta(days=params.validated_data['days'] - 1)
+
+        days = get_availability_calendar(pk, date_from, date_to)
+        # An unknown doctor looks like one with no open slots; only then
+        # is it worth a query to tell the two apart
+        if not any(day['open_count'] for day in days) and not Doctor.objects.filter(pk=pk).exists():
+            return Response({'error': 'Doctor not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response({'doctor': pk, 'days': days})
+
+class DoctorScheduleView(generics.GenericAPIView):
+    """
+    The signed-in doctor's slots and appointments for a day or week, with
+    per-day counts by status. Admins pass ``?doctor=<id>``.
+    """
+    serializer_class = DoctorScheduleParamsSerializer
+    permission_classes = [IsDoctorOrAdmin]
+
+    def get_doctor(self, doctor_id):
+        user = self.request.user
+        profile = getattr(user, 'profile', None)
+        is_admin = user.is_staff or user.is_superuser or getattr(profile, 'role', None) == 'ADMIN'
+        if doctor_id and is_admin:
+            return Doctor.objects.filter(pk=doctor_id).first()
+        return Doctor.objects.filter(user=user).first()
+
+    def get(self, request):
+        params = self.get_serializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        doctor = self.get_doctor(params.validated_data.get('doctor'))
+        if doctor is None:
+            return Response({
+                'error': 'No doctor record is linked to this account'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        date_from = params.validated_data.get('date') or date.today()
+        date_to = date_from + timedelta(days=params.validated_data['days'] - 1)
+
+        return Response({
+            'doctor': {'id': doctor.id, 'name': doctor.full_name},
+            **build_schedule(doctor, date_from, date_to)
+        })
+
+class DoctorAvailabilityListView(SparseFieldsetMixin, generics.ListAPIView):
+    serializer_class = HeldAvailabilitySerializer
     permission_classes = [permissions.AllowAny]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['doctor', 'date', 'is_available']
+    ordering_fields = ['date', 'start_time']
     ordering = ['date', 'start_time']
 
     def get_queryset(self):
         queryset = DoctorAvailability.objects.filter(
             date__gte=date.today(),
             is_available=True
-        )
+        ).select_related('doctor')
         
         doctor_id = self.request.query_params.get('doctor')
         if doctor_id:
@@ -47,6 +146,139 @@ class DoctorAvailabilityListView(generics.ListAPIView):
         
         return queryset
 
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        slots = list(queryset) if page is None else page
+
+        # Flag slots other patients are holding (one cache read per page)
+        context = self.get_serializer_context()
+        context['holds'] = get_holds([slot.id for slot in slots])
+        serializer = self.get_serializer(slots, many=True, context=context)
+
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
+        return Response(serializer.data)
+
+class DoctorAvailabilityHoldView(generics.GenericAPIView):
+    """
+    POST holds an open slot for the current user for ``SLOT_HOLD_SECONDS``
+    while they fill in the booking form; DELETE releases it early.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return DoctorAvailability.objects.filter(date__gte=date.today(), is_available=True)
+
+    def post(self, request, pk):
+        slot = self.get_object()
+        hold = hold_slot(slot.pk, request.user.id)
+        if hold is None:
+            return Response({
+                'error': 'This time slot is on hold for another patient'
+            }, status=status.HTTP_409_CONFLICT)
+
+        return Response({
+            'availability': slot.pk,
+            'expires_at': datetime.fromtimestamp(hold['expires'], tz=dt_timezone.utc),
+        }, status=status.HTTP_201_CREATED)
+
+    def delete(self, request, pk):
+        release_hold(pk, request.user.id)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+class SlotSearchPagination(KeysetPagination):
+    page_size = 10
+    page_size_query_param = 'limit'
+
+class DoctorAvailabilitySearchView(generics.ListAPIView):
+    """
+    Earliest open slots across all doctors matching the filters.
+
+    Results are keyset-paginated on (date, start_time, id), so each page is
+    a range scan over the partial open-slot index that stops after
+    ``limit`` rows.
+    """
+    serializer_class = AvailabilitySearchResultSerializer
+    permission_classes = [permissions.AllowAny]
+    pagination_class = SlotSearchPagination
+    ordering = ['date', 'start_time', 'id']
+
+    def get_queryset(self):
+        params = AvailabilitySearchSerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        criteria = params.validated_data
+
+        queryset = DoctorAvailability.objects.filter(
+            is_available=True,
+            doctor__is_active=True
+        ).select_related('doctor')
+
+        if 'specialization' in criteria:
+            queryset = queryset.filter(doctor__specialization=criteria['specialization'])
+        if 'min_fee' in criteria:
+            queryset = queryset.filter(doctor__consultation_fee__gte=criteria['min_fee'])
+        if 'max_fee' in criteria:
+            queryset = queryset.filter(doctor__consultation_fee__lte=criteria['max_fee'])
+        if 'min_experience' in criteria:
+            queryset = queryset.filter(doctor__experience__gte=criteria['min_experience'])
+        if 'time_from' in criteria:
+            queryset = queryset.filter(start_time__gte=criteria['time_from'])
+        if 'time_to' in criteria:
+            queryset = queryset.filter(end_time__lte=criteria['time_to'])
+        if 'date_to' in criteria:
+            queryset = queryset.filter(date__lte=criteria['date_to'])
+
+        # Never return slots that already started; the bound has the same
+        # (date, start_time) shape as the cursor so both use the index range
+        now = timezone.localtime()
+        day, start = now.date(), now.time().replace(tzinfo=None)
+        if 'date_from' in criteria and criteria['date_from'] > day:
+            day, start = criteria['date_from'], datetime.min.time()
+
+        return queryset.filter(Q(date__gt=day) | Q(date=day, start_time__gte=start))
+
 class DoctorAvailabilityCreateView(generics.CreateAPIView):
     serializer_class = DoctorAvailabilitySerializer
     permission_classes = [permissions.IsAdminUser]  # Only admin can create slots
+
+class DoctorAvailabilityGenerateView(generics.GenericAPIView):
+    """Bulk-create slots from the doctors' weekly schedules"""
+    serializer_class = GenerateAvailabilitySerializer
+    permission_classes = [permissions.IsAdminUser]
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        created = materialize_slots(
+            serializer.validated_data['date_from'],
+            serializer.validated_data['date_to'],
+            doctor_ids=serializer.validated_data.get('doctors')
+        )
+        return Response({
+            'message': 'Availability generated successfully',
+            'created': created
+        }, status=status.HTTP_201_CREATED)
+
+class DoctorRosterImportView(generics.GenericAPIView):
+    """Create or update doctors from an uploaded CSV/NDJSON roster, keyed on license number"""
+    serializer_class = RosterImportSerializer
+    permission_classes = [permissions.IsAdminUser]
+    parser_classes = [MultiPartParser]
+    # Row errors echoed back; the counts cover all of them
+    max_errors = 100
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        stream = io.TextIOWrapper(serializer.validated_data['file'], encoding='utf-8', newline='')
+        result = import_roster(read_rows(stream, serializer.validated_data['file_format']))
+        return Response({
+            'created': result.created,
+            'updated': result.updated,
+            'skipped': len(result.errors),
+            'errors': [
+                {'line': line, 'error': message}
+                for line, message in result.errors[:self.max_errors]
+            ],
+        }, status=status.HTTP_200_OK)
@@ -1,8 +1,9 @@
 from django.db import models
 from django.conf import settings
 from django.core.exceptions import ValidationError
+from core.models import DirtyFieldsMixin
 
-class Patient(models.Model):
+class Patient(DirtyFieldsMixin, models.Model):
     TITLE_CHOICES = [
         ('Mr', 'Mr.'),
         ('Mrs', 'Mrs.'),
@@ -52,8 +53,11 @@ class Patient(models.Model):
         if self.age <= 0 or self.age > 150:
             raise ValidationError({'age': 'Age must be between 1 and 150'})
 
+    # clean() checks age; (user, relation) is unique
+    validated_fields = ('user', 'relation', 'age')
+
     def save(self, *args, **kwargs):
-        self.full_clean()
+        self.full_clean_dirty()
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -1,7 +1,8 @@
 from rest_framework import serializers
+from core.fieldsets import SparseFieldsetSerializerMixin
 from .models import Patient
 
-class PatientSerializer(serializers.ModelSerializer):
+class PatientSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     full_name = serializers.ReadOnlyField()
     
     class Meta:
@@ -12,6 +13,9 @@ class PatientSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at'
         ]
         read_only_fields = ['created_at', 'updated_at']
+        field_dependencies = {
+            'full_name': ['title', 'first_name', 'last_name'],
+        }
 
     def validate_age(self, value):
         if value <= 0 or value > 150:
@@ -1,3 +1,51 @@
-from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from core.datagen import generate_dataset
+from core.testing import QueryBudgetMixin
+
+
+class PatientQueryBudgetTests(QueryBudgetMixin, APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = generate_dataset(users=3, doctors=1, slots_per_doctor=1, appointments=0)
+        cls.user = cls.dataset.users[0]
+        cls.patient = cls.dataset.patients[0]
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def test_list(self):
+        with self.assertQueryBudget(1):
+            response = self.client.get(reverse('patient-list-create'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_create(self):
+        with self.assertQueryBudget(5):
+            response = self.client.post(reverse('patient-list-create'), {
+                'title': 'Mrs',
+                'first_name': 'Jane',
+                'last_name': 'Doe',
+                'relation': 'mother',
+                'gender': 'female',
+                'age': 62,
+            })
+        self.assertEqual(response.status_code, 201)
+
+    def test_retrieve(self):
+        with self.assertQueryBudget(1):
+            response = self.client.get(reverse('patient-detail', args=[self.patient.id]))
+        self.assertEqual(response.status_code, 200)
+
+    def test_update(self):
+        with self.assertQueryBudget(2):
+            response = self.client.patch(
+                reverse('patient-detail', args=[self.patient.id]),
+                {'medical_history': 'Asthma'}
+            )
+        self.assertEqual(response.status_code, 200)
+
+    def test_delete(self):
+        with self.assertQueryBudget(3):
+            response = self.client.delete(reverse('patient-detail', args=[self.patient.id]))
+        self.assertEqual(response.status_code, 204)
@@ -33,4 +33,6 @@ class CustomUserAdmin(UserAdmin):
 class UserProfileAdmin(admin.ModelAdmin):
     list_display = ('user', 'role', 'created_at')
     list_filter = ('role', 'created_at')
-    search_fields = ('user__email', 'user__first_name', 'user__last_name')
\ No newline at end of file
+    search_fields = ('user__email', 'user__first_name', 'user__last_name')
+    list_select_related = ('user',)
+    raw_id_fields = ('user',)
\ No newline at end of file
@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+USER_CACHE_KEY = 'auth-user:{pk}'
+
+
+def _user_queryset():
+    queryset = get_user_model().objects.select_related('profile')
+    # Keep password hashes out of the shared cache unless token revocation needs them
+    if not api_settings.CHECK_REVOKE_TOKEN:
+        queryset = queryset.defer('password')
+    return queryset
+
+
+def cache_user(user):
+    """Store ``user`` (with its profile already joined) for the authentication hot path"""
+    cache.set(USER_CACHE_KEY.format(pk=user.pk), user, settings.AUTH_USER_CACHE_TIMEOUT)
+
+
+def get_cached_user(pk):
+    """The user with ``pk`` and its profile, from cache or one joined query; None if missing"""
+    user = cache.get(USER_CACHE_KEY.format(pk=pk))
+    if user is None:
+        user = _user_queryset().filter(pk=pk).first()
+        if user is not None:
+            cache_user(user)
+    return user
+
+
+def invalidate_cached_user(pk):
+    cache.delete(USER_CACHE_KEY.format(pk=pk))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that resolves the token's user through a short-lived
+    cache instead of a query per request. The cached user carries its
+    profile, so role checks such as ``IsDoctorOrAdmin`` are free as well.
+    Entries are dropped whenever a user or profile is saved or deleted.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        user = get_cached_user(user_id)
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return user
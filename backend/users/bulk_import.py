@@ -0,0 +1,158 @@
+"""
+Bulk account import for onboarding clinics from legacy systems.
+
+Rows are streamed from CSV or NDJSON and written in chunks with
+``bulk_create``: one insert per chunk for users, profiles and patients
+instead of the user insert, profile insert and two profile saves that
+registering one account costs. Passwords must already be hashed (any
+format in ``PASSWORD_HASHERS``, so legacy hashes keep working and are
+upgraded on first login); rows without one get an unusable password.
+``bulk_create`` sends no ``post_save`` signals, which is why profiles are
+created here explicitly.
+
+Recognised columns::
+
+    email, first_name, last_name, phone_number, role, password_hash,
+    patient_title, patient_first_name, patient_last_name,
+    patient_relation, patient_gender, patient_age, patient_medical_history
+
+A patient is created when ``patient_gender`` and ``patient_age`` are set.
+"""
+from dataclasses import dataclass, field
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+
+from core.importing import error_message, text
+from patient.models import Patient
+from .models import UserProfile
+
+User = get_user_model()
+ROLES = {role for role, _ in UserProfile.ROLE_CHOICES}
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    patients: int = 0
+    errors: list = field(default_factory=list)  # (line, message)
+
+
+def _build_account(row, unusable_password):
+    email = User.objects.normalize_email(text(row, 'email'))
+    if not email:
+        raise ValidationError({'email': ['This field is required.']})
+
+    password = text(row, 'password_hash')
+    if password:
+        try:
+            identify_hasher(password)
+        except ValueError:
+            raise ValidationError({'password_hash': ['Unrecognised password hash format.']})
+    else:
+        password = unusable_password
+
+    role = text(row, 'role').upper() or 'PATIENT'
+    if role not in ROLES:
+        raise ValidationError({'role': [f"Must be one of {', '.join(sorted(ROLES))}."]})
+
+    user = User(
+        email=email,
+        first_name=text(row, 'first_name'),
+        last_name=text(row, 'last_name'),
+        phone_number=text(row, 'phone_number') or None,
+        password=password,
+    )
+    user.clean_fields(exclude=['password', 'last_login'])
+
+    patient = None
+    if text(row, 'patient_gender') and text(row, 'patient_age'):
+        patient = Patient(
+            title=text(row, 'patient_title') or 'Mr',
+            first_name=text(row, 'patient_first_name') or user.first_name,
+            last_name=text(row, 'patient_last_name') or user.last_name,
+            relation=text(row, 'patient_relation') or 'self',
+            gender=text(row, 'patient_gender').lower(),
+            age=text(row, 'patient_age'),
+            medical_history=text(row, 'patient_medical_history') or None,
+        )
+        patient.clean_fields(exclude=['user'])
+        patient.clean()
+    return user, role, patient
+
+
+def _import_chunk(chunk, result, unusable_password):
+    accounts = []
+    emails, phones = set(), set()
+    for line, row in chunk:
+        if not isinstance(row, dict):
+            result.errors.append((line, f"Invalid JSON object: {row}"))
+            continue
+        try:
+            user, role, patient = _build_account(row, unusable_password)
+        except ValidationError as exc:
+            result.errors.append((line, error_message(exc)))
+            continue
+        if user.email in emails or (user.phone_number and user.phone_number in phones):
+            result.errors.append((line, "Duplicate email or phone number in this file"))
+            continue
+        emails.add(user.email)
+        if user.phone_number:
+            phones.add(user.phone_number)
+        accounts.append((line, user, role, patient))
+
+    # One lookup per chunk for accounts that already exist
+    taken = set(User.objects.filter(email__in=emails).values_list('email', flat=True))
+    taken_phones = set()
+    if phones:
+        taken_phones = set(User.objects.filter(phone_number__in=phones).values_list('phone_number', flat=True))
+    fresh = []
+    for line, user, role, patient in accounts:
+        if user.email in taken or user.phone_number in taken_phones:
+            result.errors.append((line, "An account with this email or phone number already exists"))
+        else:
+            fresh.append((line, user, role, patient))
+    if not fresh:
+        return
+
+    try:
+        with transaction.atomic():
+            users = User.objects.bulk_create([user for _, user, _, _ in fresh])
+            UserProfile.objects.bulk_create([
+                UserProfile(user=user, role=role) for _, user, role, _ in fresh
+            ])
+            patients = []
+            for _, user, _, patient in fresh:
+                if patient is not None:
+                    patient.user = user
+                    patients.append(patient)
+            Patient.objects.bulk_create(patients)
+    except IntegrityError:
+        # Someone registered one of these accounts since the lookup above
+        result.errors.extend(
+            (line, "Conflicted with a concurrent registration; re-run to import")
+            for line, _, _, _ in fresh
+        )
+        return
+
+    result.created += len(users)
+    result.patients += len(patients)
+
+
+def import_accounts(rows, batch_size=1000):
+    """
+    Import ``(line_number, row)`` pairs, as produced by ``read_rows``, in
+    chunks of ``batch_size``. Invalid or duplicate rows are skipped and
+    reported in the result; each chunk commits on its own.
+    """
+    result = ImportResult()
+    unusable_password = make_password(None)
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, batch_size))
+        if not chunk:
+            return result
+        _import_chunk(chunk, result, unusable_password)
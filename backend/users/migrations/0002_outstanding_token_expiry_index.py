@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Index OutstandingToken.expires_at so compact_token_blacklist can find
+    expired rows without scanning the table. The model belongs to
+    simplejwt, so the index is created with plain SQL.
+    """
+
+    dependencies = [
+        ('users', '0001_initial'),
+        ('token_blacklist', '0013_alter_blacklistedtoken_options_and_more'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS jwt_outstanding_expires_idx '
+            'ON token_blacklist_outstandingtoken (expires_at)',
+            reverse_sql='DROP INDEX IF EXISTS jwt_outstanding_expires_idx',
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
 from django.core.validators import RegexValidator
+from core.models import DirtyFieldsMixin
 
 class CustomUserManager(BaseUserManager):
     def create_user(self, email, password=None, **extra_fields):
@@ -47,7 +48,7 @@ class CustomUser(AbstractUser):
     def __str__(self):
         return self.email
 
-class UserProfile(models.Model):
+class UserProfile(DirtyFieldsMixin, models.Model):
     ROLE_CHOICES = [
         ("ADMIN", "Admin"),
         ("DOCTOR", "Doctor"),
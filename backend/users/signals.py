@@ -1,6 +1,8 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
+from .authentication import invalidate_cached_user
 from .models import UserProfile
 
 User = get_user_model()
@@ -12,9 +14,22 @@ def create_user_profile(sender, instance, created, **kwargs):
         UserProfile.objects.create(user=instance)
 
 @receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
-    """Save UserProfile when user is saved"""
-    if hasattr(instance, 'profile'):
-        instance.profile.save()
-    else:
-        UserProfile.objects.create(user=instance)
\ No newline at end of file
+def save_user_profile(sender, instance, created, update_fields=None, **kwargs):
+    """Save the profile along with a full user save, creating it if missing"""
+    # New users got theirs above; partial saves (e.g. last_login) leave it alone
+    if created or update_fields is not None:
+        return
+    try:
+        instance.profile.save()  # no-op unless the profile has unsaved changes
+    except UserProfile.DoesNotExist:
+        UserProfile.objects.create(user=instance)
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_user_cache(sender, instance, **kwargs):
+    """Drop the cached authentication user once the change is committed"""
+    transaction.on_commit(lambda: invalidate_cached_user(instance.pk))
+
+@receiver([post_save, post_delete], sender=UserProfile)
+def invalidate_profile_cache(sender, instance, **kwargs):
+    """Role changes must reach permission checks right away"""
+    transaction.on_commit(lambda: invalidate_cached_user(instance.user_id))
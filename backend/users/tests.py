@@ -1,3 +1,168 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework.test import APITestCase
+
+from core.importing import read_rows
+from core.testing import QueryBudgetMixin
+from .bulk_import import import_accounts
+from .tokens import CachedRefreshToken
+
+User = get_user_model()
+
+
+class UserQueryBudgetTests(QueryBudgetMixin, APITestCase):
+    password = 'Str0ng-Passw0rd!'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='patient@example.com', password=cls.password)
+
+    def setUp(self):
+        cache.clear()
+
+    def login(self):
+        response = self.client.post(reverse('login'), {
+            'email': self.user.email,
+            'password': self.password,
+        })
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_register(self):
+        with self.assertQueryBudget(4):
+            response = self.client.post(reverse('register'), {
+                'email': 'new@example.com',
+                'first_name': 'New',
+                'last_name': 'User',
+                'password': self.password,
+                'confirm_password': self.password,
+            })
+        self.assertEqual(response.status_code, 201)
+
+    def test_login(self):
+        # User, profile, outstanding refresh token
+        with self.assertQueryBudget(3):
+            self.login()
+
+    def test_logout(self):
+        tokens = self.login()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        # User, blacklist check, outstanding token lookup, blacklist insert
+        with self.assertQueryBudget(4):
+            response = self.client.post(reverse('logout'), {'refresh': tokens['refresh']})
+        self.assertEqual(response.status_code, 200)
+
+    def test_profile(self):
+        tokens = self.login()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        with self.assertQueryBudget(1):
+            response = self.client.get(reverse('profile'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_cached_authentication(self):
+        tokens = self.login()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        self.client.get(reverse('profile'))
+
+        with self.assertQueryBudget(0):
+            response = self.client.get(reverse('profile'))
+        self.assertEqual(response.data['profile']['role'], 'PATIENT')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.profile.role = 'DOCTOR'
+            self.user.profile.save()
+        response = self.client.get(reverse('profile'))
+        self.assertEqual(response.data['profile']['role'], 'DOCTOR')
+
+    def test_inactive_user_is_rejected_after_save(self):
+        tokens = self.login()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        self.client.get(reverse('profile'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        response = self.client.get(reverse('profile'))
+        self.assertEqual(response.status_code, 401)
+
+    def test_token_refresh(self):
+        tokens = self.login()
+        # Blacklist check, user, blacklist the old token (2), outstand the new one
+        with self.assertQueryBudget(5):
+            response = self.client.post(reverse('token_refresh'), {'refresh': tokens['refresh']})
+        self.assertEqual(response.status_code, 200)
+
+    def test_rotated_token_is_rejected_from_cache(self):
+        tokens = self.login()
+        response = self.client.post(reverse('token_refresh'), {'refresh': tokens['refresh']})
+        self.assertEqual(response.status_code, 200)
+
+        with self.assertQueryBudget(0):
+            response = self.client.post(reverse('token_refresh'), {'refresh': tokens['refresh']})
+        self.assertEqual(response.status_code, 401)
+
+    def test_logout_blacklists_refresh_token(self):
+        tokens = self.login()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        self.client.post(reverse('logout'), {'refresh': tokens['refresh']})
+        cache.clear()
+
+        response = self.client.post(reverse('token_refresh'), {'refresh': tokens['refresh']})
+        self.assertEqual(response.status_code, 401)
+        self.assertTrue(BlacklistedToken.objects.filter(token__user=self.user).exists())
+
+    def test_compaction_deletes_only_expired_tokens(self):
+        self.login()
+        tokens = self.login()
+        self.client.post(reverse('token_refresh'), {'refresh': tokens['refresh']})
+        OutstandingToken.objects.filter(jti=CachedRefreshToken(tokens['refresh'], verify=False)['jti']).update(
+            expires_at=timezone.now() - timedelta(minutes=1)
+        )
+
+        call_command('compact_token_blacklist', batch_size=1, stdout=StringIO())
+        self.assertEqual(OutstandingToken.objects.count(), 2)
+        self.assertFalse(BlacklistedToken.objects.exists())
+
+
+class BulkImportTests(TestCase):
+    def test_imports_users_profiles_and_patients(self):
+        User.objects.create_user(email='taken@example.com')
+        password_hash = make_password('legacy-secret')
+        stream = StringIO(
+            "email,first_name,last_name,role,password_hash,patient_gender,patient_age\n"
+            f"one@example.com,Ann,Lee,PATIENT,{password_hash},female,34\n"
+            "two@example.com,Bob,Ray,doctor,,,\n"
+            "taken@example.com,Dup,User,PATIENT,,,\n"
+            "one@example.com,Ann,Again,PATIENT,,,\n"
+            "bad-email,No,Good,PATIENT,,,\n"
+            "three@example.com,Cy,Fox,PATIENT,plaintext,,\n"
+        )
+
+        # First chunk: existing-email lookup, then users, profiles and patients
+        # in one savepoint; the second chunk has no valid rows to look up
+        with self.assertNumQueries(6):
+            result = import_accounts(read_rows(stream, 'csv'), batch_size=4)
+
+        self.assertEqual((result.created, result.patients), (2, 1))
+        self.assertEqual(sorted(line for line, _ in result.errors), [4, 5, 6, 7])
+        one = User.objects.get(email='one@example.com')
+        self.assertTrue(one.check_password('legacy-secret'))
+        self.assertEqual(one.patients.get().relation, 'self')
+        two = User.objects.get(email='two@example.com')
+        self.assertEqual(two.profile.role, 'DOCTOR')
+        self.assertFalse(two.has_usable_password())
 
-# Create your tests here.
+    def test_ndjson_rows(self):
+        stream = StringIO('{"email": "a@example.com"}\n\nnot json\n')
+        result = import_accounts(read_rows(stream, 'ndjson'))
+        self.assertEqual(result.created, 1)
+        self.assertEqual([line for line, _ in result.errors], [3])
@@ -0,0 +1,55 @@
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import aware_utcnow, datetime_from_epoch
+
+BLACKLIST_CACHE_KEY = 'jwt-blacklist:{jti}'
+
+
+class CachedRefreshToken(RefreshToken):
+    """
+    Refresh token whose blacklist is fronted by the cache.
+
+    Blacklisted jtis are cached until the token would have expired anyway,
+    so replays of rotated or logged-out tokens are rejected without a
+    query. Everything else costs one indexed lookup, and blacklisting and
+    rotation write with single statements instead of simplejwt's user
+    fetch plus get_or_create round trips.
+    """
+
+    def _cache_blacklisted(self):
+        timeout = int(self.payload['exp'] - aware_utcnow().timestamp())
+        if timeout > 0:
+            cache.set(BLACKLIST_CACHE_KEY.format(jti=self.payload[api_settings.JTI_CLAIM]), True, timeout)
+
+    def check_blacklist(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+        if cache.get(BLACKLIST_CACHE_KEY.format(jti=jti)):
+            raise TokenError(_("Token is blacklisted"))
+        if BlacklistedToken.objects.filter(token__jti=jti).exists():
+            self._cache_blacklisted()
+            raise TokenError(_("Token is blacklisted"))
+
+    def _outstanding_token(self):
+        return OutstandingToken(
+            user_id=self.payload.get(api_settings.USER_ID_CLAIM),
+            jti=self.payload[api_settings.JTI_CLAIM],
+            token=str(self),
+            created_at=self.current_time,
+            expires_at=datetime_from_epoch(self.payload['exp']),
+        )
+
+    def outstand(self):
+        OutstandingToken.objects.bulk_create([self._outstanding_token()], ignore_conflicts=True)
+
+    def blacklist(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+        token = OutstandingToken.objects.filter(jti=jti).only('id').first()
+        if token is None:
+            self.outstand()
+            token = OutstandingToken.objects.only('id').get(jti=jti)
+        BlacklistedToken.objects.bulk_create([BlacklistedToken(token=token)], ignore_conflicts=True)
+        self._cache_blacklisted()
@@ -3,7 +3,6 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, generics
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenRefreshView
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 
@@ -11,6 +10,7 @@ from .serializers import (
     RegisterSerializer, LoginSerializer, 
     UserSerializer, UserProfileSerializer
 )
+from .tokens import CachedRefreshToken
 
 User = get_user_model()
 
@@ -41,7 +41,7 @@ class LoginView(APIView):
         
         if serializer.is_valid():
             user = serializer.validated_data['user']
-            refresh = RefreshToken.for_user(user)
+            refresh = CachedRefreshToken.for_user(user)
             
             # Get user profile safely
             profile = getattr(user, 'profile', None)
@@ -68,7 +68,7 @@ class LogoutView(APIView):
     def post(self, request):
         try:
             refresh_token = request.data["refresh"]
-            token = RefreshToken(refresh_token)
+            token = CachedRefreshToken(refresh_token)
             token.blacklist()
             return Response({
                 "message": "Logged out successfully."